@@ -0,0 +1,22 @@
+import numpy as np
+
+MAX_BINS = 200
+CACHE_SIZE = 512
+
+
+def filter_values(df, feature, index, filters) :
+    values = df[feature].to_numpy(dtype = np.float64)
+    if not filters :
+        return values
+    return values[index.filter(filters)]
+
+def get_histogram(values, bins) :
+    values = values[~np.isnan(values)]
+    counts, edges = np.histogram(values, bins = bins)
+    return {"edges": edges.tolist(), "counts": counts.tolist(), "total": int(counts.sum())}
+
+def get_density(values_x, values_y, bins) :
+    keep = ~(np.isnan(values_x) | np.isnan(values_y))
+    counts, x_edges, y_edges = np.histogram2d(values_x[keep], values_y[keep], bins = bins)
+    return {"x_edges": x_edges.tolist(), "y_edges": y_edges.tolist(),
+            "counts": counts.astype(int).tolist(), "total": int(counts.sum())}
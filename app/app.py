@@ -1,70 +1,933 @@
-﻿from flask import Flask, request, jsonify
+﻿from flask import Flask, request, jsonify, abort, Response, stream_with_context, g
 import pandas as pd
 import numpy as np
 import pickle
-import shap
+import os
+import functools
+import time
+import hmac
+import logging
 import lightgbm as lgb
+from shap_cache import cache_key, load_shap_cache, PrecomputedExplainer
+from explainers import build_explainer
+from snapshot import load_table
+from compact import CompactFrame, downcast
+from batching import MicroBatcher
+from flat_forest import FlatForest
+from families import FamilyIndex
+from bulk import read_chunks, iterate_scores, to_ndjson, CHUNK_SIZE, MAX_CHUNK_SIZE
+from metrics import Metrics, describe_explainer
+from registry import ModelRegistry, ModelSlot
+from portfolio import ScoreDistribution, score_all, MAX_THRESHOLDS
+from deadline import ExplanationQueue
+from drift import DriftMonitor
+from encoding import NumpyJSONProvider, negotiate, encode, compress_response, JSON
+from pages import select_page, encode_columns, encode_families, PAGE_SIZE, MAX_PAGE_SIZE
+from neighbours import NeighbourIndex, N_PROBE, MAX_NEIGHBOURS
+from whatif import sample_positions, quantile_grid, make_grid, ice_curves, \
+    MAX_GRID_SIZE, MAX_GRID_POINTS
+from aggregates import filter_values, get_histogram, get_density, MAX_BINS, CACHE_SIZE
 
 CSV_FILE_NAME = "data.csv"
 CLASSIFIER_FILE_NAME = "classifier.pkl"
+DISPLAY_CSV_FILE_NAME = "display_data.csv"
+CLIENT_IDS_FILE_NAME = "client_ids.csv"
 ACCEPTANCE = 0.5
+SHAP_PRECOMPUTE = os.environ.get("SHAP_PRECOMPUTE", "0") == "1"
+SHAP_CACHE_DIR = os.environ.get("SHAP_CACHE_DIR", "shap_cache")
+EXPLAINER_ENGINE = os.environ.get("EXPLAINER_ENGINE", "interventional")
+SHAP_BACKGROUND = os.environ.get("SHAP_BACKGROUND", "default")
+SHAP_BACKGROUND_SIZE = int(os.environ.get("SHAP_BACKGROUND_SIZE", "100"))
+COMPACT_DATA = os.environ.get("COMPACT_DATA", "0") == "1"
+LGBM_N_JOBS = os.environ.get("LGBM_N_JOBS")
+PREDICT_BATCHING = os.environ.get("PREDICT_BATCHING", "0") == "1"
+BATCH_MAX_WAIT_MS = float(os.environ.get("BATCH_MAX_WAIT_MS", "5"))
+BATCH_MAX_SIZE = int(os.environ.get("BATCH_MAX_SIZE", "32"))
+PREDICTION_ENGINE = os.environ.get("PREDICTION_ENGINE", "lightgbm")
+IMPORTANCE_TYPES = ["split", "gain", "shap"]
+IMPORTANCE_CHUNK_SIZE = 4096
+MAX_BATCH_SIZE = 10000
+METRICS_ENABLED = os.environ.get("METRICS", "1") == "1"
+METRICS_DIR = os.environ.get("METRICS_DIR")
+MODEL_REGISTRY = os.environ.get("MODEL_REGISTRY")
+MODEL_WATCH_INTERVAL = float(os.environ.get("MODEL_WATCH_INTERVAL", "30"))
+ADMIN_TOKEN = os.environ.get("ADMIN_TOKEN")
+LATENCY_BUDGET_MS = float(os.environ.get("LATENCY_BUDGET_MS", "0"))
+EXPLANATION_QUEUE_SIZE = int(os.environ.get("EXPLANATION_QUEUE_SIZE", "32"))
+DRIFT_MONITORING = os.environ.get("DRIFT_MONITORING", "1") == "1"
+DRIFT_DIR = os.environ.get("DRIFT_DIR")
+COMPRESSION_LEVEL = int(os.environ.get("COMPRESSION_LEVEL", "5"))
+NEIGHBOUR_PROBES = int(os.environ.get("NEIGHBOUR_PROBES", str(N_PROBE)))
 
 
-def load_data(csv_file_name, classifier_file_name) :
-    df = pd.read_csv(csv_file_name)
+def worker_count() :
+    # Nombre effectif de workers, exporté par gunicorn.conf.py au démarrage du
+    # maître (après --workers) ; un seul processus hors de gunicorn
+    return int(os.environ.get("WEB_CONCURRENCY", "1"))
+
+def load_data(csv_file_name, classifier_file_name, engine = "interventional",
+              background = "default", background_size = 100) :
+    df = load_table(csv_file_name)
     with open(classifier_file_name, "rb") as file :
         classifier = pickle.load(file)
-    explainer = shap.Explainer(classifier, df)
+    explainer = build_explainer(classifier, df, engine, background, background_size)
     return df, classifier, explainer
 
-def read_request(data, df) :
-    index = data["selected_index"]
+def index_clients(client_ids) :
+    positions = {int(client_id) : position for position, client_id in enumerate(client_ids)}
+    if len(positions) != len(client_ids) :
+        raise ValueError("Client identifiers must be unique")
+    return positions
+
+def check_client_ids(ids_file_name, client_ids) :
+    # data.csv n'a pas de colonne SK_ID_CURR : ses identifiants, ligne par
+    # ligne, sont dans un fichier à part qui doit suivre display_data.csv
+    if ids_file_name is None or not os.path.exists(ids_file_name) :
+        raise ValueError("Missing client identifiers file for the model data")
+    model_ids = pd.read_csv(ids_file_name, usecols = ["SK_ID_CURR"])["SK_ID_CURR"].to_numpy()
+    if not np.array_equal(model_ids, client_ids) :
+        raise ValueError(f"{ids_file_name} does not match the client order of "
+                         f"{DISPLAY_CSV_FILE_NAME}")
+
+def is_index(value) :
+    return isinstance(value, int) and not isinstance(value, bool)
+
+def find_client(data, client_positions) :
+    if "client_id" not in data or client_positions is None :
+        return data.get("selected_index")
+    if data["client_id"] not in client_positions :
+        abort(404, f"Unknown client: {data['client_id']}")
+    return client_positions[data["client_id"]]
+
+def find_position(data, size, client_positions = None) :
+    # Position vérifiée avant toute lecture : un index hors du tableau
+    # donne 404, comme un identifiant inconnu
+    position = find_client(data, client_positions)
+    if not is_index(position) :
+        abort(400, "selected_index must be an integer")
+    if not 0 <= position < size :
+        abort(404, f"Unknown client position: {position}")
+    return position
+
+def read_max_display(data) :
+    max_display = data.get("shap_max_display")
+    if not isinstance(max_display, int) or isinstance(max_display, bool) or max_display < 0 :
+        abort(400, "shap_max_display must be a non-negative integer")
+    return max_display
+
+def read_request(data, df, client_positions = None) :
+    index = find_position(data, len(df), client_positions)
     row = df.iloc[index : index + 1]
-    max_display = data["shap_max_display"]
+    max_display = read_max_display(data)
     return row, max_display
 
+def read_batch_request(data, df, client_positions = None) :
+    if "client_ids" in data and client_positions is not None :
+        if not isinstance(data["client_ids"], list) or len(data["client_ids"]) > MAX_BATCH_SIZE :
+            abort(400, f"client_ids must be a list of at most {MAX_BATCH_SIZE} identifiers")
+        data = dict(data, selected_indices = [find_client({"client_id": client_id}, client_positions)
+                                              for client_id in data["client_ids"]])
+    items = data.get("selected_indices")
+    if not isinstance(items, list) :
+        abort(400, "selected_indices must be a list")
+    # Taille du lot vérifiée avant de développer les intervalles
+    ranges = []
+    size = 0
+    for item in items :
+        if isinstance(item, dict) :
+            start, stop = item.get("start"), item.get("stop")
+            if not is_index(start) or not is_index(stop) or not 0 <= start <= stop <= len(df) :
+                abort(400, f"Invalid range: {item}")
+        elif is_index(item) and 0 <= item < len(df) :
+            start, stop = item, item + 1
+        else :
+            abort(400, f"Invalid index: {item}")
+        size += stop - start
+        if size > MAX_BATCH_SIZE :
+            abort(400, f"A batch is limited to {MAX_BATCH_SIZE} rows")
+        ranges.append(np.arange(start, stop))
+    # shap et LightGBM refusent un tableau vide
+    if size == 0 :
+        abort(400, "A batch must select at least one row")
+    rows = df.iloc[np.concatenate(ranges)]
+    max_display = read_max_display(data)
+    return rows, max_display
+
+def read_score_request(data, feature_positions, defaults) :
+    # Vecteur dense dans l'ordre du modèle, ou dictionnaire nom -> valeur
+    # complété par les valeurs par défaut
+    values = data.get("features")
+    if isinstance(values, list) :
+        if len(values) != len(defaults) :
+            abort(400, f"Expected {len(defaults)} feature values, got {len(values)}")
+        items = enumerate(values)
+    elif isinstance(values, dict) :
+        unknown = [name for name in values if name not in feature_positions]
+        if unknown :
+            abort(400, f"Unknown features: {', '.join(unknown)}")
+        items = ((feature_positions[name], value) for name, value in values.items())
+    else :
+        abort(400, "features must be a list or an object")
+    vector = defaults.copy()
+    for position, value in items :
+        if value is not None and (isinstance(value, bool) or not isinstance(value, (int, float))) :
+            abort(400, f"Feature values must be numbers or null, got {value!r}")
+        vector[position] = np.nan if value is None else value
+    return vector[np.newaxis], read_max_display(data)
+
+def read_what_if_request(data, feature_positions, sample) :
+    # Une ou deux variables ; grille explicite ou quantiles de l'échantillon
+    features = data.get("features")
+    if isinstance(features, str) :
+        features = [features]
+    if not isinstance(features, list) or not 1 <= len(features) <= 2 \
+            or len(set(features)) != len(features) :
+        abort(400, "features must list one or two distinct features")
+    for feature in features :
+        if feature not in feature_positions :
+            abort(400, f"Unknown feature: {feature}")
+    positions = [feature_positions[feature] for feature in features]
+    grid = data.get("grid")
+    if grid is None :
+        grid_size = data.get("grid_size", 20)
+        if not isinstance(grid_size, int) or not 2 <= grid_size <= MAX_GRID_SIZE :
+            abort(400, f"grid_size must be an integer between 2 and {MAX_GRID_SIZE}")
+        axes = [quantile_grid(sample[:, position], grid_size) for position in positions]
+    else :
+        if len(features) == 1 and isinstance(grid, list) and grid \
+                and not isinstance(grid[0], list) :
+            grid = [grid]
+        if not isinstance(grid, list) or len(grid) != len(features) :
+            abort(400, "grid must give one list of values per feature")
+        for values in grid :
+            if not isinstance(values, list) or not 1 <= len(values) <= MAX_GRID_SIZE \
+                    or not all(isinstance(value, (int, float)) and not isinstance(value, bool)
+                               for value in values) :
+                abort(400, f"Each grid axis must hold 1 to {MAX_GRID_SIZE} numbers")
+        axes = [np.array(values, dtype = np.float64) for values in grid]
+    if np.prod([len(axis) for axis in axes]) > MAX_GRID_POINTS :
+        abort(400, f"The grid cannot exceed {MAX_GRID_POINTS} points")
+    return features, positions, axes
+
+def read_portfolio_request(data, families) :
+    thresholds = data.get("thresholds", [ACCEPTANCE])
+    if not isinstance(thresholds, list) :
+        thresholds = [thresholds]
+    if not 1 <= len(thresholds) <= MAX_THRESHOLDS or not all(
+            isinstance(threshold, (int, float)) and not isinstance(threshold, bool)
+            and 0 <= threshold <= 1 for threshold in thresholds) :
+        abort(400, f"thresholds must hold 1 to {MAX_THRESHOLDS} numbers between 0 and 1")
+    selected = data.get("families", list(families))
+    for family in selected :
+        if family not in families :
+            abort(400, f"Unknown family: {family}")
+    bins = data.get("bins")
+    if bins is not None and (not isinstance(bins, int) or not 1 <= bins <= MAX_BINS) :
+        abort(400, f"bins must be an integer between 1 and {MAX_BINS}")
+    return np.array(thresholds, dtype = np.float64), selected, bins
+
+def read_list_arg(args, key) :
+    # Paramètre répété (?columns=a&columns=b) ou séparé par des virgules
+    return [value for values in args.getlist(key) for value in values.split(",") if value]
+
+def read_data_request(args, columns, family_index) :
+    offset = args.get("offset", 0, type = int)
+    limit = args.get("limit", PAGE_SIZE, type = int)
+    if offset is None or offset < 0 or limit is None or not 0 <= limit <= MAX_PAGE_SIZE :
+        abort(400, f"offset must be a positive integer and limit between 0 and {MAX_PAGE_SIZE}")
+    selected = read_list_arg(args, "columns") if "columns" in args else list(columns)
+    for column in selected :
+        if column not in columns :
+            abort(400, f"Unknown column: {column}")
+    families = read_list_arg(args, "families")
+    for family in families :
+        if family not in family_index.members :
+            abort(400, f"Unknown family: {family}")
+    filters = sorted(set(read_list_arg(args, "filter")))
+    for column in filters :
+        if column not in family_index.rows :
+            abort(400, f"Unknown filter: {column}")
+    return offset, limit, selected, families, filters
+
+def read_bulk_request(args) :
+    # Taille de bloc ramenée dans [1, MAX_CHUNK_SIZE]
+    chunk_size = args.get("chunk_size", CHUNK_SIZE, type = int)
+    chunk_size = min(max(chunk_size, 1), MAX_CHUNK_SIZE)
+    shap_max_display = max(args.get("shap_max_display", 0, type = int), 0)
+    return chunk_size, shap_max_display
+
+def read_similar_request(data, spaces, columns) :
+    k = data.get("k", 10)
+    if not isinstance(k, int) or not 1 <= k <= MAX_NEIGHBOURS :
+        abort(400, f"k must be an integer between 1 and {MAX_NEIGHBOURS}")
+    space = data.get("space", "features")
+    if space not in spaces :
+        abort(400, f"Unknown space: {space} (available: {', '.join(spaces)})")
+    features = data.get("features", [])
+    if not isinstance(features, list) or not all(isinstance(feature, str) for feature in features) :
+        abort(400, "features must be a list of column names")
+    for feature in features :
+        if feature not in columns :
+            abort(400, f"Unknown feature: {feature}")
+    return k, space, features
+
+def get_similar(positions, distances, scores, client_ids, display_df, features, acceptance) :
+    # Pas de cible observée dans les données : le résultat d'un client est
+    # la décision du modèle
+    neighbours = []
+    for position, distance in zip(positions.tolist(), distances.tolist()) :
+        neighbour = {"client_id": int(client_ids[position]), "distance": distance,
+                     "pred_proba": float(scores[position]),
+                     "pred_binary": int(scores[position] > acceptance)}
+        for feature in features :
+            value = display_df[feature].iat[position].item()
+            neighbour[feature] = None if value != value else value
+        neighbours.append(neighbour)
+    return neighbours
+
+def get_what_if(row, positions, axes, predictor, output) :
+    grid = make_grid(axes)
+    ice = ice_curves(row, positions, grid, predictor)[0]
+    shape = [len(axis) for axis in axes]
+    output["grid"] = [axis.tolist() for axis in axes]
+    output["ice"] = ice.reshape(shape).tolist()
+    output["current_values"] = row[0, positions].tolist()
+
 def get_shap_values(row, explainer, shap_max_display, output) :
+    # Valeurs laissées en tableaux NumPy, converties par l'encodeur de la réponse
     shap_values = explainer.shap_values(row)
     indices = np.argsort(np.abs(shap_values[0]))[::-1][:shap_max_display]
     output["top_features"] = row.columns[indices].tolist()
-    output["top_features_values"] = row.values[0][indices].tolist()
-    output["top_shap_values"] = shap_values[0][indices].tolist()
+    output["top_features_values"] = row.values[0][indices]
+    output["top_shap_values"] = shap_values[0][indices]
+
+def get_vector_shap_values(vector, features, explainer, shap_max_display, output) :
+    # Une valeur soumise peut tomber exactement sur un seuil de LightGBM :
+    # le test d'additivité de shap échouerait sans que l'explication soit fausse
+    shap_values = np.asarray(explainer.shap_values(vector, check_additivity = False))
+    indices = np.argsort(np.abs(shap_values[0]))[::-1][:shap_max_display]
+    output["top_features"] = features[indices].tolist()
+    # Une valeur manquante soumise reste NaN : null en JSON
+    output["top_features_values"] = vector[0][indices]
+    output["top_shap_values"] = shap_values[0][indices]
+
+def explain(row, explainer, shap_max_display) :
+    output = {}
+    get_shap_values(row, explainer, shap_max_display, output)
+    return output
+
+def get_batch_shap_values(rows, explainer, shap_max_display, outputs) :
+    shap_values = np.asarray(explainer.shap_values(rows))
+    indices = np.argsort(np.abs(shap_values), axis = 1)[:, ::-1]
+    indices = indices[:, :shap_max_display]
+    features = rows.columns.to_numpy()[indices]
+    values = np.take_along_axis(rows.to_numpy(), indices, axis = 1)
+    top_shap_values = np.take_along_axis(shap_values, indices, axis = 1)
+    for i, output in enumerate(outputs) :
+        output["top_features"] = features[i].tolist()
+        output["top_features_values"] = values[i]
+        output["top_shap_values"] = top_shap_values[i]
 
-def get_prediction(row, classifier, acceptance, output) :
+def get_prediction(row, classifier, acceptance, output, drift = None) :
     proba = classifier.predict_proba(row)[0, 1]
+    if drift is not None :
+        drift.update(row)
     output["pred_proba"] = proba
     output["acceptance"] = acceptance
     output["pred_binary"] = int(proba > acceptance)
 
+def get_batch_prediction(rows, classifier, acceptance, outputs, drift = None) :
+    probas = classifier.predict_proba(rows)[:, 1]
+    if drift is not None :
+        drift.update(rows)
+    binaries = (probas > acceptance).astype(int)
+    for i, output in enumerate(outputs) :
+        output["pred_proba"] = float(probas[i])
+        output["acceptance"] = acceptance
+        output["pred_binary"] = int(binaries[i])
+
+def score_batch(items, df, explainer, classifier, acceptance, drift = None) :
+    rows = df.iloc[[index for index, _ in items]]
+    shap_max_display = max(max_display for _, max_display in items)
+    outputs = [{} for _ in items]
+    get_batch_shap_values(rows, explainer, shap_max_display, outputs)
+    get_batch_prediction(rows, classifier, acceptance, outputs, drift)
+    for output, (_, max_display) in zip(outputs, items) :
+        for key in ["top_features", "top_features_values", "top_shap_values"] :
+            output[key] = output[key][:max_display]
+    return outputs
+
+def score_model_batch(items, acceptance) :
+    # Requêtes regroupées par modèle : pendant un remplacement, un même lot
+    # peut contenir des requêtes reçues avant et après la bascule
+    outputs = [None] * len(items)
+    groups = {}
+    for i, (model, _, _) in enumerate(items) :
+        groups.setdefault(id(model), (model, []))[1].append(i)
+    for model, positions in groups.values() :
+        results = score_batch([items[i][1 :] for i in positions], model.df, model.explainer,
+                              model.predictor, acceptance, model.drift)
+        for i, result in zip(positions, results) :
+            outputs[i] = result
+    return outputs
+
+def score_rows(rows, explainer, classifier, acceptance, shap_max_display = 0, drift = None) :
+    outputs = [{} for _ in range(len(rows))]
+    if shap_max_display :
+        get_batch_shap_values(rows, explainer, shap_max_display, outputs)
+    get_batch_prediction(rows, classifier, acceptance, outputs, drift)
+    return outputs
+
 def get_feature_importance(classifier, df) :
     importances = classifier.feature_importances_
     output = pd.DataFrame({"feature": df.columns, "importance": importances})
     return output.sort_values(by = "importance", ascending = False)
 
+def compute_feature_importances(classifier, df, shap_matrix = None) :
+    booster = classifier.booster_
+    values = {importance_type : booster.feature_importance(importance_type)
+              for importance_type in ["split", "gain"]}
+    if shap_matrix is None :
+        # Contributions exactes calculées par LightGBM, bloc par bloc
+        total = np.zeros(df.shape[1])
+        for start in range(0, len(df), IMPORTANCE_CHUNK_SIZE) :
+            chunk = np.asarray(df.iloc[start : start + IMPORTANCE_CHUNK_SIZE], dtype = np.float64)
+            contributions = booster.predict(chunk, pred_contrib = True)
+            total += np.abs(contributions[:, :-1]).sum(axis = 0)
+        values["shap"] = total / len(df)
+    else :
+        values["shap"] = np.abs(shap_matrix).mean(axis = 0)
+    importances = {}
+    for importance_type, importance in values.items() :
+        order = np.argsort(-importance, kind = "stable")
+        importances[importance_type] = (np.asarray(df.columns)[order], importance[order])
+    return importances
+
+class Model :
+
+    def __init__(self, version, df, classifier, predictor, explainer, score_explainer,
+                 importances, feature_defaults, distribution, neighbours, drift,
+                 memory_usage = None) :
+        self.version = version
+        self.df = df
+        self.classifier = classifier
+        self.predictor = predictor
+        self.explainer = explainer
+        self.score_explainer = score_explainer
+        self.importances = importances
+        # Schéma du modèle pour les vecteurs soumis à /api/score
+        self.feature_names = np.array(classifier.booster_.feature_name())
+        self.feature_positions = {name : i for i, name in enumerate(self.feature_names)}
+        self.feature_defaults = feature_defaults
+        self.distribution = distribution
+        self.neighbours = neighbours
+        self.drift = drift
+        # Mémoire du tableau avant et après compaction (COMPACT_DATA)
+        self.memory_usage = memory_usage
+
+def load_model(csv_file_name, classifier_file_name, version = None, client_ids = None,
+               family_index = None, ids_file_name = None) :
+    if client_ids is not None :
+        check_client_ids(ids_file_name, client_ids)
+    df, classifier, explainer = load_data(csv_file_name, classifier_file_name,
+                                          EXPLAINER_ENGINE, SHAP_BACKGROUND,
+                                          SHAP_BACKGROUND_SIZE)
+    if client_ids is not None and len(df) != len(client_ids) :
+        raise ValueError(f"{csv_file_name} has {len(df)} rows, expected {len(client_ids)}")
+    if LGBM_N_JOBS is not None :
+        classifier.set_params(n_jobs = int(LGBM_N_JOBS))
+    predictor = classifier
+    if PREDICTION_ENGINE == "flat" :
+        predictor = FlatForest.from_booster(classifier.booster_)
+    score_explainer = explainer
+    if SHAP_PRECOMPUTE :
+        key = cache_key([csv_file_name, classifier_file_name], EXPLAINER_ENGINE,
+                        SHAP_BACKGROUND, SHAP_BACKGROUND_SIZE)
+        shap_matrix = load_shap_cache(df, explainer, SHAP_CACHE_DIR, key)
+        explainer = PrecomputedExplainer(explainer, shap_matrix, df.index)
+    importances = compute_feature_importances(
+        classifier, df, shap_matrix if SHAP_PRECOMPUTE else None)
+    version = version or cache_key([csv_file_name, classifier_file_name])
+    # Les vecteurs soumis à /api/score ne correspondent à aucune ligne du cache SHAP
+    feature_names = classifier.booster_.feature_name()
+    feature_defaults = df[feature_names].median().to_numpy(dtype = np.float64)
+    # Scores de tout le portefeuille, recalculés à chaque chargement de modèle
+    values = df[feature_names].to_numpy(dtype = np.float64)
+    scores = score_all(classifier, values)
+    distribution = ScoreDistribution(scores, family_index)
+    # Index des clients similaires, reconstruit avec chaque modèle
+    neighbours = {"features": NeighbourIndex(values, n_probe = NEIGHBOUR_PROBES)}
+    if SHAP_PRECOMPUTE :
+        neighbours["shap"] = NeighbourIndex(shap_matrix, n_probe = NEIGHBOUR_PROBES,
+                                            standardize = False)
+    # Statistiques de référence pour le suivi de la population évaluée
+    drift = None
+    if DRIFT_MONITORING :
+        drift = DriftMonitor(values, feature_names,
+                             directory = DRIFT_DIR and os.path.join(DRIFT_DIR, version))
+    del values
+    memory_usage = None
+    if COMPACT_DATA :
+        memory_before = df.memory_usage(deep = True).sum()
+        df = CompactFrame(df)
+        memory_usage = (memory_before, df.memory_usage())
+    model = Model(version, df, classifier, predictor, explainer, score_explainer,
+                  importances, feature_defaults, distribution, neighbours, drift,
+                  memory_usage)
+    warm_up(model)
+    return model
+
+def warm_up(model) :
+    # Premier appel de chaque chemin de calcul avant de servir des requêtes.
+    # Le vecteur de /api/score est pris d'une ligne réelle : une médiane peut
+    # tomber sur un seuil de LightGBM, où shap rejette son explication
+    row = model.df.iloc[0 : 1]
+    get_shap_values(row, model.explainer, 10, {})
+    get_prediction(row, model.predictor, ACCEPTANCE, {})
+    vector = row[model.feature_names].to_numpy(dtype = np.float64)
+    get_vector_shap_values(vector, model.feature_names, model.score_explainer, 10, {})
+    get_prediction(vector, model.predictor, ACCEPTANCE, {})
+
 def create_app() :
 
-    df, classifier, explainer = load_data(CSV_FILE_NAME, CLASSIFIER_FILE_NAME)
-    
+    display_df = downcast(load_table(DISPLAY_CSV_FILE_NAME))
+    family_index = FamilyIndex(display_df)
+    display_version = cache_key([DISPLAY_CSV_FILE_NAME])
+    client_ids = display_df["SK_ID_CURR"].to_numpy()
+    client_positions = index_clients(client_ids)
+
+    registry = ModelRegistry(MODEL_REGISTRY) if MODEL_REGISTRY else None
+    def load_version(version) :
+        # Sans données propres, la version reprend celles de l'application
+        classifier_file_name, csv_file_name, ids_file_name = registry.artifacts(version)
+        if csv_file_name is None :
+            csv_file_name, ids_file_name = CSV_FILE_NAME, CLIENT_IDS_FILE_NAME
+        return load_model(csv_file_name, classifier_file_name, version, client_ids,
+                          family_index, ids_file_name)
+    if registry is not None and registry.current() is not None :
+        model = load_version(registry.current())
+    else :
+        model = load_model(CSV_FILE_NAME, CLASSIFIER_FILE_NAME, client_ids = client_ids,
+                           family_index = family_index, ids_file_name = CLIENT_IDS_FILE_NAME)
+
+    @functools.lru_cache(maxsize = CACHE_SIZE)
+    def histogram(feature, filters, bins) :
+        return get_histogram(filter_values(display_df, feature, family_index, filters), bins)
+
+    @functools.lru_cache(maxsize = CACHE_SIZE)
+    def density(feature_x, feature_y, filters, bins) :
+        return get_density(filter_values(display_df, feature_x, family_index, filters),
+                           filter_values(display_df, feature_y, family_index, filters), bins)
+
+    def read_aggregate_request(data, features) :
+        # Un filtre est une colonne one-hot ou une liste de colonnes (intersection)
+        filter_value = data.get("filter")
+        filters = [filter_value] if isinstance(filter_value, str) else filter_value or []
+        bins = data.get("bins", 50)
+        for feature in features :
+            if feature not in display_df.columns :
+                abort(400, f"Unknown feature: {feature}")
+        for column in filters :
+            if column not in family_index.rows :
+                abort(400, f"Unknown filter: {column}")
+        if not isinstance(bins, int) or not 1 <= bins <= MAX_BINS :
+            abort(400, f"bins must be an integer between 1 and {MAX_BINS}")
+        return filter_value, tuple(sorted(set(filters))), bins
+
+    batcher = None
+    if PREDICT_BATCHING :
+        batcher = MicroBatcher(lambda items : score_model_batch(items, ACCEPTANCE),
+                               BATCH_MAX_WAIT_MS / 1000, BATCH_MAX_SIZE)
+
+    # Mode dégradé : l'explication est calculée à part, dans une file bornée
+    explanations = ExplanationQueue(EXPLANATION_QUEUE_SIZE) if LATENCY_BUDGET_MS > 0 else None
+
     app = Flask(__name__)
+    app.json = NumpyJSONProvider(app)
+    app.logger.setLevel(logging.INFO)
+
+    @functools.lru_cache(maxsize = 4)
+    def population_sample(model) :
+        # Échantillon fixe de clients pour la dépendance partielle, par modèle
+        rows = model.df.iloc[sample_positions(len(model.df))]
+        return rows[model.feature_names].to_numpy(dtype = np.float64)
+
+    @functools.lru_cache(maxsize = CACHE_SIZE)
+    def partial_dependence(model, positions, axes) :
+        sample = population_sample(model)
+        grid = make_grid([np.array(axis) for axis in axes])
+        curves = ice_curves(sample, list(positions), grid, model.predictor)
+        return curves.mean(axis = 0).reshape([len(axis) for axis in axes]).tolist()
+
+    metrics = Metrics(METRICS_ENABLED, METRICS_DIR)
+    def describe_model(model) :
+        metrics.info.update(engine = EXPLAINER_ENGINE, prediction_engine = PREDICTION_ENGINE,
+                            explainer = describe_explainer(model.explainer),
+                            model_version = model.version)
+        if model.memory_usage is not None :
+            memory_before, memory_after = model.memory_usage
+            app.logger.info(f"Compact client table ({model.version}): {memory_before} -> "
+                            f"{memory_after} bytes")
+    describe_model(model)
+    def on_swap(model) :
+        # Les caches de la dépendance partielle sont indexés par modèle : vidés
+        # à chaque bascule, ils ne retiennent pas les modèles retirés
+        population_sample.cache_clear()
+        partial_dependence.cache_clear()
+        describe_model(model)
+    slot = ModelSlot(load_version, model, on_swap)
+    metrics.add_cache("histogram", lambda : histogram.cache_info()[:2])
+    metrics.add_cache("density", lambda : density.cache_info()[:2])
+    metrics.add_cache("partial_dependence", lambda : partial_dependence.cache_info()[:2])
+    if explanations is not None :
+        metrics.add_queue("explanations", explanations.stats)
+    if SHAP_PRECOMPUTE :
+        metrics.add_cache("shap", lambda : (slot.model.explainer.hits,
+                                            slot.model.explainer.misses))
+
+    @app.before_request
+    def select_model() :
+        # Chaque requête est servie en entier par le modèle courant à son arrivée
+        if registry is not None and MODEL_WATCH_INTERVAL > 0 :
+            slot.watch(registry, MODEL_WATCH_INTERVAL)
+        g.model = slot.model
+
+    @app.after_request
+    def add_model_version(response) :
+        response.headers["X-Model-Version"] = g.model.version if "model" in g \
+            else slot.model.version
+        return response
+    if METRICS_ENABLED :
+        @app.before_request
+        def start_request() :
+            g.request_start = time.perf_counter()
+            metrics.start_request()
+
+        @app.after_request
+        def record_request(response) :
+            if "request_start" in g :
+                metrics.record_request(request.endpoint or "none", response.status_code,
+                                       time.perf_counter() - g.request_start)
+            return response
+
+        @app.teardown_request
+        def end_request(error = None) :
+            if "request_start" in g :
+                metrics.end_request()
+
+        @app.route("/metrics", methods = ["GET"])
+        def export_metrics() :
+            return Response(metrics.render(), mimetype = "text/plain; version=0.0.4")
+
+    def respond(output, table = None) :
+        # Encodage choisi d'après l'en-tête Accept : JSON par défaut,
+        # MessagePack, ou Arrow IPC pour les résultats en table
+        mimetype = negotiate(request.accept_mimetypes, table is not None)
+        response = jsonify(output) if mimetype == JSON \
+            else Response(encode(output, mimetype, table), mimetype = mimetype)
+        response.vary.add("Accept")
+        return response
+
+    @app.after_request
+    def compress(response) :
+        return compress_response(response, request.accept_encodings, COMPRESSION_LEVEL)
+
+    @app.route("/api/version", methods = ["GET"])
+    def version() :
+        return jsonify({"model_version": g.model.version})
+
+    def check_admin() :
+        token = request.headers.get("Authorization", "").removeprefix("Bearer ")
+        if not ADMIN_TOKEN or not hmac.compare_digest(token, ADMIN_TOKEN) :
+            abort(403)
+
+    if registry is not None :
+        @app.route("/api/admin/models", methods = ["GET"])
+        def list_models() :
+            check_admin()
+            return jsonify({"current": slot.model.version, "loading": slot.loading,
+                            "error": slot.error, "versions": registry.versions()})
+
+        @app.route("/api/admin/models", methods = ["POST"])
+        def activate_model() :
+            # Chargement, explainer et préchauffage en arrière-plan, puis bascule ;
+            # le fichier CURRENT, écrit seulement après un chargement réussi,
+            # propage le choix aux autres workers. Un échec est signalé par
+            # GET /api/admin/models (« error »)
+            check_admin()
+            if MODEL_WATCH_INTERVAL <= 0 and worker_count() > 1 :
+                abort(409, "MODEL_WATCH_INTERVAL must be enabled to swap models "
+                      "with several workers")
+            version = (request.get_json(silent = True) or {}).get("version") \
+                or registry.versions()[-1]
+            if version not in registry.versions() :
+                abort(404, f"Unknown model version: {version}")
+            if not slot.swap_in_background(version, registry.activate) :
+                abort(409, f"Model version {slot.loading} is already loading")
+            return jsonify({"current": slot.model.version, "loading": version}), 202
+
+    def submit_explanation(model, data) :
+        position = find_position(data, len(model.df), client_positions)
+        row, shap_max_display = read_request(data, model.df, client_positions)
+        key = (model.version, position, shap_max_display)
+        return row, explanations.submit(key, functools.partial(
+            explain, row, model.explainer, shap_max_display))
 
     @app.route("/api/predict", methods = ["POST"])
     def predict() :
-        row, shap_max_display = read_request(request.json, df)
+        timer = metrics.timer()
+        model = g.model
+        data = request.json
+        if explanations is not None :
+            # Le score d'abord ; l'explication seulement si elle tient dans
+            # le budget, sinon elle sera servie par /api/explanation
+            deadline = time.perf_counter() + LATENCY_BUDGET_MS / 1000
+            row, future = submit_explanation(model, data)
+            timer.mark("read_request")
+            output = {}
+            get_prediction(row, model.predictor, ACCEPTANCE, output, model.drift)
+            timer.mark("predict_proba")
+            status, explanation = explanations.wait(future, deadline - time.perf_counter())
+            output.update(explanation or {}, explanation_status = status)
+            timer.mark("shap")
+            response = respond(output)
+            timer.mark("encode")
+            return metrics.record_stages("predict", timer, response)
+        if batcher is not None :
+            # Un index invalide ne doit pas faire échouer le lot des autres requêtes
+            item = (model, find_position(data, len(model.df), client_positions),
+                    read_max_display(data))
+            output = batcher.submit(item).result()
+            timer.mark("batch")
+            response = respond(output)
+            timer.mark("encode")
+            return metrics.record_stages("predict", timer, response)
+        row, shap_max_display = read_request(data, model.df, client_positions)
+        timer.mark("read_request")
         output = {}
-        get_shap_values(row, explainer, shap_max_display, output)
-        get_prediction(row, classifier, ACCEPTANCE, output)
-        return jsonify(output)
-    
-    @app.route("/api/importance", methods = ["POST"])
+        get_shap_values(row, model.explainer, shap_max_display, output)
+        timer.mark("shap")
+        get_prediction(row, model.predictor, ACCEPTANCE, output, model.drift)
+        timer.mark("predict_proba")
+        response = respond(output)
+        timer.mark("encode")
+        return metrics.record_stages("predict", timer, response)
+
+    if explanations is not None :
+        @app.route("/api/explanation", methods = ["POST"])
+        def explanation() :
+            # Suivi d'une explication en attente : même corps que /api/predict
+            model = g.model
+            data = request.json
+            if data.get("model_version", model.version) != model.version :
+                abort(409, f"Model version changed to {model.version}")
+            _, future = submit_explanation(model, data)
+            status, explanation = explanations.wait(future, LATENCY_BUDGET_MS / 1000)
+            output = dict(explanation or {}, explanation_status = status,
+                          model_version = model.version)
+            if status == "complete" :
+                return respond(output)
+            response = respond(output)
+            if status == "failed" :
+                response.status_code = 500
+                return response
+            response.status_code = 202 if status == "pending" else 503
+            response.headers["Retry-After"] = "1"
+            return response
+
+    @app.route("/api/predict_batch", methods = ["POST"])
+    def predict_batch() :
+        timer = metrics.timer()
+        model = g.model
+        rows, shap_max_display = read_batch_request(request.json, model.df, client_positions)
+        timer.mark("read_request")
+        outputs = [{} for _ in range(len(rows))]
+        get_batch_shap_values(rows, model.explainer, shap_max_display, outputs)
+        timer.mark("shap")
+        get_batch_prediction(rows, model.predictor, ACCEPTANCE, outputs, model.drift)
+        timer.mark("predict_proba")
+        response = respond({"predictions": outputs}, table = "predictions")
+        timer.mark("encode")
+        return metrics.record_stages("predict_batch", timer, response)
+
+    @app.route("/api/score", methods = ["POST"])
+    def score() :
+        timer = metrics.timer()
+        model = g.model
+        vector, shap_max_display = read_score_request(request.json, model.feature_positions,
+                                                      model.feature_defaults)
+        timer.mark("read_request")
+        output = {}
+        get_vector_shap_values(vector, model.feature_names, model.score_explainer,
+                               shap_max_display, output)
+        timer.mark("shap")
+        get_prediction(vector, model.predictor, ACCEPTANCE, output, model.drift)
+        timer.mark("predict_proba")
+        response = respond(output)
+        timer.mark("encode")
+        return metrics.record_stages("score", timer, response)
+
+    @app.route("/api/portfolio", methods = ["POST"])
+    def portfolio() :
+        # Seuils d'acceptation appliqués aux scores précalculés du portefeuille
+        distribution = g.model.distribution
+        data = request.json
+        thresholds, families, bins = read_portfolio_request(data, distribution.families)
+        output = {"thresholds": thresholds.tolist()}
+        output.update(distribution.summary(thresholds, families))
+        if bins is not None :
+            output["distribution"] = distribution.histogram(bins)
+        if "client_id" in data or "selected_index" in data :
+            position = find_position(data, len(distribution.scores), client_positions)
+            score = distribution.scores[position]
+            output["client"] = {"pred_proba": float(score),
+                                "percentile": distribution.percentile(score)}
+        return respond(output)
+
+    @app.route("/api/similar", methods = ["POST"])
+    def similar() :
+        # Clients les plus proches, dans l'espace des variables standardisées
+        # ou dans celui des valeurs SHAP
+        timer = metrics.timer()
+        model = g.model
+        data = request.json
+        position = find_position(data, len(model.df), client_positions)
+        k, space, features = read_similar_request(data, list(model.neighbours),
+                                                  display_df.columns)
+        timer.mark("read_request")
+        positions, distances = model.neighbours[space].query(position, k)
+        timer.mark("query")
+        output = {"space": space, "neighbours": get_similar(
+            positions, distances, model.distribution.scores, client_ids, display_df,
+            features, ACCEPTANCE)}
+        response = respond(output)
+        timer.mark("encode")
+        return metrics.record_stages("similar", timer, response)
+
+    @app.route("/api/what_if", methods = ["POST"])
+    def what_if() :
+        # Courbe ICE du client : toutes les lignes modifiées évaluées en un appel
+        timer = metrics.timer()
+        model = g.model
+        data = request.json
+        position = find_position(data, len(model.df), client_positions)
+        row = model.df.iloc[position : position + 1]
+        row = row[model.feature_names].to_numpy(dtype = np.float64)
+        features, positions, axes = read_what_if_request(data, model.feature_positions,
+                                                         population_sample(model))
+        timer.mark("read_request")
+        output = {"features": features}
+        get_what_if(row, positions, axes, model.predictor, output)
+        output["pred_proba"] = float(model.predictor.predict_proba(row)[0, 1])
+        output["acceptance"] = ACCEPTANCE
+        timer.mark("ice")
+        if data.get("population", False) :
+            output["partial_dependence"] = partial_dependence(
+                model, tuple(positions), tuple(tuple(axis.tolist()) for axis in axes))
+            output["sample_size"] = len(population_sample(model))
+            timer.mark("partial_dependence")
+        response = respond(output)
+        timer.mark("encode")
+        return metrics.record_stages("what_if", timer, response)
+
+    @app.route("/api/score_bulk", methods = ["POST"])
+    def score_bulk() :
+        # Corps CSV (avec ou sans SK_ID_CURR) ou matrice .npy, lu par blocs ;
+        # chaque bloc évalué est renvoyé aussitôt en NDJSON
+        binary = request.mimetype == "application/x-npy"
+        chunk_size, shap_max_display = read_bulk_request(request.args)
+        model = g.model
+        features = list(model.feature_names)
+        score = lambda rows : score_rows(rows, model.score_explainer, model.classifier,
+                                         ACCEPTANCE, shap_max_display, model.drift)
+        # Le premier bloc est évalué avant la réponse : un fichier invalide
+        # reçoit une erreur 400 plutôt qu'un flux interrompu
+        try :
+            chunks = read_chunks(request.stream, chunk_size, features, binary)
+            results = iterate_scores(chunks, features, score)
+            first = next(results, [])
+        except ValueError as error :
+            abort(400, str(error))
+        def generate() :
+            yield to_ndjson(first)
+            for outputs in results :
+                yield to_ndjson(outputs)
+        return Response(stream_with_context(generate()), mimetype = "application/x-ndjson")
+
+    @app.route("/api/importance", methods = ["GET", "POST"])
     def importance() :
+        if request.method == "GET" :
+            max_display = request.args.get("max_display", type = int)
+            importance_type = request.args.get("importance_type", "split")
+        else :
+            data = request.json
+            max_display = data.get("max_display")
+            importance_type = data.get("importance_type", "split")
+        if importance_type not in g.model.importances :
+            abort(400, f"Unknown importance type: {importance_type}")
+        features, values = g.model.importances[importance_type]
+        response = respond({"features": features[:max_display],
+                            "importances": values[:max_display]},
+                           table = ["features", "importances"])
+        response.set_etag(f"{g.model.version}-{importance_type}-{max_display}-{response.mimetype}")
+        return response.make_conditional(request)
+
+    @app.route("/api/data", methods = ["GET"])
+    def data_page() :
+        # Page du tableau des clients, restreinte aux colonnes demandées ;
+        # une requête déjà servie est revalidée sans recalcul grâce à l'ETag
+        offset, limit, columns, families, filters = read_data_request(
+            request.args, display_df.columns, family_index)
+        mimetype = negotiate(request.accept_mimetypes, True)
+        etag = cache_key([], display_version, mimetype, offset, limit, columns, families, filters)
+        # Comparaison faible : une réponse compressée porte un ETag faible
+        if request.if_none_match.contains_weak(etag) :
+            response = Response(status = 304)
+            response.set_etag(etag)
+            return response
+        total, positions = select_page(len(display_df), family_index, filters, offset, limit)
+        response = respond({"total": total, "offset": offset, "limit": limit,
+                            "positions": positions, "columns": columns,
+                            "data": encode_columns(display_df, columns, positions),
+                            "families": encode_families(family_index, families, positions)},
+                           table = "data")
+        response.set_etag(etag)
+        return response
+
+    if DRIFT_MONITORING :
+        @app.route("/api/drift", methods = ["GET"])
+        def drift() :
+            # Population évaluée depuis le chargement du modèle, par tous les
+            # workers avec DRIFT_DIR, comparée à data.csv ; variables triées
+            # par PSI décroissant
+            top = request.args.get("top", type = int)
+            output = g.model.drift.report()
+            output["features"] = output["features"][:top]
+            output["model_version"] = g.model.version
+            return respond(output)
+
+        @app.route("/api/drift", methods = ["DELETE"])
+        def reset_drift() :
+            check_admin()
+            g.model.drift.reset()
+            return Response(status = 204)
+
+    @app.route("/api/histogram", methods = ["POST"])
+    def feature_histogram() :
+        data = request.json
+        filter_value, filters, bins = read_aggregate_request(data, [data.get("feature")])
+        output = {"feature": data["feature"], "filter": filter_value}
+        output.update(histogram(data["feature"], filters, bins))
+        return respond(output)
+
+    @app.route("/api/density", methods = ["POST"])
+    def feature_density() :
         data = request.json
-        max_display = data.get("max_display")
-        feature_importances = get_feature_importance(classifier, df)
-        top_features = feature_importances.head(max_display)
-        return jsonify({
-            "features": top_features["feature"].tolist(),
-            "importances": top_features["importance"].tolist()
-        })
+        features = [data.get("feature_x"), data.get("feature_y")]
+        filter_value, filters, bins = read_aggregate_request(data, features)
+        output = {"feature_x": features[0], "feature_y": features[1], "filter": filter_value}
+        output.update(density(features[0], features[1], filters, bins))
+        return respond(output)
 
     return app
 
@@ -0,0 +1,57 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+
+class MicroBatcher :
+
+    def __init__(self, process_batch, max_wait = 0.005, max_batch_size = 32) :
+        self.process_batch = process_batch
+        self.max_wait = max_wait
+        self.max_batch_size = max_batch_size
+        self.lock = threading.Lock()
+        self.pid = None
+
+    def start(self) :
+        # Démarrage paresseux : un thread créé avant un fork ne survit pas
+        # dans les workers, chaque processus lance donc le sien
+        with self.lock :
+            if self.pid != os.getpid() :
+                self.queue = queue.Queue()
+                thread = threading.Thread(target = self.run, daemon = True)
+                thread.start()
+                self.pid = os.getpid()
+
+    def submit(self, item) :
+        if self.pid != os.getpid() :
+            self.start()
+        future = Future()
+        self.queue.put((item, future))
+        return future
+
+    def collect(self) :
+        batch = [self.queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size :
+            timeout = deadline - time.monotonic()
+            if timeout <= 0 :
+                break
+            try :
+                batch.append(self.queue.get(timeout = timeout))
+            except queue.Empty :
+                break
+        return batch
+
+    def run(self) :
+        while True :
+            batch = self.collect()
+            try :
+                results = self.process_batch([item for item, _ in batch])
+            except Exception as error :
+                for _, future in batch :
+                    future.set_exception(error)
+                continue
+            for (_, future), result in zip(batch, results) :
+                future.set_result(result)
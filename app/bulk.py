@@ -0,0 +1,190 @@
+import argparse
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from encoding import replace_nan, to_builtin
+
+CHUNK_SIZE = 10000
+# Borne de /api/score_bulk : la mémoire d'un envoi reste celle d'un bloc
+MAX_CHUNK_SIZE = 50000
+ID_COLUMN = "SK_ID_CURR"
+FORMATS = ["ndjson", "parquet"]
+
+
+def read_exactly(file, size) :
+    # Un flux HTTP peut renvoyer moins d'octets que demandé
+    parts = []
+    while size > 0 :
+        part = file.read(size)
+        if not part :
+            break
+        parts.append(part)
+        size -= len(part)
+    return b"".join(parts)
+
+def read_npy_chunks(file, chunk_size, columns) :
+    version = np.lib.format.read_magic(file)
+    if version == (1, 0) :
+        shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(file)
+    else :
+        shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(file)
+    if len(shape) != 2 or shape[1] != len(columns) or fortran_order or dtype.kind not in "fiu" :
+        raise ValueError(f"Expected a C-order numeric matrix with {len(columns)} columns")
+    row_size = shape[1] * dtype.itemsize
+    for start in range(0, shape[0], chunk_size) :
+        rows = min(chunk_size, shape[0] - start)
+        buffer = read_exactly(file, rows * row_size)
+        if len(buffer) != rows * row_size :
+            raise ValueError("Truncated binary input")
+        values = np.frombuffer(buffer, dtype = dtype).reshape(rows, shape[1])
+        yield pd.DataFrame(values, columns = columns, copy = False)
+
+def read_chunks(file, chunk_size, columns, binary = False) :
+    if binary :
+        return read_npy_chunks(file, chunk_size, columns)
+    return pd.read_csv(file, chunksize = chunk_size)
+
+def score_chunk(chunk, start, features, score) :
+    missing = [feature for feature in features if feature not in chunk.columns]
+    if missing :
+        raise ValueError(f"Missing features: {', '.join(missing[:10])}")
+    rows = chunk[features].astype(np.float64)
+    outputs = score(rows)
+    client_ids = chunk[ID_COLUMN].tolist() if ID_COLUMN in chunk.columns else None
+    for i, output in enumerate(outputs) :
+        output["row"] = start + i
+        if client_ids is not None :
+            output["client_id"] = client_ids[i]
+    return outputs
+
+def iterate_scores(chunks, features, score, executor = None, window = 2) :
+    # Au plus « window » blocs en attente : la mémoire ne dépend pas de la
+    # taille du fichier, et les résultats sortent dans l'ordre des lignes
+    start = 0
+    if executor is None :
+        for chunk in chunks :
+            yield score_chunk(chunk, start, features, score)
+            start += len(chunk)
+        return
+    pending = deque()
+    for chunk in chunks :
+        pending.append(executor.submit(score_chunk, chunk, start, features, score))
+        start += len(chunk)
+        if len(pending) >= window :
+            yield pending.popleft().result()
+    while pending :
+        yield pending.popleft().result()
+
+def to_ndjson(outputs) :
+    # NaN n'est pas du JSON : les valeurs manquantes sont écrites null
+    return "".join(json.dumps(replace_nan(output), default = to_builtin, allow_nan = False) + "\n"
+                   for output in outputs)
+
+
+class NdjsonWriter :
+
+    def __init__(self, file_name) :
+        self.file = open(file_name, "w")
+
+    def write(self, outputs) :
+        self.file.write(to_ndjson(outputs))
+
+    def close(self) :
+        self.file.close()
+
+
+class ParquetWriter :
+
+    def __init__(self, file_name) :
+        # Import différé : pyarrow n'est nécessaire qu'à la sortie en colonnes
+        import pyarrow
+        import pyarrow.parquet
+        self.pyarrow = pyarrow
+        self.file_name = file_name
+        self.writer = None
+
+    def write(self, outputs) :
+        # Un groupe de lignes Parquet par bloc
+        table = self.pyarrow.Table.from_pylist(outputs)
+        if self.writer is None :
+            self.writer = self.pyarrow.parquet.ParquetWriter(self.file_name, table.schema)
+        self.writer.write_table(table.cast(self.writer.schema))
+
+    def close(self) :
+        if self.writer is not None :
+            self.writer.close()
+
+
+class WorkerScorer :
+
+    # Modèle et explainer chargés une fois par processus du pool
+    state = None
+
+    def __init__(self, shap_max_display) :
+        self.shap_max_display = shap_max_display
+
+    @classmethod
+    def load(cls, csv_file_name, classifier_file_name, engine, background = "default",
+             background_size = 100) :
+        # Mêmes données de référence que l'API : mêmes explications
+        from app import load_data, ACCEPTANCE
+        _, classifier, explainer = load_data(csv_file_name, classifier_file_name, engine,
+                                             background, background_size)
+        cls.state = (explainer, classifier, ACCEPTANCE)
+
+    def __call__(self, rows) :
+        from app import score_rows
+        explainer, classifier, acceptance = WorkerScorer.state
+        return score_rows(rows, explainer, classifier, acceptance, self.shap_max_display)
+
+
+def main(argv = None) :
+    parser = argparse.ArgumentParser(description = "Bulk scoring of a CSV or .npy file")
+    parser.add_argument("input")
+    parser.add_argument("output")
+    parser.add_argument("--format", choices = FORMATS)
+    parser.add_argument("--chunk-size", type = int, default = CHUNK_SIZE)
+    parser.add_argument("--shap-max-display", type = int, default = 0)
+    parser.add_argument("--workers", type = int, default = 1)
+    parser.add_argument("--engine", default = os.environ.get("EXPLAINER_ENGINE", "interventional"))
+    parser.add_argument("--background", default = os.environ.get("SHAP_BACKGROUND", "default"))
+    parser.add_argument("--background-size", type = int,
+                        default = int(os.environ.get("SHAP_BACKGROUND_SIZE", "100")))
+    parser.add_argument("--data", default = "data.csv")
+    parser.add_argument("--classifier", default = "classifier.pkl")
+    args = parser.parse_args(argv)
+    output_format = args.format or ("parquet" if args.output.endswith(".parquet") else "ndjson")
+    writer = ParquetWriter(args.output) if output_format == "parquet" else NdjsonWriter(args.output)
+    features = list(pd.read_csv(args.data, nrows = 0).columns)
+    scorer = WorkerScorer(args.shap_max_display)
+    begin = time.perf_counter()
+    rows = 0
+    binary = args.input.endswith(".npy")
+    executor = None
+    if args.workers > 1 :
+        executor = ProcessPoolExecutor(args.workers, initializer = WorkerScorer.load,
+                                       initargs = (args.data, args.classifier, args.engine,
+                                                   args.background, args.background_size))
+    else :
+        WorkerScorer.load(args.data, args.classifier, args.engine, args.background,
+                          args.background_size)
+    try :
+        with open(args.input, "rb" if binary else "r") as file :
+            chunks = read_chunks(file, args.chunk_size, features, binary)
+            for outputs in iterate_scores(chunks, features, scorer, executor, 2 * args.workers) :
+                writer.write(outputs)
+                rows += len(outputs)
+    finally :
+        writer.close()
+        if executor is not None :
+            executor.shutdown()
+    print(f"{args.input} -> {args.output} ({rows} rows, {time.perf_counter() - begin:.1f} s)")
+
+
+if __name__ == "__main__" :
+    main(sys.argv[1 :])
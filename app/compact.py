@@ -0,0 +1,112 @@
+import numpy as np
+import pandas as pd
+
+ONE_HOT_FAMILIES = ["ORGANIZATION_TYPE", "EMERGENCYSTATE_MODE", "NAME_HOUSING_TYPE",
+                    "NAME_EDUCATION_TYPE", "NAME_TYPE_SUITE", "NAME_INCOME_TYPE",
+                    "NAME_FAMILY_STATUS", "OCCUPATION_TYPE", "WEEKDAY_APPR_PROCESS_START",
+                    "CODE_GENDER", "HOUSETYPE_MODE", "FONDKAPREMONT_MODE",
+                    "WALLSMATERIAL_MODE"]
+
+
+def smallest_dtype(values) :
+    if values.dtype == bool :
+        return values.dtype
+    if values.dtype.kind == "f" :
+        if np.isnan(values).any() or not np.array_equal(values, np.round(values)) :
+            # Un float32 n'est retenu que s'il restitue exactement les valeurs
+            as_float32 = values.astype(np.float32)
+            if np.array_equal(as_float32.astype(values.dtype), values, equal_nan = True) :
+                return np.dtype(np.float32)
+            return values.dtype
+    if len(values) == 0 :
+        return np.dtype(np.uint8)
+    low, high = values.min(), values.max()
+    candidates = [np.uint8, np.uint16, np.uint32] if low >= 0 else [np.int8, np.int16, np.int32]
+    for candidate in candidates :
+        info = np.iinfo(candidate)
+        if info.min <= low and high <= info.max :
+            return np.dtype(candidate)
+    return values.dtype
+
+def family_codes(df, members) :
+    values = df[members].to_numpy()
+    if not np.isin(values, [0, 1]).all() or (values.sum(axis = 1) > 1).any() \
+            or len(members) >= np.iinfo(np.uint8).max :
+        return None
+    # 0 : aucune catégorie, i + 1 : colonne members[i]
+    return ((values.argmax(axis = 1) + 1) * values.any(axis = 1)).astype(np.uint8)
+
+
+class CompactIndexer :
+
+    def __init__(self, frame) :
+        self.frame = frame
+
+    def __getitem__(self, key) :
+        positions = np.arange(len(self.frame))[key]
+        return self.frame.take(np.atleast_1d(positions))
+
+
+class CompactFrame :
+
+    def __init__(self, df, families = ONE_HOT_FAMILIES) :
+        self.columns = df.columns
+        self.dtypes = df.dtypes
+        self.index = df.index
+        self.shape = df.shape
+        positions = {column : i for i, column in enumerate(df.columns)}
+        self.families = {}
+        compacted = set()
+        for family in families :
+            members = [column for column in df.columns if column.startswith(family + "_")]
+            codes = family_codes(df, members) if members else None
+            if codes is not None :
+                self.families[family] = (np.array([positions[m] for m in members]), codes)
+                compacted.update(members)
+        # Colonnes restantes regroupées par type réduit : une matrice par type
+        groups = {}
+        for column in df.columns :
+            if column not in compacted :
+                values = df[column].to_numpy()
+                groups.setdefault(smallest_dtype(values), []).append(column)
+        self.groups = [(np.array([positions[c] for c in columns]),
+                        df[columns].to_numpy().astype(dtype))
+                       for dtype, columns in groups.items()]
+        self.original_groups = [(np.dtype(dtype), np.flatnonzero(self.dtypes == dtype))
+                                for dtype in self.dtypes.unique()]
+
+    def __len__(self) :
+        return self.shape[0]
+
+    @property
+    def iloc(self) :
+        return CompactIndexer(self)
+
+    def take(self, positions) :
+        values = np.zeros((len(positions), self.shape[1]), dtype = np.float64)
+        for columns, matrix in self.groups :
+            values[:, columns] = matrix[positions]
+        for columns, codes in self.families.values() :
+            row_codes = codes[positions].astype(np.int64)
+            rows = np.flatnonzero(row_codes)
+            values[rows, columns[row_codes[rows] - 1]] = 1
+        index = self.index[positions]
+        if len(self.original_groups) == 1 :
+            dtype = self.original_groups[0][0]
+            return pd.DataFrame(values.astype(dtype, copy = False),
+                                columns = self.columns, index = index)
+        frames = [pd.DataFrame(values[:, columns].astype(dtype), index = index,
+                               columns = self.columns[columns])
+                  for dtype, columns in self.original_groups]
+        return pd.concat(frames, axis = 1)[self.columns]
+
+    def to_dense(self) :
+        return self.take(np.arange(len(self)))
+
+    def memory_usage(self) :
+        return sum(matrix.nbytes for _, matrix in self.groups) \
+            + sum(codes.nbytes for _, codes in self.families.values())
+
+
+def downcast(df) :
+    return df.astype({column : smallest_dtype(df[column].to_numpy()) for column in df.columns})
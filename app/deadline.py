@@ -0,0 +1,89 @@
+import os
+import queue
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, TimeoutError
+
+
+class ExplanationQueue :
+
+    def __init__(self, max_size = 32, store_size = 1024) :
+        self.max_size = max_size
+        self.store_size = store_size
+        self.lock = threading.Lock()
+        self.pid = None
+        self.shed = 0
+        self.deferred = 0
+        self.completed = 0
+        self.failed = 0
+
+    def start(self) :
+        # Démarrage paresseux, un thread et une file par processus (cf. MicroBatcher)
+        with self.lock :
+            if self.pid != os.getpid() :
+                self.queue = queue.Queue()
+                self.jobs = {}
+                self.results = OrderedDict()
+                threading.Thread(target = self.run, daemon = True).start()
+                self.pid = os.getpid()
+
+    def submit(self, key, compute) :
+        # None si la file est pleine : l'explication est abandonnée, pas le score
+        if self.pid != os.getpid() :
+            self.start()
+        with self.lock :
+            if key in self.results :
+                future = Future()
+                future.set_result(self.results[key])
+                return future
+            if key in self.jobs :
+                return self.jobs[key]
+            if len(self.jobs) >= self.max_size :
+                self.shed += 1
+                return None
+            future = Future()
+            self.jobs[key] = future
+        self.queue.put((key, compute, future))
+        return future
+
+    def wait(self, future, timeout) :
+        # Statut et résultat de l'explication à l'échéance ; un calcul en
+        # erreur n'empêche pas de renvoyer le score
+        if future is None :
+            return "shed", None
+        try :
+            return "complete", future.result(timeout = max(timeout, 0))
+        except TimeoutError :
+            with self.lock :
+                self.deferred += 1
+            return "pending", None
+        except Exception :
+            return "failed", None
+
+    def run(self) :
+        while True :
+            key, compute, future = self.queue.get()
+            try :
+                result = compute()
+            except Exception as error :
+                with self.lock :
+                    del self.jobs[key]
+                    self.failed += 1
+                future.set_exception(error)
+                continue
+            # Résultats conservés pour les requêtes de suivi, les plus anciens
+            # sont oubliés en premier
+            with self.lock :
+                self.results[key] = result
+                while len(self.results) > self.store_size :
+                    self.results.popitem(last = False)
+                del self.jobs[key]
+                self.completed += 1
+            future.set_result(result)
+
+    def stats(self) :
+        with self.lock :
+            depth = len(self.jobs) if self.pid == os.getpid() else 0
+            return {"depth": depth, "capacity": self.max_size, "shed": self.shed,
+                    "deferred": self.deferred, "completed": self.completed,
+                    "failed": self.failed}
@@ -0,0 +1,244 @@
+import glob
+import os
+import threading
+import time
+import uuid
+import numpy as np
+from compact import ONE_HOT_FAMILIES
+
+N_BINS = 10
+CHUNK_SIZE = 4096
+EPSILON = 1e-4
+PSI_THRESHOLD = 0.25
+# En deçà, le PSI reflète surtout le bruit d'échantillonnage (environ N_BINS / n)
+MIN_ROWS = 100
+# Délai minimal entre deux écritures de l'état d'un worker dans le dossier partagé
+DUMP_INTERVAL = 1.0
+EPOCH_FILE_NAME = "epoch"
+
+
+def bin_counts(values, edges) :
+    # Effectifs par intervalle pour toutes les variables à la fois ; la
+    # dernière colonne compte les valeurs manquantes
+    n_features, n_edges = edges.shape
+    counts = np.zeros((n_features, n_edges + 2), dtype = np.int64)
+    offsets = np.arange(n_features) * (n_edges + 2)
+    for start in range(0, len(values), CHUNK_SIZE) :
+        chunk = values[start : start + CHUNK_SIZE]
+        bins = (chunk[:, :, np.newaxis] > edges).sum(axis = 2)
+        bins[np.isnan(chunk)] = n_edges + 1
+        counts += np.bincount((bins + offsets).ravel(),
+                              minlength = counts.size).reshape(counts.shape)
+    return counts
+
+def moments(values) :
+    present = ~np.isnan(values)
+    count = present.sum(axis = 0)
+    mean = np.where(present, values, 0).sum(axis = 0) / np.maximum(count, 1)
+    m2 = (np.where(present, values - mean, 0) ** 2).sum(axis = 0)
+    return count, mean, m2
+
+def merge_moments(first, second) :
+    # Fusion de deux ensembles de moments (Chan et al.), variable par variable
+    count_a, mean_a, m2_a = first
+    count_b, mean_b, m2_b = second
+    count = count_a + count_b
+    delta = mean_b - mean_a
+    mean = mean_a + delta * count_b / np.maximum(count, 1)
+    m2 = m2_a + m2_b + delta ** 2 * count_a * count_b / np.maximum(count, 1)
+    return count, mean, m2
+
+def psi(expected, actual) :
+    expected = expected / np.maximum(expected.sum(axis = -1, keepdims = True), 1) + EPSILON
+    actual = actual / np.maximum(actual.sum(axis = -1, keepdims = True), 1) + EPSILON
+    return ((actual - expected) * np.log(actual / expected)).sum(axis = -1)
+
+def ks(expected, actual) :
+    # Écart maximal entre fonctions de répartition, aux bornes des intervalles
+    # (sans les valeurs manquantes)
+    expected = np.cumsum(expected[:, :-1], axis = 1)
+    actual = np.cumsum(actual[:, :-1], axis = 1)
+    expected = expected / np.maximum(expected[:, -1 :], 1)
+    actual = actual / np.maximum(actual[:, -1 :], 1)
+    return np.abs(actual - expected).max(axis = 1)
+
+def read_epoch(directory) :
+    # Incrémenté à chaque remise à zéro, quel que soit le worker qui la reçoit
+    try :
+        with open(os.path.join(directory, EPOCH_FILE_NAME)) as file :
+            return int(file.read())
+    except (OSError, ValueError) :
+        return 0
+
+def write_epoch(directory, epoch) :
+    path = os.path.join(directory, EPOCH_FILE_NAME)
+    temporary = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(temporary, "w") as file :
+        file.write(str(epoch))
+    os.replace(temporary, path)
+
+
+class DriftMonitor :
+
+    def __init__(self, reference, feature_names, n_bins = N_BINS, families = ONE_HOT_FAMILIES,
+                 directory = None) :
+        self.feature_names = list(feature_names)
+        self.checked_columns = None
+        # Intervalles fixés par les déciles de la population de référence
+        self.edges = np.ascontiguousarray(np.nanquantile(
+            reference, np.linspace(0, 1, n_bins + 1)[1 : -1], axis = 0).T)
+        self.edges[np.isnan(self.edges)] = np.inf
+        self.reference_counts = bin_counts(reference, self.edges)
+        self.reference_moments = moments(reference)
+        self.families = {}
+        for family in families :
+            members = [i for i, name in enumerate(self.feature_names)
+                       if name.startswith(family + "_")]
+            if members :
+                self.families[family] = np.array(members)
+        self.lock = threading.Lock()
+        # Avec plusieurs workers, chacun écrit ses statistiques dans ce dossier
+        # partagé, propre à la version du modèle, et report() additionne
+        # celles de tous les workers
+        self.directory = directory
+        self.token = uuid.uuid4().hex
+        self.dumped = 0.0
+        self.flush = None
+        self.epoch = 0
+        if directory is not None :
+            os.makedirs(directory, exist_ok = True)
+            self.epoch = read_epoch(directory)
+        self.clear()
+
+    def clear(self) :
+        with self.lock :
+            self.counts = np.zeros_like(self.reference_counts)
+            self.moments = tuple(np.zeros_like(values, dtype = np.float64)
+                                 for values in self.reference_moments)
+            self.rows = 0
+
+    def reset(self) :
+        # Les autres workers constatent le changement d'époque à leur
+        # prochaine écriture et repartent de zéro
+        if self.directory is not None :
+            self.epoch = read_epoch(self.directory) + 1
+            write_epoch(self.directory, self.epoch)
+        self.clear()
+
+    def to_array(self, rows) :
+        if hasattr(rows, "columns") :
+            # Même raccourci que FlatForest : colonnes vérifiées une seule fois
+            if rows.columns is not self.checked_columns :
+                if list(rows.columns) == self.feature_names :
+                    self.checked_columns = rows.columns
+                else :
+                    rows = rows[self.feature_names]
+            rows = rows.to_numpy(dtype = np.float64)
+        return np.asarray(rows, dtype = np.float64).reshape(-1, len(self.feature_names))
+
+    def update(self, rows) :
+        values = self.to_array(rows)
+        counts = bin_counts(values, self.edges)
+        batch_moments = moments(values)
+        with self.lock :
+            self.counts += counts
+            self.moments = merge_moments(self.moments, batch_moments)
+            self.rows += len(values)
+        if self.directory is not None :
+            self.schedule_dump()
+
+    def schedule_dump(self) :
+        # Écriture immédiate, ou différée à la fin de l'intervalle : un worker
+        # qui ne reçoit plus de requêtes publie quand même ses dernières lignes
+        delay = self.dumped + DUMP_INTERVAL - time.monotonic()
+        if delay <= 0 :
+            self.dump()
+            return
+        with self.lock :
+            if self.flush is not None :
+                return
+            self.flush = threading.Timer(delay, self.dump)
+            self.flush.daemon = True
+        self.flush.start()
+
+    def state(self) :
+        with self.lock :
+            return self.counts.copy(), self.moments, self.rows
+
+    def dump(self) :
+        with self.lock :
+            self.flush = None
+        self.dumped = time.monotonic()
+        epoch = read_epoch(self.directory)
+        if epoch != self.epoch :
+            # Remise à zéro demandée à un autre worker
+            self.epoch = epoch
+            self.clear()
+        counts, (count, mean, m2), rows = self.state()
+        # Un fichier par worker et par chargement du modèle, remplacé atomiquement
+        os.makedirs(self.directory, exist_ok = True)
+        path = os.path.join(self.directory, f"{os.getpid()}-{self.token}.npz")
+        temporary = f"{path}.{threading.get_ident()}.tmp"
+        with open(temporary, "wb") as file :
+            np.savez(file, epoch = epoch, counts = counts, count = count, mean = mean, m2 = m2,
+                     rows = rows)
+        os.replace(temporary, path)
+
+    def collect(self) :
+        if self.directory is None :
+            return self.state()
+        self.dump()
+        counts = np.zeros_like(self.reference_counts)
+        moments = tuple(np.zeros_like(values, dtype = np.float64)
+                        for values in self.reference_moments)
+        rows = 0
+        # Les statistiques des workers arrêtés restent comptées
+        for path in glob.glob(os.path.join(self.directory, "*.npz")) :
+            try :
+                with np.load(path) as state :
+                    if int(state["epoch"]) != self.epoch :
+                        continue
+                    counts += state["counts"]
+                    moments = merge_moments(moments, (state["count"], state["mean"], state["m2"]))
+                    rows += int(state["rows"])
+            except (OSError, ValueError, KeyError) :
+                continue
+        return counts, moments, rows
+
+    def report(self) :
+        counts, (count, mean, m2), rows = self.collect()
+        reference_count, reference_mean, reference_m2 = self.reference_moments
+        n_reference = self.reference_counts[0].sum()
+        # En dessous de MIN_ROWS lignes, PSI et KS ne sont pas significatifs :
+        # non calculés, variables dans l'ordre de référence
+        enough = rows >= MIN_ROWS
+        scores = psi(self.reference_counts, counts)
+        statistics = ks(self.reference_counts, counts)
+        order = np.argsort(-scores, kind = "stable") if enough else range(len(scores))
+        features = []
+        for i in order :
+            features.append({
+                "feature": self.feature_names[i],
+                "psi": float(scores[i]) if enough else None,
+                "ks": float(statistics[i]) if enough else None,
+                "mean": float(mean[i]) if count[i] else None,
+                "reference_mean": float(reference_mean[i]),
+                "std": float(np.sqrt(m2[i] / count[i])) if count[i] else None,
+                "reference_std": float(np.sqrt(reference_m2[i] / max(reference_count[i], 1))),
+                "missing_rate": float(1 - count[i] / rows) if rows else None,
+                "reference_missing_rate": float(1 - reference_count[i] / n_reference)})
+        # Fréquences des catégories one-hot : moyennes des indicatrices
+        families = {}
+        for family, members in self.families.items() :
+            expected = reference_mean[members] * reference_count[members]
+            actual = mean[members] * count[members]
+            family_psi = psi(np.append(expected, max(n_reference - expected.sum(), 0)),
+                             np.append(actual, max(rows - actual.sum(), 0)))
+            families[family] = {
+                "psi": float(family_psi) if enough else None,
+                "categories": {self.feature_names[i] : {
+                    "frequency": float(mean[i]) if count[i] else None,
+                    "reference_frequency": float(reference_mean[i])} for i in members}}
+        return {"rows": rows, "reference_rows": int(n_reference),
+                "drifted": int((scores > PSI_THRESHOLD).sum()) if enough else None,
+                "psi_threshold": PSI_THRESHOLD, "features": features, "families": families}
@@ -0,0 +1,134 @@
+import gzip
+import importlib.util
+import json
+import numpy as np
+from flask.json.provider import DefaultJSONProvider
+
+try :
+    import msgpack
+except ImportError :
+    msgpack = None
+
+JSON = "application/json"
+MSGPACK = "application/msgpack"
+ARROW = "application/vnd.apache.arrow.stream"
+ARRAY_EXT_TYPE = 1
+COMPRESSION_MIN_SIZE = 1024
+# pyarrow n'est importé qu'au premier encodage Arrow (cf. bulk.ParquetWriter)
+HAS_ARROW = importlib.util.find_spec("pyarrow") is not None
+
+
+def to_builtin(value) :
+    # Tableaux NumPy laissés tels quels dans les réponses, convertis ici pour
+    # JSON ; les valeurs manquantes deviennent null
+    if isinstance(value, np.ndarray) :
+        if value.dtype.kind == "f" and np.isnan(value).any() :
+            value = np.where(np.isnan(value), None, value.astype(object))
+        return value.tolist()
+    if isinstance(value, np.generic) :
+        return value.item()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def replace_nan(value) :
+    # Flottants Python (ou NumPy scalaires) NaN remplacés par None, dans les
+    # dictionnaires et listes imbriqués ; les tableaux passent par to_builtin
+    if isinstance(value, float) :
+        return None if value != value else value
+    if isinstance(value, dict) :
+        return {key : replace_nan(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)) :
+        return [replace_nan(item) for item in value]
+    return value
+
+
+class NumpyJSONProvider(DefaultJSONProvider) :
+
+    @staticmethod
+    def default(value) :
+        try :
+            return to_builtin(value)
+        except TypeError :
+            return DefaultJSONProvider.default(value)
+
+
+def pack_array(value) :
+    # Tableau numérique à une dimension : extension MessagePack contenant le
+    # type NumPy sur 3 octets (« <f4 », « |i1 »...) puis les valeurs brutes
+    # little-endian ; les flottants ne passent en float32 que sans perte,
+    # comme les colonnes gardées en float64 par compact.downcast
+    if isinstance(value, np.ndarray) :
+        if value.ndim != 1 or value.dtype.kind not in "fiub" :
+            return value.tolist()
+        if value.dtype.kind == "f" :
+            narrowed = value.astype("<f4")
+            exact = np.array_equal(narrowed, value, equal_nan = True)
+            value = narrowed if exact else value.astype("<f8")
+        elif value.dtype.kind == "b" :
+            value = value.astype("|u1")
+        else :
+            value = value.astype(value.dtype.newbyteorder("<"))
+        return msgpack.ExtType(ARRAY_EXT_TYPE, value.dtype.str.encode() + value.tobytes())
+    if isinstance(value, np.generic) :
+        return value.item()
+    raise TypeError(f"Object of type {type(value).__name__} cannot be packed")
+
+def unpack_array(code, data) :
+    if code == ARRAY_EXT_TYPE :
+        return np.frombuffer(data[3 :], dtype = data[: 3].decode())
+    return msgpack.ExtType(code, data)
+
+def to_arrow(output, table) :
+    # « table » : clé d'une liste d'enregistrements ou d'un dictionnaire de
+    # colonnes, ou liste de clés de colonnes ; les autres champs sont placés
+    # en JSON dans les métadonnées du schéma
+    import pyarrow
+    if isinstance(table, str) :
+        columns = output[table]
+        others = {key : value for key, value in output.items() if key != table}
+        if isinstance(columns, list) :
+            arrow_table = pyarrow.Table.from_pylist(columns)
+        else :
+            arrow_table = pyarrow.table({key : np.asarray(value) for key, value in columns.items()})
+    else :
+        arrow_table = pyarrow.table({key : np.asarray(output[key]) for key in table})
+        others = {key : value for key, value in output.items() if key not in table}
+    arrow_table = arrow_table.replace_schema_metadata(
+        {"output": json.dumps(others, default = to_builtin)})
+    sink = pyarrow.BufferOutputStream()
+    with pyarrow.ipc.new_stream(sink, arrow_table.schema) as writer :
+        writer.write_table(arrow_table)
+    return sink.getvalue().to_pybytes()
+
+def offered_mimetypes(tabular) :
+    # JSON en premier : c'est l'encodage retenu pour « Accept: */* »
+    mimetypes = [JSON]
+    if msgpack is not None :
+        mimetypes.append(MSGPACK)
+    if tabular and HAS_ARROW :
+        mimetypes.append(ARROW)
+    return mimetypes
+
+def negotiate(accept_mimetypes, tabular = False) :
+    return accept_mimetypes.best_match(offered_mimetypes(tabular), default = JSON)
+
+def encode(output, mimetype, table = None) :
+    if mimetype == MSGPACK :
+        return msgpack.packb(output, default = pack_array)
+    if mimetype == ARROW :
+        return to_arrow(output, table)
+    return json.dumps(output, default = to_builtin).encode()
+
+def compress_response(response, accept_encodings, level, min_size = COMPRESSION_MIN_SIZE) :
+    response.vary.add("Accept-Encoding")
+    if level <= 0 or response.is_streamed or response.status_code != 200 \
+            or "Content-Encoding" in response.headers or not accept_encodings["gzip"] \
+            or (response.content_length or 0) < min_size :
+        return response
+    response.set_data(gzip.compress(response.get_data(), level))
+    response.headers["Content-Encoding"] = "gzip"
+    # Représentation différente du contenu non compressé : ETag faible
+    etag, _ = response.get_etag()
+    if etag is not None :
+        response.set_etag(etag, weak = True)
+    return response
@@ -0,0 +1,103 @@
+import numpy as np
+import pandas as pd
+
+ENGINES = ["interventional", "tree_path_dependent", "native"]
+BACKGROUNDS = ["default", "full", "random", "stratified", "kmeans"]
+
+
+class PositiveClassExplainer :
+
+    def __init__(self, explainer) :
+        self.explainer = explainer
+
+    def shap_values(self, rows, check_additivity = True) :
+        # Certaines versions de shap renvoient une liste [classe 0, classe 1]
+        shap_values = self.explainer.shap_values(rows, check_additivity = check_additivity)
+        if isinstance(shap_values, list) :
+            shap_values = shap_values[-1]
+        return shap_values
+
+
+class NativeExplainer :
+
+    def __init__(self, classifier) :
+        self.classifier = classifier
+
+    def shap_values(self, rows, check_additivity = True) :
+        # Un tableau NumPy évite la validation coûteuse du DataFrame par LightGBM ;
+        # contributions exactes, sans test d'additivité
+        values = np.asarray(rows, dtype = np.float64)
+        n_jobs = getattr(self.classifier, "n_jobs", None)
+        options = {} if n_jobs is None else {"num_threads": n_jobs}
+        contributions = self.classifier.booster_.predict(values, pred_contrib = True,
+                                                         **options)
+        return contributions[:, :-1]
+
+
+def summarize_background(df, classifier, strategy = "full", size = 100, seed = 0) :
+    if strategy == "full" or size >= len(df) :
+        return df
+    if strategy == "random" :
+        return df.sample(n = size, random_state = seed)
+    if strategy == "stratified" :
+        # Un client tiré au hasard dans chaque tranche de score de même effectif
+        generator = np.random.default_rng(seed)
+        order = np.argsort(classifier.predict_proba(df)[:, 1])
+        positions = [generator.choice(group) for group in np.array_split(order, size)]
+        return df.iloc[np.sort(positions)]
+    if strategy == "kmeans" :
+        import shap
+        # Centres arrondis aux valeurs observées (variables one-hot conservées),
+        # les poids des groupes sont ignorés par l'algorithme interventionnel
+        summary = shap.kmeans(df, size)
+        return pd.DataFrame(summary.data, columns = df.columns)
+    raise ValueError(f"Unknown background strategy: {strategy}")
+
+def build_explainer(classifier, df, engine = "interventional",
+                    background = "default", background_size = 100) :
+    # Vérifié quel que soit le moteur : une faute de frappe dans SHAP_BACKGROUND
+    # ne doit pas passer inaperçue avec les moteurs qui n'utilisent pas de fond
+    if background not in BACKGROUNDS :
+        raise ValueError(f"Unknown SHAP background: {background} "
+                         f"(available: {', '.join(BACKGROUNDS)})")
+    if engine in ["interventional", "tree_path_dependent"] :
+        # Import différé : shap est long à charger et inutile au moteur natif
+        import shap
+    if engine == "interventional" :
+        if background == "default" :
+            # shap échantillonne lui-même 100 lignes du fond
+            return shap.Explainer(classifier, df)
+        data = summarize_background(df, classifier, background, background_size)
+        masker = shap.maskers.Independent(data, max_samples = len(data))
+        return shap.Explainer(classifier, masker)
+    if engine == "tree_path_dependent" :
+        explainer = shap.TreeExplainer(classifier, feature_perturbation = "tree_path_dependent")
+        return PositiveClassExplainer(explainer)
+    if engine == "native" :
+        return NativeExplainer(classifier)
+    raise ValueError(f"Unknown explanation engine: {engine}")
+
+def compare_explanations(reference, candidate, max_display = 10) :
+    top_reference = np.argsort(np.abs(reference), axis = 1)[:, ::-1][:, :max_display]
+    top_candidate = np.argsort(np.abs(candidate), axis = 1)[:, ::-1][:, :max_display]
+    overlaps = [len(np.intersect1d(a, b)) / max_display
+                for a, b in zip(top_reference, top_candidate)]
+    reference_values = np.take_along_axis(reference, top_reference, axis = 1)
+    candidate_values = np.take_along_axis(candidate, top_reference, axis = 1)
+    return {
+        "max_abs_diff": float(np.abs(reference - candidate).max()),
+        "top_features_agreement": float(np.mean(overlaps)),
+        "top_features_same_order": float(np.mean((top_reference == top_candidate).all(axis = 1))),
+        "top_values_mean_abs_diff": float(np.abs(reference_values - candidate_values).mean())
+    }
+
+def check_consistency(explainers, rows, max_display = 10) :
+    shap_values = {name : np.asarray(explainer.shap_values(rows))
+                   for name, explainer in explainers.items()}
+    names = list(shap_values)
+    report = {}
+    for i, name_a in enumerate(names) :
+        for name_b in names[i + 1 :] :
+            report[(name_a, name_b)] = compare_explanations(
+                shap_values[name_a], shap_values[name_b], max_display)
+    return report
@@ -0,0 +1,34 @@
+import numpy as np
+from compact import ONE_HOT_FAMILIES
+
+
+class FamilyIndex :
+
+    def __init__(self, df, families = ONE_HOT_FAMILIES) :
+        self.members = {}
+        self.rows = {}
+        self.codes = {}
+        for family in families :
+            members = [column for column in df.columns if column.startswith(family + "_")]
+            if not members or family in self.members :
+                continue
+            values = df[members].to_numpy() == 1
+            self.members[family] = members
+            # Positions des lignes de chaque catégorie, triées par construction
+            for i, member in enumerate(members) :
+                self.rows[member] = np.flatnonzero(values[:, i]).astype(np.int32)
+            # 0 : aucune catégorie, i + 1 : colonne members[i]
+            self.codes[family] = np.where(values.any(axis = 1),
+                                          values.argmax(axis = 1) + 1, 0).astype(np.int16)
+
+    def category(self, family, position) :
+        code = self.codes[family][position]
+        return self.members[family][code - 1] if code else None
+
+    def filter(self, columns) :
+        # Intersection en partant de la plus petite catégorie
+        rows = sorted((self.rows[column] for column in columns), key = len)
+        positions = rows[0]
+        for other in rows[1 :] :
+            positions = np.intersect1d(positions, other, assume_unique = True)
+        return positions
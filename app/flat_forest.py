@@ -0,0 +1,106 @@
+import numpy as np
+
+MISSING_TYPES = {"None": 0, "Zero": 1, "NaN": 2}
+ZERO_THRESHOLD = 1e-35
+CHUNK_SIZE = 4096
+
+
+class FlatForest :
+
+    def __init__(self, feature_names, roots, feature, threshold, left, right,
+                 default_left, missing_type, value, depth, sigmoid) :
+        self.feature_names = feature_names
+        self.roots = roots
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.default_left = default_left
+        self.missing_type = missing_type
+        self.value = value
+        self.depth = depth
+        self.sigmoid = sigmoid
+        self.has_missing = bool((missing_type != MISSING_TYPES["None"]).any())
+        self.checked_columns = None
+
+    @classmethod
+    def from_booster(cls, booster) :
+        model = booster.dump_model()
+        objective = model["objective"].split()
+        if model["num_class"] != 1 or objective[0] != "binary" or model["average_output"] :
+            raise ValueError(f"Unsupported LightGBM model: {model['objective']}")
+        sigmoid = float(dict(option.split(":") for option in objective[1 :])["sigmoid"])
+        # Les feuilles sont des nœuds qui bouclent sur eux-mêmes : après
+        # « depth » itérations, chaque arbre est arrivé sur sa feuille
+        nodes = []
+        roots = []
+        depth = 0
+        for tree in model["tree_info"] :
+            stack = [(tree["tree_structure"], len(nodes), 0)]
+            roots.append(len(nodes))
+            nodes.append(None)
+            while stack :
+                node, position, level = stack.pop()
+                depth = max(depth, level)
+                if "leaf_value" in node :
+                    nodes[position] = (0, 0.0, position, position, False, 0, node["leaf_value"])
+                    continue
+                if node["decision_type"] != "<=" :
+                    raise ValueError("Categorical splits are not supported")
+                left, right = len(nodes), len(nodes) + 1
+                nodes.extend([None, None])
+                nodes[position] = (node["split_feature"], node["threshold"], left, right,
+                                   node["default_left"], MISSING_TYPES[node["missing_type"]], 0.0)
+                stack.append((node["left_child"], left, level + 1))
+                stack.append((node["right_child"], right, level + 1))
+        columns = list(zip(*nodes))
+        return cls(model["feature_names"], np.array(roots, dtype = np.int64),
+                   np.array(columns[0], dtype = np.int64),
+                   np.array(columns[1], dtype = np.float64),
+                   np.array(columns[2], dtype = np.int64),
+                   np.array(columns[3], dtype = np.int64),
+                   np.array(columns[4], dtype = bool),
+                   np.array(columns[5], dtype = np.int8),
+                   np.array(columns[6], dtype = np.float64), depth, sigmoid)
+
+    def to_array(self, rows) :
+        if hasattr(rows, "columns") :
+            # Les lignes extraites d'un même dataframe partagent l'objet colonnes
+            if rows.columns is not self.checked_columns :
+                if list(rows.columns) == self.feature_names :
+                    self.checked_columns = rows.columns
+                else :
+                    rows = rows[self.feature_names]
+            rows = rows.to_numpy(dtype = np.float64)
+        return np.ascontiguousarray(rows, dtype = np.float64)
+
+    def decision(self, values, nodes) :
+        if not self.has_missing :
+            return values <= self.threshold[nodes]
+        missing_type = self.missing_type[nodes]
+        is_nan = np.isnan(values)
+        values = np.where(is_nan & (missing_type != MISSING_TYPES["NaN"]), 0.0, values)
+        is_missing = ((missing_type == MISSING_TYPES["Zero"]) & (np.abs(values) <= ZERO_THRESHOLD)) \
+            | ((missing_type == MISSING_TYPES["NaN"]) & is_nan)
+        return np.where(is_missing, self.default_left[nodes], values <= self.threshold[nodes])
+
+    def raw_score(self, rows) :
+        values = self.to_array(rows)
+        if not self.has_missing :
+            # Sans gestion des valeurs manquantes, LightGBM remplace NaN par 0
+            values = np.nan_to_num(values, nan = 0.0)
+        scores = np.empty(len(values), dtype = np.float64)
+        for start in range(0, len(values), CHUNK_SIZE) :
+            chunk = values[start : start + CHUNK_SIZE]
+            flat = chunk.ravel()
+            offsets = (np.arange(len(chunk)) * chunk.shape[1])[:, None]
+            nodes = np.broadcast_to(self.roots, (len(chunk), len(self.roots)))
+            for _ in range(self.depth) :
+                go_left = self.decision(flat[offsets + self.feature[nodes]], nodes)
+                nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+            scores[start : start + len(chunk)] = self.value[nodes].sum(axis = 1)
+        return scores
+
+    def predict_proba(self, rows) :
+        proba = 1 / (1 + np.exp(-self.sigmoid * self.raw_score(rows)))
+        return np.column_stack([1 - proba, proba])
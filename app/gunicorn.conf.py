@@ -0,0 +1,43 @@
+import gc
+import glob
+import multiprocessing
+import os
+import shutil
+import tempfile
+
+# Une seule thread LightGBM par worker : les processus se partagent déjà les cœurs
+os.environ.setdefault("LGBM_N_JOBS", "1")
+
+wsgi_app = "app:create_app()"
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+workers = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+# Dossier où chaque worker dépose ses métriques, additionnées par /metrics
+# quel que soit le worker qui reçoit la requête ; créé même pour un worker,
+# le nombre final pouvant venir de la ligne de commande (--workers)
+os.environ.setdefault("METRICS_DIR", tempfile.mkdtemp(prefix = "metrics-"))
+# De même pour les statistiques de dérive (/api/drift)
+os.environ.setdefault("DRIFT_DIR", os.path.join(os.environ["METRICS_DIR"], "drift"))
+# Plusieurs threads par worker sont nécessaires au regroupement des requêtes
+# (PREDICT_BATCHING=1), sinon un worker ne traite qu'une requête à la fois
+threads = int(os.environ.get("GUNICORN_THREADS", "1"))
+# Données, modèle et explainer chargés une fois dans le maître puis partagés
+# en copie sur écriture par les workers
+preload_app = True
+timeout = 120
+
+def on_starting(server) :
+    # Nombre de workers retenu par gunicorn, options de la ligne de commande
+    # comprises, transmis aux workers (cf. app.worker_count)
+    os.environ["WEB_CONCURRENCY"] = str(server.cfg.workers)
+    # Métriques et dérive laissées par une exécution précédente dans un
+    # dossier fixé ; les workers recréent celui de la dérive
+    if "METRICS_DIR" in os.environ :
+        for path in glob.glob(os.path.join(os.environ["METRICS_DIR"], "*.json")) :
+            os.remove(path)
+    if "DRIFT_DIR" in os.environ :
+        shutil.rmtree(os.environ["DRIFT_DIR"], ignore_errors = True)
+
+def pre_fork(server, worker) :
+    # Les objets chargés passent dans une génération que le ramasse-miettes
+    # ne parcourt plus, ce qui évite de recopier leurs pages dans chaque worker
+    gc.freeze()
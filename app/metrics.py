@@ -0,0 +1,261 @@
+import bisect
+import glob
+import json
+import os
+import threading
+import time
+
+LATENCY_BUCKETS = [0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0]
+# Délai minimal entre deux écritures de l'état d'un worker dans METRICS_DIR
+DUMP_INTERVAL = 1.0
+
+
+class Histogram :
+
+    def __init__(self, buckets = LATENCY_BUCKETS) :
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, value) :
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+    def add(self, counts, total) :
+        # Cumul de l'histogramme d'un autre worker
+        self.counts = [count + other for count, other in zip(self.counts, counts)]
+        self.sum += total
+
+    def lines(self, name, labels) :
+        # Compteurs cumulés par borne supérieure, comme l'attend Prometheus
+        lines = []
+        total = 0
+        for bound, count in zip(self.buckets + ["+Inf"], self.counts) :
+            total += count
+            lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {total}')
+        lines.append(f"{name}_sum{{{labels}}} {self.sum}")
+        lines.append(f"{name}_count{{{labels}}} {total}")
+        return lines
+
+
+class StageTimer :
+
+    def __init__(self) :
+        self.stages = []
+        self.last = time.perf_counter()
+
+    def mark(self, stage) :
+        # Durée écoulée depuis l'étape précédente
+        now = time.perf_counter()
+        self.stages.append((stage, now - self.last))
+        self.last = now
+
+    def header(self) :
+        return ", ".join(f"{stage};dur={duration * 1000:.3f}" for stage, duration in self.stages)
+
+
+class NullTimer :
+
+    def mark(self, stage) :
+        pass
+
+
+NULL_TIMER = NullTimer()
+
+
+def is_alive(pid) :
+    try :
+        os.kill(pid, 0)
+    except ProcessLookupError :
+        return False
+    except PermissionError :
+        pass
+    return True
+
+
+def merge_states(states) :
+    # Compteurs additionnés sur tous les workers, y compris ceux qui sont
+    # arrêtés ; jauges additionnées sur les seuls workers encore en vie
+    merged = {"requests": {}, "durations": {}, "stages": {}, "in_flight": 0,
+              "caches": {}, "queues": {}}
+    for state in states :
+        alive = is_alive(state["pid"])
+        for endpoint, status, count in state["requests"] :
+            key = (endpoint, status)
+            merged["requests"][key] = merged["requests"].get(key, 0) + count
+        for endpoint, counts, total in state["durations"] :
+            merged["durations"].setdefault(endpoint, Histogram()).add(counts, total)
+        for endpoint, stage, counts, total in state["stages"] :
+            merged["stages"].setdefault((endpoint, stage), Histogram()).add(counts, total)
+        if alive :
+            merged["in_flight"] += state["in_flight"]
+        for name, (hits, misses) in state["caches"].items() :
+            previous = merged["caches"].get(name, (0, 0))
+            merged["caches"][name] = (previous[0] + hits, previous[1] + misses)
+        for name, values in state["queues"].items() :
+            queue = merged["queues"].setdefault(name, dict.fromkeys(values, 0))
+            for key, value in values.items() :
+                if alive or key not in ("depth", "capacity") :
+                    queue[key] += value
+    return merged
+
+
+def describe_explainer(explainer) :
+    # Chaîne des explainers imbriqués, par exemple « PrecomputedExplainer/TreeExplainer »
+    names = []
+    while explainer is not None :
+        names.append(type(explainer).__name__)
+        explainer = getattr(explainer, "explainer", None)
+    return "/".join(names)
+
+
+class Metrics :
+
+    def __init__(self, enabled = True, directory = None) :
+        self.enabled = enabled
+        # Avec plusieurs workers, chacun écrit son état dans ce dossier
+        # partagé et /metrics additionne ceux de tous les workers
+        self.directory = directory
+        self.dumped = 0.0
+        self.flush = None
+        self.lock = threading.Lock()
+        self.requests = {}
+        self.durations = {}
+        self.stages = {}
+        self.in_flight = 0
+        self.caches = {}
+        self.queues = {}
+        self.info = {}
+
+    def timer(self) :
+        return StageTimer() if self.enabled else NULL_TIMER
+
+    def add_cache(self, name, counts) :
+        # counts() -> (hits, misses), lu seulement au moment de l'export
+        self.caches[name] = counts
+
+    def add_queue(self, name, stats) :
+        # stats() -> dict avec depth, capacity, shed, deferred, completed, failed
+        self.queues[name] = stats
+
+    def start_request(self) :
+        with self.lock :
+            self.in_flight += 1
+
+    def end_request(self) :
+        with self.lock :
+            self.in_flight -= 1
+        if self.directory is not None :
+            self.schedule_dump()
+
+    def record_request(self, endpoint, status, duration) :
+        with self.lock :
+            key = (endpoint, str(status))
+            self.requests[key] = self.requests.get(key, 0) + 1
+            self.durations.setdefault(endpoint, Histogram()).observe(duration)
+
+    def record_stages(self, endpoint, timer, response) :
+        if timer is NULL_TIMER :
+            return response
+        response.headers["Server-Timing"] = timer.header()
+        with self.lock :
+            for stage, duration in timer.stages :
+                self.stages.setdefault((endpoint, stage), Histogram()).observe(duration)
+        return response
+
+    def state(self) :
+        with self.lock :
+            state = {"pid": os.getpid(),
+                     "requests": [[endpoint, status, count]
+                                  for (endpoint, status), count in self.requests.items()],
+                     "durations": [[endpoint, histogram.counts, histogram.sum]
+                                   for endpoint, histogram in self.durations.items()],
+                     "stages": [[endpoint, stage, histogram.counts, histogram.sum]
+                                for (endpoint, stage), histogram in self.stages.items()],
+                     "in_flight": self.in_flight}
+        state["caches"] = {name : list(counts()) for name, counts in self.caches.items()}
+        state["queues"] = {name : stats() for name, stats in self.queues.items()}
+        return state
+
+    def schedule_dump(self) :
+        # Écriture immédiate, ou différée à la fin de l'intervalle : un worker
+        # qui ne reçoit plus de requêtes publie quand même ses derniers compteurs
+        delay = self.dumped + DUMP_INTERVAL - time.monotonic()
+        if delay <= 0 :
+            self.dump()
+            return
+        with self.lock :
+            if self.flush is not None :
+                return
+            self.flush = threading.Timer(delay, self.dump)
+            self.flush.daemon = True
+        self.flush.start()
+
+    def dump(self) :
+        # Écriture atomique : /metrics ne lit jamais un fichier à moitié écrit
+        with self.lock :
+            self.flush = None
+        self.dumped = time.monotonic()
+        path = os.path.join(self.directory, f"{os.getpid()}.json")
+        temporary = f"{path}.{threading.get_ident()}.tmp"
+        with open(temporary, "w") as file :
+            json.dump(self.state(), file)
+        os.replace(temporary, path)
+
+    def collect(self) :
+        if self.directory is None :
+            return merge_states([self.state()])
+        self.dump()
+        states = []
+        for path in glob.glob(os.path.join(self.directory, "*.json")) :
+            try :
+                with open(path) as file :
+                    states.append(json.load(file))
+            except (OSError, ValueError) :
+                continue
+        return merge_states(states)
+
+    def render(self) :
+        merged = self.collect()
+        lines = ["# HELP api_requests_total Requests handled, by endpoint and status.",
+                 "# TYPE api_requests_total counter"]
+        for (endpoint, status), count in sorted(merged["requests"].items()) :
+            lines.append(f'api_requests_total{{endpoint="{endpoint}",status="{status}"}} {count}')
+        lines += ["# HELP api_request_duration_seconds Request latency, by endpoint.",
+                  "# TYPE api_request_duration_seconds histogram"]
+        for endpoint, histogram in sorted(merged["durations"].items()) :
+            lines += histogram.lines("api_request_duration_seconds", f'endpoint="{endpoint}"')
+        lines += ["# HELP api_stage_duration_seconds Latency of each stage of a request.",
+                  "# TYPE api_stage_duration_seconds histogram"]
+        for (endpoint, stage), histogram in sorted(merged["stages"].items()) :
+            lines += histogram.lines("api_stage_duration_seconds",
+                                     f'endpoint="{endpoint}",stage="{stage}"')
+        lines += ["# HELP api_requests_in_flight Requests being handled.",
+                  "# TYPE api_requests_in_flight gauge",
+                  f"api_requests_in_flight {merged['in_flight']}"]
+        lines += ["# HELP api_cache_hits_total Cache hits, by cache.",
+                  "# TYPE api_cache_hits_total counter"]
+        counts = dict(sorted(merged["caches"].items()))
+        for name, (hits, _) in counts.items() :
+            lines.append(f'api_cache_hits_total{{cache="{name}"}} {hits}')
+        lines += ["# HELP api_cache_misses_total Cache misses, by cache.",
+                  "# TYPE api_cache_misses_total counter"]
+        for name, (_, misses) in counts.items() :
+            lines.append(f'api_cache_misses_total{{cache="{name}"}} {misses}')
+        stats = dict(sorted(merged["queues"].items()))
+        for metric, key, kind, description in [
+                ("api_queue_depth", "depth", "gauge", "Jobs queued or running, by queue."),
+                ("api_queue_capacity", "capacity", "gauge", "Maximum number of jobs, by queue."),
+                ("api_queue_shed_total", "shed", "counter", "Jobs dropped because the queue was full."),
+                ("api_queue_deferred_total", "deferred", "counter",
+                 "Responses sent before their job finished."),
+                ("api_queue_completed_total", "completed", "counter", "Jobs completed, by queue."),
+                ("api_queue_failed_total", "failed", "counter", "Jobs that raised an error.")] :
+            lines += [f"# HELP {metric} {description}", f"# TYPE {metric} {kind}"]
+            for name, values in stats.items() :
+                lines.append(f'{metric}{{queue="{name}"}} {values[key]}')
+        lines += ["# HELP api_info Configuration of the running model and explainer.",
+                  "# TYPE api_info gauge"]
+        labels = ",".join(f'{key}="{value}"' for key, value in sorted(self.info.items()))
+        lines.append(f"api_info{{{labels}}} 1")
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,107 @@
+import numpy as np
+
+N_COMPONENTS = 32
+RERANK = 10
+QUANT_RANGE = 8.0
+BRUTE_FORCE_ROWS = 50000
+N_PROBE = 16
+SAMPLE_SIZE = 20000
+KMEANS_ITERATIONS = 10
+BLOCK_SIZE = 65536
+MAX_NEIGHBOURS = 100
+
+
+def kmeans(points, n_clusters, iterations, generator) :
+    centroids = points[generator.choice(len(points), n_clusters, replace = False)]
+    for _ in range(iterations) :
+        labels = nearest_centroids(points, centroids)
+        for cluster in range(n_clusters) :
+            members = points[labels == cluster]
+            if len(members) :
+                centroids[cluster] = members.mean(axis = 0)
+    return centroids
+
+def nearest_centroids(points, centroids) :
+    distances = (centroids ** 2).sum(axis = 1) / 2 - points @ centroids.T
+    return distances.argmin(axis = 1)
+
+
+class NeighbourIndex :
+
+    def __init__(self, matrix, n_components = N_COMPONENTS, brute_force_rows = BRUTE_FORCE_ROWS,
+                 n_probe = N_PROBE, seed = 0, standardize = True) :
+        generator = np.random.default_rng(seed)
+        matrix = np.asarray(matrix)
+        n_rows = len(matrix)
+        self.mean = np.nanmean(matrix, axis = 0)
+        if standardize :
+            scale = np.nanstd(matrix, axis = 0)
+        else :
+            # Variables déjà sur une même échelle (valeurs SHAP) : une seule
+            # échelle, qui garde leurs poids relatifs et cadre la quantification
+            scale = np.full(matrix.shape[1], np.nanstd(matrix - self.mean))
+        self.scale = np.where(scale > 0, scale, 1.0)
+        # Premières composantes principales, estimées sur un échantillon
+        sample = self.standardize(matrix[np.sort(generator.choice(
+            n_rows, min(n_rows, SAMPLE_SIZE), replace = False))])
+        _, _, vt = np.linalg.svd(sample, full_matrices = False)
+        self.components = np.ascontiguousarray(vt[: n_components].T, dtype = np.float32)
+        # Recherche grossière sur les projections, puis classement exact des
+        # meilleurs candidats sur les vecteurs standardisés quantifiés (int8)
+        self.projected = np.empty((n_rows, self.components.shape[1]), dtype = np.float32)
+        self.codes = np.empty(matrix.shape, dtype = np.int8)
+        for start in range(0, n_rows, BLOCK_SIZE) :
+            values = self.standardize(matrix[start : start + BLOCK_SIZE])
+            self.projected[start : start + BLOCK_SIZE] = values @ self.components
+            self.codes[start : start + BLOCK_SIZE] = np.round(
+                np.clip(values, -QUANT_RANGE, QUANT_RANGE) * (127 / QUANT_RANGE))
+        # Au-delà de brute_force_rows, seules les partitions (k-means) les plus
+        # proches de la requête sont parcourues ; les lignes sont rangées par
+        # partition pour que chacune soit un bloc contigu
+        self.centroids = None
+        self.order = None
+        self.n_probe = n_probe
+        if n_rows > brute_force_rows :
+            n_lists = min(int(np.sqrt(n_rows)), 4096)
+            self.centroids = kmeans(self.projected[generator.choice(
+                n_rows, min(n_rows, max(SAMPLE_SIZE, 4 * n_lists)), replace = False)],
+                n_lists, KMEANS_ITERATIONS, generator)
+            labels = np.concatenate([nearest_centroids(self.projected[start : start + BLOCK_SIZE],
+                                                       self.centroids)
+                                     for start in range(0, n_rows, BLOCK_SIZE)])
+            self.order = np.argsort(labels, kind = "stable")
+            self.rank = np.empty(n_rows, dtype = np.int64)
+            self.rank[self.order] = np.arange(n_rows)
+            self.offsets = np.searchsorted(labels[self.order], np.arange(n_lists + 1))
+            self.projected = self.projected[self.order]
+            self.codes = self.codes[self.order]
+        self.half_norms = (self.projected ** 2).sum(axis = 1) / 2
+
+    def standardize(self, values) :
+        values = (np.asarray(values, dtype = np.float64) - self.mean) / self.scale
+        return np.nan_to_num(values, nan = 0.0)
+
+    def candidates(self, query) :
+        lists = np.argsort(((self.centroids - query) ** 2).sum(axis = 1))[: self.n_probe]
+        return [slice(self.offsets[i], self.offsets[i + 1]) for i in lists]
+
+    def query(self, position, k) :
+        location = position if self.order is None else self.rank[position]
+        query = self.projected[location]
+        if self.centroids is None :
+            locations = None
+            distances = self.half_norms - self.projected @ query
+        else :
+            slices = self.candidates(query)
+            locations = np.concatenate([np.arange(part.start, part.stop) for part in slices])
+            distances = np.concatenate([self.half_norms[part] for part in slices]) \
+                - np.concatenate([self.projected[part] for part in slices]) @ query
+        n_rerank = min(len(distances), (k + 1) * RERANK)
+        best = np.argpartition(distances, n_rerank - 1)[: n_rerank]
+        best = best if locations is None else locations[best]
+        best = best[best != location]
+        differences = self.codes[best].astype(np.float32) - self.codes[location]
+        distances = np.sqrt((differences ** 2).sum(axis = 1)) * (QUANT_RANGE / 127)
+        order = np.argsort(distances, kind = "stable")[: k]
+        best = best[order]
+        return (best if self.order is None else self.order[best]), distances[order]
@@ -0,0 +1,24 @@
+import numpy as np
+
+PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+
+def select_page(n_rows, family_index, filters, offset, limit) :
+    # Nombre de lignes retenues par les filtres et positions de la page demandée
+    if not filters :
+        return n_rows, np.arange(min(offset, n_rows), min(offset + limit, n_rows))
+    positions = family_index.filter(filters)
+    return len(positions), positions[offset : offset + limit]
+
+def encode_columns(df, columns, positions) :
+    # Un tableau de valeurs par colonne : chaque nom n'est transmis qu'une
+    # fois ; la conversion (null pour NaN en JSON) est faite par l'encodeur
+    return {column : df[column].to_numpy()[positions] for column in columns}
+
+def encode_families(family_index, families, positions) :
+    # Une famille one-hot en un code par ligne (0 : aucune catégorie,
+    # i + 1 : categories[i]) au lieu d'une colonne par catégorie
+    return {family : {"categories": family_index.members[family],
+                      "codes": family_index.codes[family][positions]}
+            for family in families}
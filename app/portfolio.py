@@ -0,0 +1,53 @@
+import numpy as np
+
+MAX_THRESHOLDS = 1000
+CHUNK_SIZE = 65536
+
+
+def score_all(predictor, values, chunk_size = CHUNK_SIZE) :
+    scores = np.empty(len(values), dtype = np.float64)
+    for start in range(0, len(values), chunk_size) :
+        scores[start : start + chunk_size] = \
+            predictor.predict_proba(values[start : start + chunk_size])[:, 1]
+    return scores
+
+
+class ScoreDistribution :
+
+    def __init__(self, scores, family_index = None) :
+        self.scores = scores
+        self.sorted = np.sort(scores)
+        # Scores triés de chaque catégorie one-hot : une recherche dichotomique
+        # donne le nombre de clients acceptés dans la catégorie
+        self.families = family_index.members if family_index is not None else {}
+        self.categories = {column : np.sort(scores[rows])
+                           for column, rows in family_index.rows.items()} \
+            if family_index is not None else {}
+
+    def accepted(self, sorted_scores, thresholds) :
+        # Un client est accepté si son score ne dépasse pas le seuil
+        return np.searchsorted(sorted_scores, thresholds, side = "right")
+
+    def acceptance(self, sorted_scores, thresholds) :
+        accepted = self.accepted(sorted_scores, thresholds)
+        total = len(sorted_scores)
+        rates = accepted / total if total else np.full(len(thresholds), np.nan)
+        return {"total": total, "accepted": accepted.tolist(),
+                "acceptance_rate": [None if np.isnan(rate) else rate for rate in rates.tolist()]}
+
+    def summary(self, thresholds, families) :
+        output = self.acceptance(self.sorted, thresholds)
+        output["families"] = {family : {column : self.acceptance(self.categories[column], thresholds)
+                                        for column in self.families[family]}
+                              for family in families}
+        return output
+
+    def histogram(self, bins) :
+        # Effectifs par intervalle : différences des rangs des bornes
+        edges = np.linspace(0, 1, bins + 1)
+        ranks = np.searchsorted(self.sorted, edges, side = "right")
+        ranks[0] = np.searchsorted(self.sorted, 0, side = "left")
+        return {"edges": edges.tolist(), "counts": np.diff(ranks).tolist()}
+
+    def percentile(self, score) :
+        return float(100 * np.searchsorted(self.sorted, score, side = "right") / len(self.sorted))
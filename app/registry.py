@@ -0,0 +1,203 @@
+import argparse
+import json
+import os
+import shutil
+import sys
+import threading
+import time
+from shap_cache import file_digest
+
+METADATA_FILE_NAME = "metadata.json"
+CURRENT_FILE_NAME = "CURRENT"
+CLASSIFIER_FILE_NAME = "classifier.pkl"
+CSV_FILE_NAME = "data.csv"
+CLIENT_IDS_FILE_NAME = "client_ids.csv"
+
+
+class ModelRegistry :
+
+    def __init__(self, root) :
+        self.root = root
+
+    def versions(self) :
+        # Une version n'est visible qu'une fois ses métadonnées écrites
+        if not os.path.isdir(self.root) :
+            return []
+        return sorted(name for name in os.listdir(self.root)
+                      if os.path.isfile(os.path.join(self.root, name, METADATA_FILE_NAME)))
+
+    def metadata(self, version) :
+        with open(os.path.join(self.root, version, METADATA_FILE_NAME)) as file :
+            return json.load(file)
+
+    def current(self) :
+        # Version désignée par le fichier CURRENT, sinon la plus récente
+        versions = self.versions()
+        try :
+            with open(os.path.join(self.root, CURRENT_FILE_NAME)) as file :
+                version = file.read().strip()
+            if version in versions :
+                return version
+        except FileNotFoundError :
+            pass
+        return versions[-1] if versions else None
+
+    def activate(self, version) :
+        if version not in self.versions() :
+            raise KeyError(version)
+        temporary_file_name = os.path.join(self.root, f".{CURRENT_FILE_NAME}.{os.getpid()}")
+        with open(temporary_file_name, "w") as file :
+            file.write(version)
+        os.replace(temporary_file_name, os.path.join(self.root, CURRENT_FILE_NAME))
+
+    def signature(self, version) :
+        # Taille et date des fichiers : change quand une version est corrigée
+        directory = os.path.join(self.root, version)
+        return sorted((name, stat.st_size, stat.st_mtime_ns)
+                      for name, stat in ((name, os.stat(os.path.join(directory, name)))
+                                         for name in os.listdir(directory)))
+
+    def artifacts(self, version) :
+        # Les fichiers de données et d'identifiants sont facultatifs : à
+        # défaut, ceux de l'application
+        directory = os.path.join(self.root, version)
+        optional = [os.path.join(directory, name) for name in [CSV_FILE_NAME, CLIENT_IDS_FILE_NAME]]
+        return (os.path.join(directory, CLASSIFIER_FILE_NAME),
+                *[name if os.path.exists(name) else None for name in optional])
+
+    def publish(self, classifier_file_name, csv_file_name = None, version = None,
+                description = "", ids_file_name = None) :
+        version = version or time.strftime("%Y%m%d-%H%M%S")
+        if version.startswith(".") or os.sep in version :
+            raise ValueError(f"Invalid version name: {version}")
+        if (csv_file_name is None) != (ids_file_name is None) :
+            raise ValueError("A data file must be published with its client identifiers")
+        if os.path.exists(os.path.join(self.root, version)) :
+            raise ValueError(f"Version already exists: {version}")
+        # Copie dans un dossier temporaire renommé à la fin : une version
+        # n'est jamais visible à moitié écrite
+        temporary_dir = os.path.join(self.root, f".{version}.{os.getpid()}")
+        os.makedirs(temporary_dir)
+        files = {CLASSIFIER_FILE_NAME : classifier_file_name}
+        if csv_file_name is not None :
+            files[CSV_FILE_NAME] = csv_file_name
+            files[CLIENT_IDS_FILE_NAME] = ids_file_name
+        for target, source in files.items() :
+            shutil.copyfile(source, os.path.join(temporary_dir, target))
+        metadata = {"version": version, "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                    "description": description,
+                    "files": {target : file_digest(os.path.join(temporary_dir, target))
+                              for target in files}}
+        with open(os.path.join(temporary_dir, METADATA_FILE_NAME), "w") as file :
+            json.dump(metadata, file, indent = 2)
+        os.rename(temporary_dir, os.path.join(self.root, version))
+        return version
+
+
+class ModelSlot :
+
+    def __init__(self, load, model, on_swap = None) :
+        self.load = load
+        self.model = model
+        self.on_swap = on_swap
+        self.loading = None
+        self.error = None
+        self.failed = None
+        self.lock = threading.Lock()
+        self.watch_pid = None
+
+    def reserve(self, version) :
+        # Un seul chargement à la fois, réservé sous le verrou
+        with self.lock :
+            if self.loading is not None :
+                return False
+            self.loading = version
+            return True
+
+    def run_swap(self, version, on_success = None) :
+        try :
+            # Le modèle courant sert les requêtes pendant le chargement ; une
+            # requête déjà commencée garde sa référence à l'ancien modèle
+            model = self.load(version)
+            self.model = model
+            self.error = None
+            self.failed = None
+            if self.on_swap is not None :
+                self.on_swap(model)
+            if on_success is not None :
+                on_success(version)
+        except Exception as error :
+            self.error = f"{version}: {error}"
+            self.failed = version
+        finally :
+            self.loading = None
+
+    def swap(self, version, on_success = None) :
+        if not self.reserve(version) :
+            return False
+        self.run_swap(version, on_success)
+        return True
+
+    def swap_in_background(self, version, on_success = None) :
+        if not self.reserve(version) :
+            return False
+        threading.Thread(target = self.run_swap, args = (version, on_success),
+                         daemon = True).start()
+        return True
+
+    def watch(self, registry, interval) :
+        # Démarrage paresseux, un thread par processus (cf. MicroBatcher)
+        with self.lock :
+            if self.watch_pid == os.getpid() :
+                return
+            self.watch_pid = os.getpid()
+        def run() :
+            signature = None
+            while True :
+                time.sleep(interval)
+                version = registry.current()
+                if version in [None, self.model.version] :
+                    continue
+                # Une version en échec n'est retentée que si ses fichiers ont changé
+                if version == self.failed and registry.signature(version) == signature :
+                    continue
+                signature = registry.signature(version)
+                self.swap(version)
+        threading.Thread(target = run, daemon = True).start()
+
+
+def main(argv) :
+    parser = argparse.ArgumentParser(description = "Versioned model registry")
+    commands = parser.add_subparsers(dest = "command", required = True)
+    publish = commands.add_parser("publish")
+    publish.add_argument("root")
+    publish.add_argument("classifier")
+    publish.add_argument("--data")
+    publish.add_argument("--ids")
+    publish.add_argument("--version")
+    publish.add_argument("--description", default = "")
+    publish.add_argument("--activate", action = "store_true")
+    activate = commands.add_parser("activate")
+    activate.add_argument("root")
+    activate.add_argument("version")
+    listing = commands.add_parser("list")
+    listing.add_argument("root")
+    args = parser.parse_args(argv)
+    registry = ModelRegistry(args.root)
+    if args.command == "publish" :
+        os.makedirs(args.root, exist_ok = True)
+        version = registry.publish(args.classifier, args.data, args.version, args.description,
+                                   args.ids)
+        if args.activate :
+            registry.activate(version)
+        print(f"{args.classifier} -> {os.path.join(args.root, version)}")
+    elif args.command == "activate" :
+        registry.activate(args.version)
+    else :
+        current = registry.current()
+        for version in registry.versions() :
+            print(("* " if version == current else "  ") + version)
+
+
+if __name__ == "__main__" :
+    main(sys.argv[1 :])
@@ -0,0 +1,61 @@
+import hashlib
+import glob
+import os
+import numpy as np
+
+CHUNK_SIZE = 256
+
+
+def file_digest(file_name) :
+    digest = hashlib.sha256()
+    with open(file_name, "rb") as file :
+        for block in iter(lambda : file.read(1 << 20), b"") :
+            digest.update(block)
+    return digest.hexdigest()
+
+def cache_key(file_names, *params) :
+    digest = hashlib.sha256()
+    for file_name in file_names :
+        digest.update(file_digest(file_name).encode())
+    for param in params :
+        digest.update(str(param).encode())
+    return digest.hexdigest()[:16]
+
+def precompute_shap_values(df, explainer, file_name, chunk_size = CHUNK_SIZE) :
+    # Écriture par blocs dans un fichier temporaire puis renommage atomique
+    tmp_file_name = f"{file_name}.{os.getpid()}.tmp"
+    matrix = np.lib.format.open_memmap(tmp_file_name, mode = "w+",
+                                       dtype = np.float64, shape = df.shape)
+    for start in range(0, len(df), chunk_size) :
+        chunk = df.iloc[start : start + chunk_size]
+        matrix[start : start + len(chunk)] = explainer.shap_values(chunk)
+    matrix.flush()
+    del matrix
+    os.replace(tmp_file_name, file_name)
+
+def load_shap_cache(df, explainer, cache_dir, key, chunk_size = CHUNK_SIZE) :
+    os.makedirs(cache_dir, exist_ok = True)
+    file_name = os.path.join(cache_dir, f"shap_{key}.npy")
+    if not os.path.exists(file_name) :
+        for old_file_name in glob.glob(os.path.join(cache_dir, "shap_*.npy")) :
+            os.remove(old_file_name)
+        precompute_shap_values(df, explainer, file_name, chunk_size)
+    return np.load(file_name, mmap_mode = "r")
+
+
+class PrecomputedExplainer :
+
+    def __init__(self, explainer, shap_matrix, index) :
+        self.explainer = explainer
+        self.shap_matrix = shap_matrix
+        self.index = index
+        self.hits = 0
+        self.misses = 0
+
+    def shap_values(self, rows) :
+        positions = self.index.get_indexer(rows.index)
+        if (positions < 0).any() :
+            self.misses += len(positions)
+            return self.explainer.shap_values(rows)
+        self.hits += len(positions)
+        return np.asarray(self.shap_matrix[positions])
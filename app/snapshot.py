@@ -0,0 +1,101 @@
+import hashlib
+import json
+import os
+import shutil
+import sys
+import numpy as np
+import pandas as pd
+
+MANIFEST_FILE_NAME = "manifest.json"
+# Dossier des instantanés, hors du dossier de l'application quand celui-ci
+# est monté depuis l'hôte (docker-compose) ; ils y sont alors régénérés
+SNAPSHOT_DIR = os.environ.get("SNAPSHOT_DIR")
+
+
+def snapshot_dir_name(csv_file_name, root = SNAPSHOT_DIR) :
+    if root is not None :
+        # Dossier commun à plusieurs CSV de même nom (data.csv de chaque
+        # version du registre) : nom distingué par le chemin absolu du CSV
+        name = os.path.splitext(os.path.basename(csv_file_name))[0]
+        digest = hashlib.sha256(os.path.abspath(csv_file_name).encode()).hexdigest()[:12]
+        return os.path.join(root, f"{name}_{digest}_snapshot")
+    return os.path.splitext(csv_file_name)[0] + "_snapshot"
+
+def source_signature(csv_file_name) :
+    stat = os.stat(csv_file_name)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+def is_current(snapshot_dir, csv_file_name) :
+    try :
+        with open(os.path.join(snapshot_dir, MANIFEST_FILE_NAME)) as file :
+            return json.load(file)["source"] == source_signature(csv_file_name)
+    except (OSError, ValueError, KeyError) :
+        return False
+
+def write_snapshot(csv_file_name, snapshot_dir = None, df = None) :
+    snapshot_dir = snapshot_dir or snapshot_dir_name(csv_file_name)
+    os.makedirs(snapshot_dir, exist_ok = True)
+    df = pd.read_csv(csv_file_name) if df is None else df
+    for column in df.columns :
+        if not pd.api.types.is_numeric_dtype(df[column]) :
+            raise ValueError(f"Non-numeric column cannot be memory-mapped: {column}")
+    # Une matrice par type, stockée colonne par colonne (ordre Fortran)
+    groups = []
+    for dtype, columns in df.columns.groupby(df.dtypes.astype(str)).items() :
+        file_name = f"{dtype}.npy"
+        matrix = np.asfortranarray(df[list(columns)].to_numpy())
+        np.save(os.path.join(snapshot_dir, file_name), matrix)
+        groups.append({"dtype": dtype, "file": file_name, "columns": list(columns)})
+    manifest = {"rows": len(df), "columns": list(df.columns), "groups": groups,
+                "source": source_signature(csv_file_name)}
+    with open(os.path.join(snapshot_dir, MANIFEST_FILE_NAME), "w") as file :
+        json.dump(manifest, file)
+    return snapshot_dir
+
+def read_snapshot(snapshot_dir) :
+    with open(os.path.join(snapshot_dir, MANIFEST_FILE_NAME)) as file :
+        manifest = json.load(file)
+    matrices = [np.load(os.path.join(snapshot_dir, group["file"]), mmap_mode = "r")
+                for group in manifest["groups"]]
+    # copy = False : les colonnes restent projetées en mémoire depuis les fichiers
+    if len(matrices) == 1 and manifest["groups"][0]["columns"] == manifest["columns"] :
+        df = pd.DataFrame(matrices[0], columns = manifest["columns"], copy = False)
+    else :
+        data = {column : matrix[:, i]
+                for group, matrix in zip(manifest["groups"], matrices)
+                for i, column in enumerate(group["columns"])}
+        df = pd.DataFrame({column : data[column] for column in manifest["columns"]},
+                          copy = False)
+    return df, manifest
+
+def load_table(csv_file_name, snapshot_dir = None, refresh = None) :
+    snapshot_dir = snapshot_dir or snapshot_dir_name(csv_file_name)
+    if os.path.exists(os.path.join(snapshot_dir, MANIFEST_FILE_NAME)) :
+        df, manifest = read_snapshot(snapshot_dir)
+        if not os.path.exists(csv_file_name) \
+                or manifest["source"] == source_signature(csv_file_name) :
+            return df
+    # Une copie regroupe les colonnes en un seul bloc par type, sans quoi
+    # chaque extraction de ligne reparcourt toutes les colonnes
+    df = pd.read_csv(csv_file_name).copy()
+    if refresh is None :
+        refresh = SNAPSHOT_DIR is not None
+    if refresh :
+        # Instantané absent ou périmé, réécrit pour les démarrages suivants :
+        # écrit à part puis mis en place, l'ancien peut encore être projeté
+        # en mémoire par un autre processus
+        temporary_dir = write_snapshot(csv_file_name, f"{snapshot_dir}.{os.getpid()}", df)
+        shutil.rmtree(snapshot_dir, ignore_errors = True)
+        try :
+            os.rename(temporary_dir, snapshot_dir)
+        except OSError :
+            # Un autre worker a mis le sien en place entre-temps
+            shutil.rmtree(temporary_dir, ignore_errors = True)
+            if not is_current(snapshot_dir, csv_file_name) :
+                raise
+    return df
+
+
+if __name__ == "__main__" :
+    for csv_file_name in sys.argv[1 :] or ["data.csv"] :
+        print(f"{csv_file_name} -> {write_snapshot(csv_file_name)}")
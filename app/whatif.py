@@ -0,0 +1,31 @@
+import numpy as np
+
+MAX_GRID_SIZE = 100
+MAX_GRID_POINTS = 2500
+SAMPLE_SIZE = 200
+
+
+def sample_positions(n_rows, size = SAMPLE_SIZE, seed = 0) :
+    generator = np.random.default_rng(seed)
+    return np.sort(generator.choice(n_rows, size = min(size, n_rows), replace = False))
+
+def quantile_grid(values, size) :
+    # Valeurs observées régulièrement espacées en quantiles, sans doublons :
+    # une variable discrète ou one-hot ne reçoit pas de valeurs intermédiaires
+    return np.unique(np.quantile(values[~np.isnan(values)], np.linspace(0, 1, size),
+                                 method = "nearest"))
+
+def make_grid(axes) :
+    # Produit cartésien des axes : une ligne par point, une colonne par variable
+    mesh = np.meshgrid(*axes, indexing = "ij")
+    return np.column_stack([axis.ravel() for axis in mesh])
+
+def perturb(rows, positions, grid) :
+    # Chaque ligne répétée pour chaque point de la grille, en une seule matrice
+    matrix = np.repeat(rows, len(grid), axis = 0)
+    matrix[:, positions] = np.tile(grid, (len(rows), 1))
+    return matrix
+
+def ice_curves(rows, positions, grid, predictor) :
+    probas = predictor.predict_proba(perturb(rows, positions, grid))[:, 1]
+    return probas.reshape(len(rows), len(grid))
@@ -0,0 +1,42 @@
+import os
+import sys
+import time
+
+APP_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../app"))
+sys.path.insert(0, APP_DIR)
+from app import load_data, CSV_FILE_NAME, CLASSIFIER_FILE_NAME
+from explainers import build_explainer, compare_explanations
+
+import numpy as np
+
+N_ROWS = 50
+MAX_DISPLAY = 10
+SIZES = [10, 50, 100, 200]
+
+def measure(explainer, rows) :
+    durations = []
+    for i in range(len(rows)) :
+        start = time.perf_counter()
+        explainer.shap_values(rows.iloc[i : i + 1])
+        durations.append(time.perf_counter() - start)
+    return np.median(durations) * 1000, np.asarray(explainer.shap_values(rows))
+
+df, classifier, reference_explainer = load_data(os.path.join(APP_DIR, CSV_FILE_NAME),
+                                                os.path.join(APP_DIR, CLASSIFIER_FILE_NAME),
+                                                background = "full")
+rows = df.sample(n = N_ROWS, random_state = 1)
+reference_latency, reference = measure(reference_explainer, rows)
+
+print(f"Référence : fond complet ({len(df)} lignes), {reference_latency:.3f} ms par ligne\n")
+print(f"{'stratégie':<12}{'taille':>7}{'ms/ligne':>10}{'top ' + str(MAX_DISPLAY):>9}"
+      f"{'même ordre':>12}{'écart top':>11}{'écart max':>11}")
+for strategy in ["default", "random", "stratified", "kmeans"] :
+    for size in ([100] if strategy == "default" else SIZES) :
+        explainer = build_explainer(classifier, df, "interventional", strategy, size)
+        latency, shap_values = measure(explainer, rows)
+        result = compare_explanations(reference, shap_values, MAX_DISPLAY)
+        print(f"{strategy:<12}{size:>7}{latency:>10.3f}"
+              f"{result['top_features_agreement']:>9.1%}"
+              f"{result['top_features_same_order']:>12.1%}"
+              f"{result['top_values_mean_abs_diff']:>11.4f}"
+              f"{result['max_abs_diff']:>11.4f}")
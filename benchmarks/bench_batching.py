@@ -0,0 +1,39 @@
+import os
+import subprocess
+import sys
+
+sys.path.insert(0, os.path.dirname(__file__))
+from load import run_load, wait_for_server
+
+APP_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../app"))
+PORT = int(os.environ.get("BENCH_PORT", "8123"))
+DURATION = float(os.environ.get("BENCH_DURATION", "10"))
+URL = f"http://127.0.0.1:{PORT}/api/predict"
+CONCURRENCY_LEVELS = [1, 4, 16, 64]
+SETTINGS = [("sans regroupement", {"PREDICT_BATCHING": "0"}),
+            ("2 ms / 32", {"PREDICT_BATCHING": "1", "BATCH_MAX_WAIT_MS": "2",
+                           "BATCH_MAX_SIZE": "32"}),
+            ("5 ms / 64", {"PREDICT_BATCHING": "1", "BATCH_MAX_WAIT_MS": "5",
+                           "BATCH_MAX_SIZE": "64"})]
+
+def make_payload(generator) :
+    return {"selected_index": int(generator.integers(1000)), "shap_max_display": 10}
+
+print(f"1 worker, {max(CONCURRENCY_LEVELS)} threads, {DURATION:.0f} s par mesure, moteur "
+      f"{os.environ.get('EXPLAINER_ENGINE', 'interventional')}\n")
+print(f"{'réglage':<20}{'clients':>8}{'req/s':>10}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+for name, env in SETTINGS :
+    server = subprocess.Popen(["gunicorn", "-c", "gunicorn.conf.py", "--workers", "1",
+                               "--threads", str(max(CONCURRENCY_LEVELS)),
+                               "--bind", f"127.0.0.1:{PORT}"],
+                              cwd = APP_DIR, env = {**os.environ, **env},
+                              stdout = subprocess.DEVNULL, stderr = subprocess.DEVNULL)
+    try :
+        wait_for_server(URL)
+        for concurrency in CONCURRENCY_LEVELS :
+            result = run_load(URL, make_payload, concurrency, DURATION)
+            print(f"{name:<20}{concurrency:>8}{result['throughput']:>10.1f}"
+                  f"{result['p50_ms']:>9.2f}{result['p95_ms']:>9.2f}{result['p99_ms']:>9.2f}")
+    finally :
+        server.terminate()
+        server.wait()
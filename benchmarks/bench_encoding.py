@@ -0,0 +1,86 @@
+import gzip
+import json
+import os
+import sys
+import time
+
+APP_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../app"))
+sys.path.insert(0, APP_DIR)
+from app import load_data, get_shap_values, get_batch_shap_values, get_batch_prediction, \
+    ACCEPTANCE, CSV_FILE_NAME, CLASSIFIER_FILE_NAME
+from compact import downcast
+from encoding import encode, unpack_array, msgpack, HAS_ARROW, JSON, MSGPACK, ARROW
+from pages import encode_columns
+
+import numpy as np
+import pandas as pd
+
+BATCH_SIZES = [1, 10, 100, 1000, 10000]
+N_CALLS = 20
+COMPRESSION_LEVEL = 5
+SHAP_MAX_DISPLAY = 10
+
+def median_time(function, n_calls) :
+    durations = []
+    for _ in range(n_calls) :
+        start = time.perf_counter()
+        function()
+        durations.append(time.perf_counter() - start)
+    return np.median(durations)
+
+def decoder(mimetype) :
+    if mimetype == MSGPACK :
+        return lambda body : msgpack.unpackb(body, ext_hook = unpack_array)
+    if mimetype == ARROW :
+        import pyarrow
+        return lambda body : pyarrow.ipc.open_stream(body).read_all()
+    return json.loads
+
+def report(output, mimetypes, table, label, n_calls) :
+    for mimetype in mimetypes :
+        body = encode(output, mimetype, table)
+        decode = decoder(mimetype)
+        encode_time = median_time(lambda : encode(output, mimetype, table), n_calls)
+        decode_time = median_time(lambda : decode(body), n_calls)
+        compressed = gzip.compress(body, COMPRESSION_LEVEL)
+        print(f"{label:>7}  {mimetype:<38}{encode_time * 1e3:12.2f}{decode_time * 1e3:12.2f}"
+              f"{len(body) / 1e3:11.1f}{len(compressed) / 1e3:9.1f}")
+
+generator = np.random.default_rng(0)
+mimetypes = [JSON] + ([MSGPACK] if msgpack is not None else [])
+tabular_mimetypes = mimetypes + ([ARROW] if HAS_ARROW else [])
+header = f"{'lignes':>7}  {'encodage':<38}{'encodage ms':>12}{'décodage ms':>12}" \
+         f"{'taille Ko':>11}{'gzip Ko':>9}"
+
+# Explication et score d'un client (/api/predict, /api/explanation), puis
+# lots de prédictions (/api/predict_batch), calculés avec le modèle de l'application
+model_df, classifier, explainer = load_data(os.path.join(APP_DIR, CSV_FILE_NAME),
+                                            os.path.join(APP_DIR, CLASSIFIER_FILE_NAME),
+                                            "native")
+print(f"Prédiction et explication d'un client ({SHAP_MAX_DISPLAY} variables) :")
+print(header)
+output = {}
+row = model_df.iloc[3 : 4]
+get_shap_values(row, explainer, SHAP_MAX_DISPLAY, output)
+get_batch_prediction(row, classifier, ACCEPTANCE, [output])
+report(output, mimetypes, None, 1, N_CALLS * 100)
+
+print(f"\nLots de prédictions avec explications ({SHAP_MAX_DISPLAY} variables) :")
+print(header)
+for batch_size in BATCH_SIZES :
+    rows = model_df.iloc[generator.integers(len(model_df), size = batch_size)]
+    outputs = [{} for _ in range(batch_size)]
+    get_batch_shap_values(rows, explainer, SHAP_MAX_DISPLAY, outputs)
+    get_batch_prediction(rows, classifier, ACCEPTANCE, outputs)
+    report({"predictions": outputs}, tabular_mimetypes, "predictions", batch_size,
+           max(3, N_CALLS * 10 // batch_size))
+
+# Pages du tableau des clients, comme servies par /api/data
+df = downcast(pd.read_csv(os.path.join(APP_DIR, "display_data.csv")))
+print("\nPages du tableau des clients (toutes les colonnes) :")
+print(header)
+for batch_size in BATCH_SIZES :
+    positions = np.sort(generator.integers(len(df), size = batch_size))
+    output = {"total": len(df), "offset": 0, "limit": batch_size, "positions": positions,
+              "columns": list(df.columns), "data": encode_columns(df, df.columns, positions)}
+    report(output, tabular_mimetypes, "data", batch_size, max(3, N_CALLS * 100 // batch_size))
@@ -0,0 +1,32 @@
+import os
+import sys
+import time
+
+APP_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../app"))
+sys.path.insert(0, APP_DIR)
+from app import load_data, CSV_FILE_NAME, CLASSIFIER_FILE_NAME
+from explainers import ENGINES, build_explainer, check_consistency
+
+import numpy as np
+
+N_ROWS = 50
+MAX_DISPLAY = 10
+
+df, classifier, _ = load_data(os.path.join(APP_DIR, CSV_FILE_NAME),
+                              os.path.join(APP_DIR, CLASSIFIER_FILE_NAME), "native")
+rows = df.iloc[:N_ROWS]
+explainers = {engine : build_explainer(classifier, df, engine) for engine in ENGINES}
+
+print(f"Latence par ligne ({N_ROWS} lignes, médiane) :")
+for engine, explainer in explainers.items() :
+    durations = []
+    for i in range(N_ROWS) :
+        start = time.perf_counter()
+        explainer.shap_values(rows.iloc[i : i + 1])
+        durations.append(time.perf_counter() - start)
+    print(f"  {engine:<20} {np.median(durations) * 1000:8.3f} ms")
+
+print(f"\nCohérence entre moteurs (top {MAX_DISPLAY}) :")
+for (engine_a, engine_b), result in check_consistency(explainers, rows, MAX_DISPLAY).items() :
+    print(f"  {engine_a} / {engine_b} : écart max {result['max_abs_diff']:.2e}, "
+          f"recouvrement top {MAX_DISPLAY} {result['top_features_agreement']:.1%}")
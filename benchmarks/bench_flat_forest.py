@@ -0,0 +1,43 @@
+import os
+import sys
+import time
+
+APP_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../app"))
+sys.path.insert(0, APP_DIR)
+from app import load_data, CSV_FILE_NAME, CLASSIFIER_FILE_NAME
+from flat_forest import FlatForest
+
+import numpy as np
+import pandas as pd
+
+N_CALLS = 500
+BATCH_ROWS = 100000
+
+def median_time(function, n_calls) :
+    function()
+    durations = []
+    for _ in range(n_calls) :
+        start = time.perf_counter()
+        function()
+        durations.append(time.perf_counter() - start)
+    return np.median(durations)
+
+df, classifier, _ = load_data(os.path.join(APP_DIR, CSV_FILE_NAME),
+                              os.path.join(APP_DIR, CLASSIFIER_FILE_NAME), "native")
+forest = FlatForest.from_booster(classifier.booster_)
+row = df.iloc[3 : 4]
+batch = pd.DataFrame(df.sample(n = BATCH_ROWS, replace = True, random_state = 0).to_numpy(),
+                     columns = df.columns)
+
+print(f"Latence sur une ligne (médiane de {N_CALLS} appels) :")
+for name, function in [("LightGBM, DataFrame", lambda : classifier.predict_proba(row)),
+                       ("LightGBM, tableau", lambda : classifier.predict_proba(row.to_numpy())),
+                       ("FlatForest, DataFrame", lambda : forest.predict_proba(row)),
+                       ("FlatForest, tableau", lambda : forest.predict_proba(row.to_numpy()))] :
+    print(f"  {name:<24}{median_time(function, N_CALLS) * 1e6:10.1f} µs")
+
+print(f"\nDébit sur {BATCH_ROWS} lignes :")
+for name, function in [("LightGBM", lambda : classifier.predict_proba(batch)),
+                       ("FlatForest", lambda : forest.predict_proba(batch))] :
+    duration = median_time(function, 3)
+    print(f"  {name:<24}{BATCH_ROWS / duration:12.0f} lignes/s")
@@ -0,0 +1,23 @@
+import os
+import sys
+
+APP_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../app"))
+sys.path.insert(0, APP_DIR)
+from compact import CompactFrame, downcast
+
+import pandas as pd
+
+def megabytes(size) :
+    return f"{size / 1e6:8.3f} Mo"
+
+df = pd.read_csv(os.path.join(APP_DIR, "data.csv"))
+frame = CompactFrame(df)
+print("API (app/data.csv) :")
+print(f"  pandas        {megabytes(df.memory_usage(deep = True).sum())}")
+print(f"  CompactFrame  {megabytes(frame.memory_usage())}  "
+      f"({len(frame.families)} familles one-hot codées sur un octet)")
+
+df = pd.read_csv(os.path.join(APP_DIR, "display_data.csv"))
+print("Données affichées (app/display_data.csv) :")
+print(f"  pandas        {megabytes(df.memory_usage(deep = True).sum())}")
+print(f"  types réduits {megabytes(downcast(df).memory_usage(deep = True).sum())}")
@@ -0,0 +1,50 @@
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+APP_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../app"))
+sys.path.insert(0, APP_DIR)
+from snapshot import write_snapshot
+
+import pandas as pd
+
+N_ROWS = int(os.environ.get("BENCH_ROWS", "100000"))
+REPEAT = 3
+
+def run(code, cwd, env = None) :
+    # Chaque mesure est faite dans un nouveau processus (démarrage à froid)
+    durations = []
+    for _ in range(REPEAT) :
+        script = f"import time\nstart = time.perf_counter()\n{code}\n" \
+                 "print(time.perf_counter() - start)"
+        result = subprocess.run([sys.executable, "-W", "ignore", "-c", script],
+                                cwd = cwd, capture_output = True, text = True, check = True,
+                                env = {**os.environ, "PYTHONPATH": APP_DIR, **(env or {})})
+        durations.append(float(result.stdout.split()[-1]))
+    return min(durations)
+
+with tempfile.TemporaryDirectory() as work_dir :
+    for file_name in ["data.csv", "classifier.pkl", "display_data.csv", "client_ids.csv"] :
+        shutil.copy(os.path.join(APP_DIR, file_name), work_dir)
+
+    print(f"Import de shap : {run('import shap', work_dir):.3f} s\n")
+
+    print("Démarrage de create_app (données de l'application) :")
+    for engine in ["interventional", "native"] :
+        for source in ["csv", "snapshot"] :
+            if source == "snapshot" :
+                write_snapshot(os.path.join(work_dir, "data.csv"))
+            duration = run("import app\napp.create_app()", work_dir, {"EXPLAINER_ENGINE": engine})
+            print(f"  {engine:<16}{source:<10}{duration:8.3f} s")
+        shutil.rmtree(os.path.join(work_dir, "data_snapshot"))
+
+    print(f"\nChargement de {N_ROWS} lignes :")
+    df = pd.read_csv(os.path.join(APP_DIR, "data.csv"))
+    big_csv_file_name = os.path.join(work_dir, "big.csv")
+    df.sample(n = N_ROWS, replace = True, random_state = 0).to_csv(big_csv_file_name, index = False)
+    code = "from snapshot import load_table\nload_table('big.csv')"
+    print(f"  csv       {run(code, work_dir):8.3f} s")
+    write_snapshot(big_csv_file_name)
+    print(f"  snapshot  {run(code, work_dir):8.3f} s")
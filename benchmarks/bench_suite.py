@@ -0,0 +1,223 @@
+import argparse
+import json
+import os
+import pickle
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(__file__))
+from load import run_load, wait_for_server
+
+APP_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../app"))
+sys.path.insert(0, APP_DIR)
+
+import numpy as np
+import pandas as pd
+
+TARGETS = ["load_data", "get_shap_values", "get_prediction", "predict_endpoint",
+           "importance_endpoint"]
+# Métriques pour lesquelles une valeur plus grande est une amélioration
+HIGHER_IS_BETTER = {"throughput"}
+
+
+def peak_rss_mb() :
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Octets sous macOS, kilo-octets sous Linux
+    return peak / 2 ** 20 if sys.platform == "darwin" else peak / 2 ** 10
+
+def summarize(durations) :
+    milliseconds = np.asarray(durations) * 1000
+    return {"p50_ms": float(np.percentile(milliseconds, 50)),
+            "p95_ms": float(np.percentile(milliseconds, 95)),
+            "p99_ms": float(np.percentile(milliseconds, 99))}
+
+def make_synthetic(work_dir, n_rows, seed) :
+    # Mêmes colonnes que data.csv (familles one-hot exclusives, autres
+    # variables dans [0, 1]), modèle entraîné sur une cible synthétique
+    from lightgbm import LGBMClassifier
+    from compact import ONE_HOT_FAMILIES
+    columns = pd.read_csv(os.path.join(APP_DIR, "data.csv"), nrows = 0).columns
+    generator = np.random.default_rng(seed)
+    values = generator.random((n_rows, len(columns)))
+    for family in ONE_HOT_FAMILIES :
+        members = [i for i, column in enumerate(columns) if column.startswith(family + "_")]
+        choices = generator.integers(len(members), size = n_rows)
+        values[:, members] = np.eye(len(members))[choices]
+    df = pd.DataFrame(values, columns = columns)
+    weights = generator.normal(size = len(columns)) * (generator.random(len(columns)) < 0.1)
+    target = (values @ weights + generator.normal(size = n_rows) > weights.sum() / 2).astype(int)
+    classifier = LGBMClassifier(n_estimators = 100, random_state = seed, verbose = -1)
+    classifier.fit(df, target)
+    df.to_csv(os.path.join(work_dir, "data.csv"), index = False)
+    display_df = df.copy()
+    display_df.insert(0, "SK_ID_CURR", 100000 + np.arange(n_rows))
+    display_df.to_csv(os.path.join(work_dir, "display_data.csv"), index = False)
+    display_df[["SK_ID_CURR"]].to_csv(os.path.join(work_dir, "client_ids.csv"), index = False)
+    with open(os.path.join(work_dir, "classifier.pkl"), "wb") as file :
+        pickle.dump(classifier, file)
+
+def measure(target, repeat, seed) :
+    # Exécuté dans un processus dédié, depuis le dossier des données synthétiques
+    import app
+    generator = np.random.default_rng(seed)
+    durations = []
+    if target == "create_app" :
+        start = time.perf_counter()
+        app.create_app()
+        durations.append(time.perf_counter() - start)
+    elif target == "load_data" :
+        for _ in range(repeat) :
+            start = time.perf_counter()
+            app.load_data(app.CSV_FILE_NAME, app.CLASSIFIER_FILE_NAME, app.EXPLAINER_ENGINE)
+            durations.append(time.perf_counter() - start)
+    elif target in ["get_shap_values", "get_prediction"] :
+        df, classifier, explainer = app.load_data(app.CSV_FILE_NAME, app.CLASSIFIER_FILE_NAME,
+                                                  app.EXPLAINER_ENGINE)
+        for index in generator.integers(len(df), size = repeat) :
+            row = df.iloc[index : index + 1]
+            start = time.perf_counter()
+            if target == "get_shap_values" :
+                app.get_shap_values(row, explainer, 10, {})
+            else :
+                app.get_prediction(row, classifier, app.ACCEPTANCE, {})
+            durations.append(time.perf_counter() - start)
+    else :
+        client = app.create_app().test_client()
+        n_rows = len(pd.read_csv(app.CSV_FILE_NAME, usecols = [0]))
+        for index in generator.integers(n_rows, size = repeat) :
+            start = time.perf_counter()
+            if target == "predict_endpoint" :
+                response = client.post("/api/predict", json = {"selected_index": int(index),
+                                                               "shap_max_display": 10})
+            else :
+                response = client.post("/api/importance", json = {"max_display": 10})
+            durations.append(time.perf_counter() - start)
+            assert response.status_code == 200
+    return {"durations": durations, "peak_rss_mb": peak_rss_mb()}
+
+def run_child(target, work_dir, repeat, seed) :
+    command = [sys.executable, "-W", "ignore", os.path.abspath(__file__), "--child", target,
+               "--repeat", str(repeat), "--seed", str(seed)]
+    result = subprocess.run(command, cwd = work_dir, capture_output = True, text = True,
+                            check = True, env = {**os.environ, "PYTHONPATH": APP_DIR})
+    return json.loads(result.stdout.splitlines()[-1])
+
+def run_throughput(work_dir, workers, concurrency, duration, n_rows, port) :
+    url = f"http://127.0.0.1:{port}/api/predict"
+    server = subprocess.Popen(["gunicorn", "-c", os.path.join(APP_DIR, "gunicorn.conf.py"),
+                               "--workers", str(workers), "--bind", f"127.0.0.1:{port}"],
+                              cwd = work_dir, env = {**os.environ, "PYTHONPATH": APP_DIR},
+                              stdout = subprocess.DEVNULL, stderr = subprocess.DEVNULL)
+    try :
+        wait_for_server(url)
+        make_payload = lambda generator : {"selected_index": int(generator.integers(n_rows)),
+                                           "shap_max_display": 10}
+        return run_load(url, make_payload, concurrency, duration)
+    finally :
+        server.terminate()
+        server.wait()
+
+def run_suite(args) :
+    results = {}
+    with tempfile.TemporaryDirectory() as work_dir :
+        make_synthetic(work_dir, args.rows, args.seed)
+        # Démarrage à froid : un nouveau processus par mesure
+        runs = [run_child("create_app", work_dir, 1, args.seed) for _ in range(args.cold_starts)]
+        results["create_app"] = {"cold_start_s": float(np.median([run["durations"][0]
+                                                                   for run in runs])),
+                                 "peak_rss_mb": max(run["peak_rss_mb"] for run in runs)}
+        for target in TARGETS :
+            repeat = args.repeat if target != "load_data" else max(1, args.repeat // 20)
+            run = run_child(target, work_dir, repeat, args.seed)
+            results[target] = {**summarize(run["durations"]), "peak_rss_mb": run["peak_rss_mb"]}
+        if args.duration > 0 and shutil.which("gunicorn") :
+            load = run_throughput(work_dir, args.workers, args.concurrency, args.duration,
+                                  args.rows, args.port)
+            results["load_predict"] = {key : load[key] for key in
+                                       ["throughput", "p50_ms", "p95_ms", "p99_ms", "errors"]}
+    return results
+
+def compare(results, baseline, threshold, min_delta_ms = 0.0) :
+    # Régression : métrique dégradée de plus de « threshold » (relatif), et
+    # de plus de « min_delta_ms » pour les latences, dont les plus courtes
+    # varient fortement d'une exécution à l'autre
+    regressions = []
+    for name, metrics in results.items() :
+        for metric, value in metrics.items() :
+            reference = baseline.get(name, {}).get(metric)
+            if not reference or metric == "errors" :
+                continue
+            change = value / reference - 1
+            if metric in HIGHER_IS_BETTER :
+                change = -change
+            if metric.endswith("_ms") and abs(value - reference) < min_delta_ms :
+                continue
+            if change > threshold :
+                regressions.append((name, metric, reference, value, change))
+    return regressions
+
+def main() :
+    parser = argparse.ArgumentParser(description = "Benchmark suite on synthetic data")
+    parser.add_argument("--rows", type = int, default = 1000)
+    parser.add_argument("--repeat", type = int, default = 200)
+    parser.add_argument("--cold-starts", type = int, default = 3)
+    parser.add_argument("--seed", type = int, default = 0)
+    parser.add_argument("--workers", type = int, default = 1)
+    parser.add_argument("--concurrency", type = int, default = 4)
+    parser.add_argument("--duration", type = float, default = 10)
+    parser.add_argument("--port", type = int, default = 8124)
+    parser.add_argument("--output", default = "bench_results.json")
+    parser.add_argument("--baseline")
+    parser.add_argument("--threshold", type = float, default = 0.2)
+    parser.add_argument("--min-delta-ms", type = float, default = 1.0)
+    parser.add_argument("--child", choices = ["create_app"] + TARGETS)
+    args = parser.parse_args()
+    if args.child :
+        print(json.dumps(measure(args.child, args.repeat, args.seed)))
+        return
+    from importlib.metadata import version
+    report = {
+        "environment": {"python": platform.python_version(), "machine": platform.machine(),
+                        "cpu_count": os.cpu_count(),
+                        **{package : version(package) for package in
+                           ["numpy", "pandas", "lightgbm", "shap", "flask"]}},
+        "parameters": {key : value for key, value in vars(args).items()
+                       if key not in ["output", "baseline", "child", "threshold",
+                                      "min_delta_ms"]},
+        "results": run_suite(args)
+    }
+    with open(args.output, "w") as file :
+        json.dump(report, file, indent = 2)
+    print(f"{'mesure':<22}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'RSS Mo':>9}")
+    for name, metrics in report["results"].items() :
+        if "cold_start_s" in metrics :
+            print(f"{name:<22}{'démarrage à froid':>30}{metrics['cold_start_s']:>8.2f} s"
+                  f"{metrics['peak_rss_mb']:>9.0f}")
+        elif "throughput" in metrics :
+            print(f"{name:<22}{metrics['p50_ms']:>10.2f}{metrics['p95_ms']:>10.2f}"
+                  f"{metrics['p99_ms']:>10.2f}   {metrics['throughput']:.1f} req/s")
+        else :
+            print(f"{name:<22}{metrics['p50_ms']:>10.2f}{metrics['p95_ms']:>10.2f}"
+                  f"{metrics['p99_ms']:>10.2f}{metrics['peak_rss_mb']:>9.0f}")
+    print(f"\nRésultats : {args.output}")
+    if args.baseline :
+        with open(args.baseline) as file :
+            baseline = json.load(file)
+        if baseline["parameters"] != report["parameters"] :
+            print("Attention : paramètres différents de ceux de la référence")
+        regressions = compare(report["results"], baseline["results"], args.threshold,
+                              args.min_delta_ms)
+        for name, metric, reference, value, change in regressions :
+            print(f"RÉGRESSION {name}.{metric} : {reference:.4g} -> {value:.4g} ({change:+.0%})")
+        if regressions :
+            sys.exit(1)
+        print(f"Aucune régression au-delà de {args.threshold:.0%} par rapport à {args.baseline}")
+
+
+if __name__ == "__main__" :
+    main()
@@ -0,0 +1,33 @@
+import os
+import subprocess
+import sys
+
+sys.path.insert(0, os.path.dirname(__file__))
+from load import run_load, wait_for_server
+
+APP_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../app"))
+PORT = int(os.environ.get("BENCH_PORT", "8123"))
+DURATION = float(os.environ.get("BENCH_DURATION", "10"))
+URL = f"http://127.0.0.1:{PORT}/api/predict"
+
+def make_payload(generator) :
+    return {"selected_index": int(generator.integers(1000)), "shap_max_display": 10}
+
+cpu_count = os.cpu_count()
+worker_counts = sorted({1, 2, 4, 8, cpu_count} & set(range(1, cpu_count + 1)))
+print(f"{cpu_count} cœurs, {DURATION:.0f} s par mesure, moteur "
+      f"{os.environ.get('EXPLAINER_ENGINE', 'interventional')}\n")
+print(f"{'workers':>8}{'clients':>9}{'req/s':>10}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+for workers in worker_counts :
+    server = subprocess.Popen(["gunicorn", "-c", "gunicorn.conf.py",
+                               "--workers", str(workers), "--bind", f"127.0.0.1:{PORT}"],
+                              cwd = APP_DIR, stdout = subprocess.DEVNULL,
+                              stderr = subprocess.DEVNULL)
+    try :
+        wait_for_server(URL)
+        result = run_load(URL, make_payload, 2 * workers, DURATION)
+        print(f"{workers:>8}{2 * workers:>9}{result['throughput']:>10.1f}"
+              f"{result['p50_ms']:>9.2f}{result['p95_ms']:>9.2f}{result['p99_ms']:>9.2f}")
+    finally :
+        server.terminate()
+        server.wait()
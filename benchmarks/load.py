@@ -0,0 +1,62 @@
+import http.client
+import json
+import threading
+import time
+from urllib.parse import urlparse
+
+import numpy as np
+
+def run_load(url, make_payload, concurrency, duration) :
+    # Chaque client garde sa connexion HTTP ouverte et enchaîne les requêtes
+    target = urlparse(url)
+    deadline = time.perf_counter() + duration
+    latencies = [[] for _ in range(concurrency)]
+    errors = [0] * concurrency
+
+    def client(i) :
+        connection = http.client.HTTPConnection(target.hostname, target.port)
+        headers = {"Content-Type": "application/json"}
+        generator = np.random.default_rng(i)
+        while time.perf_counter() < deadline :
+            body = json.dumps(make_payload(generator))
+            start = time.perf_counter()
+            connection.request("POST", target.path, body, headers)
+            response = connection.getresponse()
+            response.read()
+            if response.status == 200 :
+                latencies[i].append(time.perf_counter() - start)
+            else :
+                errors[i] += 1
+        connection.close()
+
+    threads = [threading.Thread(target = client, args = (i,)) for i in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads :
+        thread.start()
+    for thread in threads :
+        thread.join()
+    elapsed = time.perf_counter() - start
+    all_latencies = np.concatenate([np.asarray(values) for values in latencies]) * 1000
+    if len(all_latencies) == 0 :
+        all_latencies = np.array([np.nan])
+    return {
+        "requests": int(sum(len(values) for values in latencies)),
+        "errors": int(sum(errors)),
+        "throughput": sum(len(values) for values in latencies) / elapsed,
+        "p50_ms": float(np.percentile(all_latencies, 50)),
+        "p95_ms": float(np.percentile(all_latencies, 95)),
+        "p99_ms": float(np.percentile(all_latencies, 99))
+    }
+
+def wait_for_server(url, timeout = 120) :
+    target = urlparse(url)
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline :
+        try :
+            connection = http.client.HTTPConnection(target.hostname, target.port, timeout = 1)
+            connection.request("GET", "/")
+            connection.getresponse().read()
+            return
+        except OSError :
+            time.sleep(0.2)
+    raise TimeoutError(f"Server not ready: {url}")
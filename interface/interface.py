@@ -4,16 +4,34 @@ import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
 import requests
+import os
+import threading
+import time
+from collections import OrderedDict
 
-CSV_FILE_NAME = "data.csv"
+try :
+    import msgpack
+except ImportError :
+    msgpack = None
+
+API_CACHE_SIZE = 256
+PAGE_SIZE = 50
+MODEL_VERSION_TTL = 60
+HISTOGRAM_BINS = 50
+DENSITY_BINS = 40
+EXPLANATION_ATTEMPTS = 5
+MSGPACK = "application/msgpack"
+# Extension MessagePack de l'API pour les tableaux NumPy (cf. app/encoding.py)
+ARRAY_EXT_TYPE = 1
 #API_URL = "http://localhost:5000/api/" 
-API_URL = "http://app:8000/api/"
+API_URL = os.environ.get("API_URL", "http://app:8000/api/")
 
 FILTERS = ["(aucun filtre)", "ORGANIZATION_TYPE", "EMERGENCYSTATE_MODE",
            "NAME_HOUSING_TYPE", "NAME_EDUCATION_TYPE", "NAME_TYPE_SUITE",
            "NAME_INCOME_TYPE", "NAME_FAMILY_STATUS", "OCCUPATION_TYPE",
            "WEEKDAY_APPR_PROCESS_START", "CODE_GENDER", "HOUSETYPE_MODE",
            "FONDKAPREMONT_MODE", "WALLSMATERIAL_MODE", "EMERGENCYSTATE_MODE"]
+FAMILIES = list(dict.fromkeys(FILTERS[1 :]))
 
 def main():
     """
@@ -22,72 +40,212 @@ def main():
     compare des variables avec possibilité de filtrer, affiche l'importance
     des variables et prédit le score du client.
     """
-    df, features = load_dataframe()
-    customer = select_customer(df)
-    display_feature(df, features, customer)
-    compare_features(df, features, customer)
+    total, features = load_dataframe()
+    customer, client, families = select_customer(total)
+    display_feature(features, customer, client, families)
+    compare_features(features, customer, client, families)
     display_feature_importance()
-    predict_score(customer)
+    predict_score(int(client["SK_ID_CURR"]))
+
+class ResponseCache :
+    """
+    Cache LRU borné des réponses de l'API, partagé par toutes les sessions.
+    """
+
+    def __init__(self, max_size) :
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key) :
+        with self.lock :
+            if key not in self.entries :
+                return None
+            self.entries.move_to_end(key)
+            return self.entries[key]
+
+    def put(self, key, value) :
+        with self.lock :
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size :
+                self.entries.popitem(last = False)
+
+@st.cache_resource
+def get_http_session() :
+    """
+    Retourne la session HTTP partagée par le processus, qui réutilise
+    ses connexions avec l'API (keep-alive) et lui demande des réponses
+    MessagePack lorsque le module est installé.
+    Returns :
+        requests.Session : La session HTTP.
+    """
+    session = requests.Session()
+    if msgpack is not None :
+        session.headers["Accept"] = f"{MSGPACK}, application/json;q=0.9"
+    return session
+
+def decode_array(code, data) :
+    """
+    Décode un tableau NumPy transmis par l'API en extension MessagePack :
+    son type sur 3 octets, suivi de ses valeurs brutes.
+    Args :
+        code (int) : Le type de l'extension.
+        data (bytes) : Le contenu de l'extension.
+    Returns :
+        np.ndarray : Le tableau décodé.
+    """
+    if code == ARRAY_EXT_TYPE :
+        return np.frombuffer(data[3 :], dtype = data[: 3].decode())
+    return msgpack.ExtType(code, data)
+
+def decode_response(response) :
+    """
+    Décode le contenu d'une réponse de l'API, en JSON ou en MessagePack
+    suivant son type.
+    Args :
+        response (requests.Response) : La réponse de l'API.
+    Returns :
+        dict : Le contenu de la réponse.
+    """
+    if response.headers.get("Content-Type", "").startswith(MSGPACK) :
+        return msgpack.unpackb(response.content, ext_hook = decode_array)
+    return response.json()
+
+@st.cache_resource
+def get_response_cache() :
+    """
+    Retourne le cache des réponses de l'API partagé par le processus.
+    Returns :
+        ResponseCache : Le cache des réponses.
+    """
+    return ResponseCache(API_CACHE_SIZE)
+
+@st.cache_data(ttl = MODEL_VERSION_TTL)
+def get_model_version() :
+    """
+    Interroge l'API sur la version du modèle servi, au plus une fois
+    par période MODEL_VERSION_TTL.
+    Returns :
+        str : La version du modèle.
+    """
+    response = get_http_session().get(API_URL + "version")
+    return decode_response(response)["model_version"]
+
+def call_api(endpoint, data) :
+    """
+    Envoie une requête à l'API, sauf si la même requête a déjà reçu une
+    réponse pour la version courante du modèle.
+    Args :
+        endpoint (str) : Le nom de la route de l'API.
+        data (dict) : Les paramètres de la requête.
+    Returns :
+        dict : Le contenu de la réponse.
+    """
+    version = get_model_version()
+    params = tuple(sorted(data.items()))
+    cache = get_response_cache()
+    content = cache.get((endpoint, params, version))
+    if content is None :
+        response = get_http_session().post(API_URL + endpoint, json = data)
+        content = decode_response(response)
+        response_version = response.headers.get("X-Model-Version", version)
+        if response_version != version :
+            get_model_version.clear()
+        # Une prédiction dont l'explication est encore en attente n'est pas conservée
+        if content.get("explanation_status", "complete") == "complete" :
+            cache.put((endpoint, params, response_version), content)
+    return content
+
+def fetch_data(**params) :
+    """
+    Lit une page du tableau des clients servie par l'API. La réponse est
+    conservée avec son ETag : une requête déjà faite n'est que revalidée,
+    sans que l'API ne renvoie les données.
+    Args :
+        params : Les paramètres de la page (offset, limit, columns,
+        families, filter).
+    Returns :
+        dict : Le nombre de clients retenus, leurs positions et les valeurs
+        des colonnes demandées.
+    """
+    key = ("data", tuple(sorted((name, str(value)) for name, value in params.items())))
+    cache = get_response_cache()
+    cached = cache.get(key)
+    headers = {"If-None-Match": cached[0]} if cached is not None else {}
+    response = get_http_session().get(API_URL + "data", params = params, headers = headers)
+    if response.status_code == 304 :
+        return cached[1]
+    content = decode_response(response)
+    cache.put(key, (response.headers.get("ETag"), content))
+    return content
 
 def load_dataframe() :
     """
-    Charge les données depuis un fichier CSV et affiche le dataframe.
+    Affiche une page du tableau des clients, lue depuis l'API.
     Returns :
-        pd.DataFrame : Le dataframe contenant les données.
-        list : La liste des noms des colonnes du dataframe.
+        int : Le nombre de clients.
+        list : La liste des noms des colonnes du tableau.
     """
-    df = pd.read_csv(CSV_FILE_NAME)
-    features = list(df.columns)
-    df = df[features]
     st.title("Fichier client")
     st.write("Le tableau ci-dessous affiche les données des clients.")
-    st.write(f"Il contient {df.shape[0]} lignes correspondant aux clients et \
-             {df.shape[1]} colonnes correspondant à leurs caractéristiques.")
-    st.write(df)
-    return df, features
+    summary = fetch_data(limit = 0)
+    total, features = summary["total"], summary["columns"]
+    st.write(f"Il contient {total} lignes correspondant aux clients et \
+             {len(features)} colonnes correspondant à leurs caractéristiques.")
+    label = f"Utilisez le sélecteur numérique ci-dessous pour choisir la \
+        page à afficher ({PAGE_SIZE} clients par page) :"
+    page = st.number_input(label, min_value = 0, max_value = max(0, (total - 1) // PAGE_SIZE))
+    data = fetch_data(offset = page * PAGE_SIZE, limit = PAGE_SIZE)
+    st.write(pd.DataFrame(data["data"], index = data["positions"], columns = data["columns"]))
+    return total, features
 
-def select_customer(df) :
+def select_customer(total) :
     """
     Permet à l'utilisateur de sélectionner un client à partir d'un index
     et affiche les informations du client sélectionné.
     Args :
-        df (pd.DataFrame) : Le dataframe contenant les données des clients.
+        total (int) : Le nombre de clients.
     Returns :
         int : L'index du client sélectionné.
+        pd.Series : Les caractéristiques du client sélectionné.
+        dict : Pour chaque famille de FILTERS, ses colonnes one-hot et la
+        catégorie du client (None s'il n'appartient à aucune).
     """
     st.title("Sélection du client")
     label = "Utilisez le sélecteur numérique ci-dessous pour \
         choisir l'index d'un client, ce qui permettra d'afficher \
         ses caractéristiques dans un tableau :"
-    customer = st.number_input(label, min_value = 0, max_value = len(df) - 1)
+    customer = st.number_input(label, min_value = 0, max_value = total - 1)
+    data = fetch_data(offset = customer, limit = 1, families = FAMILIES)
+    client = pd.Series({column : values[0] for column, values in data["data"].items()},
+                       index = data["columns"], name = customer)
+    # Une famille est transmise comme un code par client (0 : aucune catégorie)
+    families = {}
+    for family, family_data in data["families"].items() :
+        members, code = family_data["categories"], family_data["codes"][0]
+        families[family] = (members, members[code - 1] if code else None)
     st.write(f"Tableau des caractéristiques du client à l'index {customer} :")
-    st.write(df.iloc[customer])
-    return customer
+    st.write(client)
+    return customer, client, families
 
-def apply_filter(df, customer, key) :
+def apply_filter(families, key) :
     """
-    Applique un filtre basé sur les caractéristiques sélectionnées
-    par l'utilisateur et retourne un dataframe filtré.
+    Permet à l'utilisateur de choisir un filtre basé sur une catégorie,
+    appliqué par l'API lors du calcul des agrégats.
     Args :
-        df (pd.DataFrame) : Le dataframe contenant les données des clients.
-        customer (int) : L'index du client sélectionné.
+        families (dict) : Les colonnes de chaque famille et la catégorie du
+        client sélectionné, retournées par select_customer.
         key (str) : La clé pour l'élément de filtre dans Streamlit.
     Returns:
-        pd.DataFrame : Le dataframe filtré.
-        str : La chaîne ajoutée au titre en fonction du filtre appliqué.
+        str : La colonne one-hot du filtre appliqué (None sans filtre).
     """
     label = "Utilisez la liste déroulante ci-dessous pour choisir une \
         catégorie suivant laquelle filtrer les données à afficher :"
     prefix = st.selectbox(label, FILTERS, key = key)
     if prefix == "(aucun filtre)" :
-        return df, None
-    features = []
-    customer_feature = None
-    for feature in df.columns :
-        if feature.startswith(prefix) :
-            features.append(feature)
-            if df.iloc[customer][feature] == 1 :
-                customer_feature = feature
+        return None
+    features, customer_feature = families[prefix]
     label = "Utilisez la liste déroulante ci-dessous pour sélectionner \
          la valeur du filtre "
     if customer_feature == None :
@@ -99,15 +257,18 @@ def apply_filter(df, customer, key) :
         default = features.index(customer_feature)
     key += "value"
     filter_value = st.selectbox(label, features, index = default, key = key)
-    return df[df[filter_value] == 1], filter_value
+    count = fetch_data(filter = filter_value, limit = 0)["total"]
+    st.write(f"{count} clients appartiennent à la catégorie {filter_value}.")
+    return filter_value
 
-def display_feature(df, features, customer):
+def display_feature(features, customer, client, families):
     """
     Affiche la distribution d'une variable sélectionnée dans un histogramme.
     Args :
-        df (pd.DataFrame) : Le dataframe contenant les données des clients.
-        features (list) : La liste des noms des colonnes du dataframe.
+        features (list) : La liste des noms des colonnes du tableau.
         customer (int) : L'index du client sélectionné.
+        client (pd.Series) : Les caractéristiques du client sélectionné.
+        families (dict) : Les familles one-hot retournées par select_customer.
     """
     st.title("Distribution des variables")
     # Sélection de la variable
@@ -124,16 +285,22 @@ def display_feature(df, features, customer):
     highlight = st.checkbox(label)
     # Application d'un filtre
     st.write("")
-    df_filter, filter_value = apply_filter(df, customer, "univ")
+    filter_value = apply_filter(families, "univ")
     # Affichage de l'histogramme
     if feature :
         title = f"Distribution de {feature}"
         if filter_value != None :
             title += f" (filtré avec {filter_value})"
-        fig = px.histogram(df_filter, x = feature, title = title)
-        fig.update_layout(bargap = 0.02)
+        # Histogramme calculé par l'API, seuls les effectifs sont transférés
+        data = call_api("histogram", {"feature": feature, "filter": filter_value,
+                                      "bins": HISTOGRAM_BINS})
+        edges = np.array(data["edges"])
+        fig = go.Figure(go.Bar(x = (edges[:-1] + edges[1:]) / 2, y = data["counts"],
+                               width = np.diff(edges)))
+        fig.update_layout(title = title, xaxis_title = feature, yaxis_title = "count",
+                          bargap = 0.02)
         if highlight :
-            value = df.iloc[customer][feature]
+            value = client[feature]
             fig.add_vline(x = value, line_width = 3, line_color = "red")
         st.plotly_chart(fig, use_container_width = True)
         # Description pour les utilisateurs de lecteurs d'écran
@@ -150,17 +317,18 @@ def display_feature(df, features, customer):
                 st.write(f"Une ligne rouge indique la valeur de la variable \
                          pour le client sélectionné (index {customer}).")
 
-def compare_features(df, features, customer) :
+def compare_features(features, customer, client, families) :
     """
-    Compare deux variables sélectionnées avec un graphique de dispersion.
+    Compare deux variables sélectionnées avec une carte de densité.
     Args :
-        df (pd.DataFrame) : Le dataframe contenant les données des clients.
-        features (list) : La liste des noms des colonnes du dataframe.
+        features (list) : La liste des noms des colonnes du tableau.
         customer (int) : L'index du client sélectionné.
+        client (pd.Series) : Les caractéristiques du client sélectionné.
+        families (dict) : Les familles one-hot retournées par select_customer.
     """
     st.title("Comparaison des variables")
     st.write("Sélectionnez deux variables pour comparer leurs distributions \
-             à l'aide d'un graphique de dispersion.")
+             à l'aide d'une carte de densité.")
     # Sélection de la variable en abscisse
     label_x = "Utilisez la liste déroulante ci-dessous pour sélectionner \
         la variable en abscisse :"
@@ -178,16 +346,27 @@ def compare_features(df, features, customer) :
     highlight = st.checkbox(label, key = "biv")
     # Application d'un filtre
     st.write("")
-    df_filter, filter_value = apply_filter(df, customer, "biv_filter")    
-    # Affichage du graphique de dispersion
+    filter_value = apply_filter(families, "biv_filter")
+    # Affichage de la carte de densité
     if feature_x and feature_y :
         title = f"Comparaison de {feature_x} et {feature_y}"
         if filter_value != None :
             title += f" (filtré avec {filter_value})"
-        fig = px.scatter(df_filter, x = feature_x, y = feature_y, title = title)
+        # Effectifs par case calculés par l'API, les cases vides restent blanches
+        data = call_api("density", {"feature_x": feature_x, "feature_y": feature_y,
+                                    "filter": filter_value, "bins": DENSITY_BINS})
+        x_edges, y_edges = np.array(data["x_edges"]), np.array(data["y_edges"])
+        counts = np.array(data["counts"], dtype = float).T
+        counts[counts == 0] = np.nan
+        fig = go.Figure(go.Heatmap(x = (x_edges[:-1] + x_edges[1:]) / 2,
+                                   y = (y_edges[:-1] + y_edges[1:]) / 2,
+                                   z = counts, colorscale = "Blues",
+                                   colorbar = dict(title = "count")))
+        fig.update_layout(title = title, xaxis_title = feature_x,
+                          yaxis_title = feature_y)
         if highlight :
-            value_x = df.iloc[customer][feature_x]
-            value_y = df.iloc[customer][feature_y]
+            value_x = client[feature_x]
+            value_y = client[feature_y]
             fig.add_trace(go.Scatter(
                 x = [value_x], y = [value_y],
                 mode = "markers", name = "Client", showlegend = False,
@@ -199,8 +378,9 @@ def compare_features(df, features, customer) :
         textuelle du graphique."
         show_description = st.checkbox(label, key = "comparison")
         if show_description :
-            st.write(f"Le nuage de points ci-dessus montre la comparaison \
-                     entre les variables {feature_x} et {feature_y}.")
+            st.write(f"La carte de densité ci-dessus montre la comparaison \
+                     entre les variables {feature_x} et {feature_y} : \
+                     plus une case est foncée, plus elle contient de clients.")
             if filter_value != None :
                 st.write(f"Seuls les clients de la catégorie \
                          {filter_value} sont représentés.")
@@ -220,9 +400,7 @@ def display_feature_importance() :
         de variables à afficher dans l'histogramme (entre 5 et 15) :"
     max_display = st.slider(label, min_value = 5, max_value = 15, value = 10)
     # Requête à l'API pour obtenir l'importance des features
-    data = {"max_display": max_display}
-    response = requests.post(API_URL + "importance", json = data)
-    data = response.json()
+    data = call_api("importance", {"max_display": max_display})
     content = {"Variable": data["features"], "Importance": data["importances"]}
     df_importance = pd.DataFrame(content)
     # Affichage du graphique
@@ -319,17 +497,43 @@ def display_waterfall(data):
         for feature, value in zip(features, shap_values):
             st.write(f"- {feature} : {value:.3f}")
 
-def predict_score(customer) :
+def fetch_explanation(client_id, shap_max_display) :
+    """
+    Récupère l'explication d'une prédiction que l'API, surchargée, a renvoyée
+    sans attendre les valeurs SHAP.
+    Args :
+        client_id (int) : L'identifiant (SK_ID_CURR) du client sélectionné.
+        shap_max_display (int) : Le nombre de variables à expliquer.
+    Returns :
+        dict : Les valeurs SHAP, ou None si elles ne sont toujours pas disponibles.
+    """
+    data = {"client_id": client_id, "shap_max_display": shap_max_display}
+    for _ in range(EXPLANATION_ATTEMPTS) :
+        response = get_http_session().post(API_URL + "explanation", json = data)
+        if response.status_code == 200 :
+            return decode_response(response)
+        if response.status_code not in [202, 503] :
+            return None
+        time.sleep(float(response.headers.get("Retry-After", 1)))
+    return None
+
+def predict_score(client_id) :
     """
     Effectue une prédiction de score d'emprunt et affiche les résultats.
     Args :
-        customer (int) : L'index du client sélectionné.
+        client_id (int) : L'identifiant (SK_ID_CURR) du client sélectionné.
     """
     st.title("Demande d'emprunt")
-    data = {"selected_index": customer, "shap_max_display" : 10}
-    response = requests.post(API_URL + "predict", json = data)
-    data = response.json()
+    data = call_api("predict", {"client_id": client_id, "shap_max_display" : 10})
     display_score(data)
+    if data.get("explanation_status", "complete") != "complete" :
+        with st.spinner("Calcul de l'explication du score...") :
+            explanation = fetch_explanation(client_id, 10)
+        if explanation is None :
+            st.info("L'explication du score n'est pas encore disponible : \
+                    réessayez dans quelques instants.")
+            return
+        data = dict(data, **explanation)
     display_waterfall(data)
 
 if __name__ == "__main__":
@@ -0,0 +1,55 @@
+import unittest
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../app")))
+from explainers import build_explainer, check_consistency, NativeExplainer, ENGINES
+
+import numpy as np
+import pandas as pd
+import shap
+from lightgbm import LGBMClassifier
+
+class TestBuildExplainer(unittest.TestCase) :
+
+    def setUp(self) :
+        generator = np.random.default_rng(0)
+        self.df = pd.DataFrame(generator.normal(size = (200, 4)),
+                               columns = ["feature_1", "feature_2", "feature_3", "feature_4"])
+        target = (self.df["feature_1"] + self.df["feature_2"] > 0).astype(int)
+        self.classifier = LGBMClassifier(n_estimators = 20, verbose = -1)
+        self.classifier.fit(self.df, target)
+
+    def test_interventional_type(self) :
+        explainer = build_explainer(self.classifier, self.df, "interventional")
+        self.assertIsInstance(explainer, shap.Explainer)
+
+    def test_native_type(self) :
+        explainer = build_explainer(self.classifier, self.df, "native")
+        self.assertIsInstance(explainer, NativeExplainer)
+
+    def test_unknown_engine(self) :
+        with self.assertRaises(ValueError) :
+            build_explainer(self.classifier, self.df, "unknown")
+
+    def test_unknown_background(self) :
+        for engine in ENGINES :
+            with self.assertRaisesRegex(ValueError, "Unknown SHAP background") :
+                build_explainer(self.classifier, self.df, engine, "kmean")
+
+    def test_shapes(self) :
+        rows = self.df.iloc[:3]
+        for engine in ENGINES :
+            explainer = build_explainer(self.classifier, self.df, engine)
+            self.assertEqual(np.shape(explainer.shap_values(rows)), rows.shape)
+
+    def test_native_matches_tree_path_dependent(self) :
+        explainers = {engine : build_explainer(self.classifier, self.df, engine)
+                      for engine in ["tree_path_dependent", "native"]}
+        report = check_consistency(explainers, self.df.iloc[:20], max_display = 2)
+        result = report[("tree_path_dependent", "native")]
+        self.assertLess(result["max_abs_diff"], 1e-6)
+        self.assertEqual(result["top_features_agreement"], 1.0)
+
+if __name__ == "__main__" :
+    unittest.main()
@@ -0,0 +1,41 @@
+import unittest
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../app")))
+from app import check_client_ids
+
+import tempfile
+import numpy as np
+import pandas as pd
+
+class TestCheckClientIds(unittest.TestCase) :
+
+    def setUp(self) :
+        self.directory = tempfile.TemporaryDirectory()
+        self.ids_file_name = os.path.join(self.directory.name, "client_ids.csv")
+        pd.DataFrame({"SK_ID_CURR": [100002, 100003, 100004]}).to_csv(self.ids_file_name,
+                                                                      index = False)
+
+    def tearDown(self) :
+        self.directory.cleanup()
+
+    def test_match(self) :
+        check_client_ids(self.ids_file_name, np.array([100002, 100003, 100004]))
+
+    def test_order(self) :
+        # Même nombre de lignes, mais clients dans un autre ordre
+        with self.assertRaises(ValueError) :
+            check_client_ids(self.ids_file_name, np.array([100003, 100002, 100004]))
+        with self.assertRaises(ValueError) :
+            check_client_ids(self.ids_file_name, np.array([100002, 100003]))
+
+    def test_missing(self) :
+        with self.assertRaises(ValueError) :
+            check_client_ids(None, np.array([100002]))
+        with self.assertRaises(ValueError) :
+            check_client_ids(os.path.join(self.directory.name, "absent.csv"),
+                             np.array([100002]))
+
+if __name__ == "__main__" :
+    unittest.main()
@@ -0,0 +1,48 @@
+import unittest
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../app")))
+from compact import CompactFrame, smallest_dtype
+
+import numpy as np
+import pandas as pd
+
+class TestCompactFrame(unittest.TestCase) :
+
+    def setUp(self) :
+        self.df = pd.DataFrame({
+            "AMT_CREDIT" : [0.25, 0.5, 0.125, 0.3],
+            "CNT_CHILDREN" : [0.0, 2.0, 1.0, 0.0],
+            "CODE_GENDER_F" : [1.0, 0.0, 0.0, 0.0],
+            "CODE_GENDER_M" : [0.0, 1.0, 0.0, 1.0],
+            "NAME_TYPE_SUITE_FAMILY" : [1.0, 1.0, 0.0, 0.0],
+            "NAME_TYPE_SUITE_SPOUSE" : [1.0, 0.0, 0.0, 0.0]
+        })
+        self.frame = CompactFrame(self.df, families = ["CODE_GENDER", "NAME_TYPE_SUITE"])
+
+    def test_shape(self) :
+        self.assertEqual(self.frame.shape, self.df.shape)
+        self.assertEqual(len(self.frame), len(self.df))
+        self.assertListEqual(list(self.frame.columns), list(self.df.columns))
+
+    def test_families(self) :
+        self.assertIn("CODE_GENDER", self.frame.families)
+        self.assertNotIn("NAME_TYPE_SUITE", self.frame.families)
+
+    def test_rows(self) :
+        self.assertTrue(self.frame.iloc[1 : 2].equals(self.df.iloc[1 : 2]))
+        self.assertTrue(self.frame.iloc[[3, 0]].equals(self.df.iloc[[3, 0]]))
+        self.assertTrue(self.frame.to_dense().equals(self.df))
+
+    def test_memory(self) :
+        self.assertLess(self.frame.memory_usage(), self.df.memory_usage(deep = True).sum())
+
+    def test_smallest_dtype(self) :
+        self.assertEqual(smallest_dtype(np.array([0.0, 1.0])), np.uint8)
+        self.assertEqual(smallest_dtype(np.array([-1, 300])), np.int16)
+        self.assertEqual(smallest_dtype(np.array([0.5, np.nan])), np.float32)
+        self.assertEqual(smallest_dtype(np.array([0.1, 0.2])), np.float64)
+
+if __name__ == "__main__" :
+    unittest.main()
@@ -0,0 +1,49 @@
+import unittest
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../app")))
+from app import compute_feature_importances, get_feature_importance
+
+import numpy as np
+import pandas as pd
+from lightgbm import LGBMClassifier
+
+class TestComputeFeatureImportances(unittest.TestCase) :
+
+    def setUp(self) :
+        generator = np.random.default_rng(0)
+        self.df = pd.DataFrame(generator.normal(size = (200, 3)),
+                               columns = ["feature_1", "feature_2", "feature_3"])
+        target = (2 * self.df["feature_1"] + self.df["feature_2"] > 0).astype(int)
+        self.classifier = LGBMClassifier(n_estimators = 20, verbose = -1).fit(self.df, target)
+
+    def test_types(self) :
+        importances = compute_feature_importances(self.classifier, self.df)
+        self.assertListEqual(sorted(importances), ["gain", "shap", "split"])
+        for features, values in importances.values() :
+            self.assertEqual(len(features), self.df.shape[1])
+            self.assertEqual(len(values), self.df.shape[1])
+
+    def test_sorted(self) :
+        importances = compute_feature_importances(self.classifier, self.df)
+        for _, values in importances.values() :
+            self.assertTrue((np.diff(values) <= 0).all())
+
+    def test_split_matches_get_feature_importance(self) :
+        features, values = compute_feature_importances(self.classifier, self.df)["split"]
+        expected = get_feature_importance(self.classifier, self.df)
+        self.assertListEqual(values.tolist(), expected["importance"].tolist())
+
+    def test_shap_from_matrix(self) :
+        shap_matrix = np.array([[0.1, -0.5, 0.2], [0.3, 0.1, -0.2]])
+        features, values = compute_feature_importances(self.classifier, self.df, shap_matrix)["shap"]
+        self.assertListEqual(features.tolist(), ["feature_2", "feature_1", "feature_3"])
+        np.testing.assert_allclose(values, [0.3, 0.2, 0.2])
+
+    def test_shap_most_important(self) :
+        features, _ = compute_feature_importances(self.classifier, self.df)["shap"]
+        self.assertEqual(features[0], "feature_1")
+
+if __name__ == "__main__" :
+    unittest.main()
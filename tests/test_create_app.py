@@ -0,0 +1,79 @@
+import unittest
+import os
+import pickle
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../app")))
+from app import create_app
+
+import numpy as np
+import pandas as pd
+import shap
+from lightgbm import LGBMClassifier
+from shap.utils._exceptions import ExplainerError
+
+class TestCreateApp(unittest.TestCase) :
+
+    def setUp(self) :
+        self.cwd = os.getcwd()
+        self.directory = tempfile.TemporaryDirectory()
+        os.chdir(self.directory.name)
+        generator = np.random.default_rng(0)
+        df = pd.DataFrame(generator.random((200, 3)),
+                          columns = ["feature_1", "feature_2", "feature_3"])
+        target = (df["feature_1"] + generator.normal(scale = 0.3, size = 200) > 0.5).astype(int)
+        classifier = LGBMClassifier(n_estimators = 20, verbose = -1)
+        classifier.fit(df, target)
+        # Données dont la médiane d'une variable tombe exactement sur un seuil
+        # du modèle, sans qu'aucune ligne ne prenne cette valeur : shap rejette
+        # alors l'explication du vecteur médian (test d'additivité)
+        self.median = None
+        splits = classifier.booster_.trees_to_dataframe().dropna(subset = ["threshold"])
+        for feature, threshold in zip(splits["split_feature"], splits["threshold"]) :
+            data = df.copy()
+            data[feature] = np.where(np.arange(len(df)) % 2, threshold - 0.25, threshold + 0.25)
+            median = data.median().to_numpy()[np.newaxis]
+            if data[feature].median() != threshold :
+                continue
+            try :
+                shap.Explainer(classifier, data).shap_values(median)
+            except ExplainerError :
+                self.median = median
+                break
+        self.assertIsNotNone(self.median)
+        data.to_csv("data.csv", index = False)
+        display_data = data.copy()
+        display_data.insert(0, "SK_ID_CURR", 100000 + np.arange(len(data)))
+        display_data.to_csv("display_data.csv", index = False)
+        display_data[["SK_ID_CURR"]].to_csv("client_ids.csv", index = False)
+        with open("classifier.pkl", "wb") as file :
+            pickle.dump(classifier, file)
+
+    def tearDown(self) :
+        os.chdir(self.cwd)
+        self.directory.cleanup()
+
+    def test_default_engine(self) :
+        # Le préchauffage ne doit pas empêcher le démarrage
+        client = create_app().test_client()
+        response = client.post("/api/predict", json = {"selected_index": 0,
+                                                       "shap_max_display": 2})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.get_json()["top_features"]), 2)
+        response = client.post("/api/predict", json = {"selected_index": 200,
+                                                       "shap_max_display": 2})
+        self.assertEqual(response.status_code, 404)
+
+    def test_score_on_threshold(self) :
+        # Vecteur soumis dont une valeur est exactement un seuil du modèle
+        client = create_app().test_client()
+        response = client.post("/api/score", json = {"features": self.median[0].tolist(),
+                                                     "shap_max_display": 2})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.get_json()["top_shap_values"]), 2)
+        response = client.post("/api/score", json = {"features": self.median[0].tolist()})
+        self.assertEqual(response.status_code, 400)
+
+if __name__ == "__main__" :
+    unittest.main()
@@ -0,0 +1,120 @@
+import unittest
+import os
+import sys
+import tempfile
+import time
+from unittest import mock
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../app")))
+import drift
+from drift import DriftMonitor, bin_counts, moments, merge_moments
+
+import numpy as np
+import pandas as pd
+
+class TestDriftMonitor(unittest.TestCase) :
+
+    def setUp(self) :
+        generator = np.random.default_rng(0)
+        self.reference = np.column_stack([
+            generator.normal(size = 2000),
+            generator.random(2000),
+            np.tile([1.0, 0.0], 1000),
+            np.tile([0.0, 1.0], 1000)
+        ])
+        self.reference[::10, 1] = np.nan
+        self.columns = ["AMT_CREDIT", "EXT_SOURCE_1", "CODE_GENDER_F", "CODE_GENDER_M"]
+        self.monitor = DriftMonitor(self.reference, self.columns)
+
+    def test_bin_counts(self) :
+        counts = bin_counts(np.array([[0.5, np.nan], [2.0, 1.0]]), np.array([[1.0], [0.0]]))
+        np.testing.assert_array_equal(counts, [[1, 1, 0], [0, 1, 1]])
+
+    def test_merge_moments(self) :
+        values = self.reference[:, :2]
+        merged = merge_moments(moments(values[:700]), moments(values[700 :]))
+        for merged_values, values in zip(merged, moments(values)) :
+            np.testing.assert_allclose(merged_values, values)
+
+    def test_same_population(self) :
+        self.monitor.update(pd.DataFrame(self.reference, columns = self.columns))
+        report = self.monitor.report()
+        self.assertEqual(report["rows"], 2000)
+        self.assertEqual(report["drifted"], 0)
+        for feature in report["features"] :
+            self.assertAlmostEqual(feature["psi"], 0.0)
+            self.assertAlmostEqual(feature["ks"], 0.0)
+            self.assertAlmostEqual(feature["mean"], feature["reference_mean"])
+        self.assertAlmostEqual(report["families"]["CODE_GENDER"]["psi"], 0.0)
+
+    def test_shift(self) :
+        shifted = self.reference[:500].copy()
+        shifted[:, 0] += 2
+        shifted[:, 2 :] = [1.0, 0.0]
+        for row in shifted :
+            self.monitor.update(row)
+        report = self.monitor.report()
+        self.assertEqual(report["rows"], 500)
+        features = {feature["feature"] : feature for feature in report["features"][: 3]}
+        self.assertSetEqual(set(features), {"AMT_CREDIT", "CODE_GENDER_F", "CODE_GENDER_M"})
+        self.assertGreater(features["AMT_CREDIT"]["ks"], 0.5)
+        self.assertEqual(report["drifted"], 3)
+        genders = report["families"]["CODE_GENDER"]
+        self.assertEqual(genders["categories"]["CODE_GENDER_F"]["frequency"], 1.0)
+        self.assertGreater(genders["psi"], 0.25)
+
+    def test_reset(self) :
+        self.monitor.update(self.reference[:50])
+        report = self.monitor.report()
+        self.assertIsNone(report["drifted"])
+        # Trop peu de lignes : ni PSI ni KS, variables dans l'ordre de référence
+        self.assertListEqual([feature["feature"] for feature in report["features"]],
+                             list(self.monitor.feature_names))
+        self.assertTrue(all(feature["psi"] is None and feature["ks"] is None
+                            for feature in report["features"]))
+        self.assertIsNone(report["families"]["CODE_GENDER"]["psi"])
+        self.monitor.reset()
+        report = self.monitor.report()
+        self.assertEqual(report["rows"], 0)
+        self.assertIsNone(report["features"][0]["mean"])
+        self.assertIsNone(report["features"][0]["psi"])
+
+    def test_directory(self) :
+        # Deux workers partagent un dossier : chacun voit les lignes de l'autre
+        with tempfile.TemporaryDirectory() as directory :
+            first = DriftMonitor(self.reference, self.columns, directory = directory)
+            second = DriftMonitor(self.reference, self.columns, directory = directory)
+            first.update(self.reference[:300])
+            second.update(self.reference[300 : 600])
+            report = first.report()
+            self.assertEqual(report["rows"], 600)
+            self.assertEqual(report, second.report())
+            single = DriftMonitor(self.reference, self.columns)
+            single.update(self.reference[:600])
+            for feature, expected in zip(report["features"], single.report()["features"]) :
+                self.assertEqual(feature["feature"], expected["feature"])
+                self.assertAlmostEqual(feature["psi"], expected["psi"])
+                self.assertAlmostEqual(feature["mean"], expected["mean"])
+            # Remise à zéro reçue par un seul worker, appliquée par tous
+            first.reset()
+            self.assertEqual(first.report()["rows"], 0)
+            second.dump()
+            second.update(self.reference[:100])
+            self.assertEqual(first.report()["rows"], 0)
+            second.dump()
+            self.assertEqual(first.report()["rows"], 100)
+
+    def test_delayed_dump(self) :
+        # Lignes reçues juste après une écriture : publiées à la fin de l'intervalle
+        with tempfile.TemporaryDirectory() as directory, \
+                mock.patch.object(drift, "DUMP_INTERVAL", 0.05) :
+            first = DriftMonitor(self.reference, self.columns, directory = directory)
+            second = DriftMonitor(self.reference, self.columns, directory = directory)
+            second.update(self.reference[:10])
+            second.update(self.reference[10 : 30])
+            self.assertEqual(first.report()["rows"], 10)
+            time.sleep(0.2)
+            self.assertEqual(first.report()["rows"], 30)
+
+if __name__ == "__main__" :
+    unittest.main()
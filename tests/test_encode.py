@@ -0,0 +1,82 @@
+import unittest
+import gzip
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../app")))
+from encoding import (negotiate, encode, unpack_array, compress_response, msgpack, HAS_ARROW,
+                      JSON, MSGPACK, ARROW)
+
+import numpy as np
+from flask import Response
+from werkzeug.datastructures import Accept, MIMEAccept
+
+class TestEncode(unittest.TestCase) :
+
+    def setUp(self) :
+        self.output = {"total": 3, "positions": np.array([0, 4, 7]),
+                       "data": {"AMT_CREDIT": np.array([1.5, np.nan, 3.0]),
+                                "CNT_CHILDREN": np.array([0, 1, 2])}}
+
+    def test_negotiate(self) :
+        self.assertEqual(negotiate(MIMEAccept([("*/*", 1)])), JSON)
+        self.assertEqual(negotiate(MIMEAccept([])), JSON)
+        self.assertEqual(negotiate(MIMEAccept([("text/html", 1)])), JSON)
+        if msgpack is not None :
+            accept = MIMEAccept([(MSGPACK, 1), (JSON, 0.9)])
+            self.assertEqual(negotiate(accept), MSGPACK)
+        # Arrow n'est proposé que pour les réponses en table
+        self.assertEqual(negotiate(MIMEAccept([(ARROW, 1)])), JSON)
+
+    def test_json(self) :
+        content = json.loads(encode(self.output, JSON))
+        self.assertListEqual(content["positions"], [0, 4, 7])
+        self.assertListEqual(content["data"]["AMT_CREDIT"], [1.5, None, 3.0])
+
+    @unittest.skipIf(msgpack is None, "msgpack is not installed")
+    def test_msgpack(self) :
+        content = msgpack.unpackb(encode(self.output, MSGPACK), ext_hook = unpack_array)
+        self.assertEqual(content["total"], 3)
+        np.testing.assert_array_equal(content["positions"], [0, 4, 7])
+        # Flottants transmis en float32, NaN conservés
+        self.assertEqual(content["data"]["AMT_CREDIT"].dtype, np.float32)
+        np.testing.assert_array_equal(content["data"]["AMT_CREDIT"], [1.5, np.nan, 3.0])
+
+    @unittest.skipIf(msgpack is None, "msgpack is not installed")
+    def test_msgpack_precision(self) :
+        # Valeurs que float32 altérerait : transmises en float64
+        values = np.array([0.032561, np.nan, 0.5])
+        content = msgpack.unpackb(encode({"values": values}, MSGPACK), ext_hook = unpack_array)
+        self.assertEqual(content["values"].dtype, np.float64)
+        np.testing.assert_array_equal(content["values"], values)
+
+    @unittest.skipUnless(HAS_ARROW, "pyarrow is not installed")
+    def test_arrow(self) :
+        import pyarrow
+        body = encode(self.output, ARROW, "data")
+        table = pyarrow.ipc.open_stream(body).read_all()
+        self.assertListEqual(table.column_names, ["AMT_CREDIT", "CNT_CHILDREN"])
+        self.assertEqual(table.num_rows, 3)
+        others = json.loads(table.schema.metadata[b"output"])
+        self.assertDictEqual(others, {"total": 3, "positions": [0, 4, 7]})
+
+    def test_compress(self) :
+        body = json.dumps(list(range(1000))).encode()
+        response = Response(body, mimetype = JSON)
+        response.set_etag("abc")
+        response = compress_response(response, Accept([("gzip", 1)]), 5)
+        self.assertEqual(response.headers["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(response.get_data()), body)
+        self.assertTupleEqual(response.get_etag(), ("abc", True))
+        self.assertIn("Accept-Encoding", response.vary)
+        # Client sans gzip, réponse trop courte ou compression désactivée
+        for accept_encodings, data, level in [(Accept([]), body, 5),
+                                              (Accept([("gzip", 1)]), b"{}", 5),
+                                              (Accept([("gzip", 1)]), body, 0)] :
+            response = compress_response(Response(data), accept_encodings, level)
+            self.assertNotIn("Content-Encoding", response.headers)
+            self.assertEqual(response.get_data(), data)
+
+if __name__ == "__main__" :
+    unittest.main()
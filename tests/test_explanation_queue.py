@@ -0,0 +1,56 @@
+import unittest
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../app")))
+from deadline import ExplanationQueue
+
+class TestExplanationQueue(unittest.TestCase) :
+
+    def setUp(self) :
+        self.queue = ExplanationQueue(max_size = 2, store_size = 2)
+        self.release = threading.Event()
+
+    def tearDown(self) :
+        self.release.set()
+
+    def blocked(self, value) :
+        def compute() :
+            self.release.wait(5)
+            return value
+        return compute
+
+    def test_complete(self) :
+        future = self.queue.submit("a", lambda : {"top_features": ["x"]})
+        self.assertEqual(self.queue.wait(future, 5), ("complete", {"top_features": ["x"]}))
+        # Une requête de suivi reçoit le résultat conservé
+        again = self.queue.submit("a", lambda : None)
+        self.assertEqual(self.queue.wait(again, 0), ("complete", {"top_features": ["x"]}))
+        self.assertEqual(self.queue.stats()["completed"], 1)
+
+    def test_pending_and_shed(self) :
+        first = self.queue.submit("a", self.blocked(1))
+        self.assertIs(self.queue.submit("a", self.blocked(1)), first)
+        self.queue.submit("b", self.blocked(2))
+        self.assertIsNone(self.queue.submit("c", self.blocked(3)))
+        self.assertEqual(self.queue.wait(first, 0.01), ("pending", None))
+        self.assertEqual(self.queue.wait(None, 1), ("shed", None))
+        stats = self.queue.stats()
+        self.assertEqual((stats["depth"], stats["shed"], stats["deferred"]), (2, 1, 1))
+        self.release.set()
+        self.assertEqual(self.queue.wait(first, 5), ("complete", 1))
+
+    def test_store_size(self) :
+        for key in ["a", "b", "c"] :
+            self.queue.wait(self.queue.submit(key, lambda : key), 5)
+        self.assertListEqual(list(self.queue.results), ["b", "c"])
+
+    def test_failed(self) :
+        future = self.queue.submit("a", lambda : 1 / 0)
+        self.assertEqual(self.queue.wait(future, 5), ("failed", None))
+        self.assertEqual(self.queue.stats()["failed"], 1)
+        self.assertEqual(self.queue.stats()["depth"], 0)
+
+if __name__ == "__main__" :
+    unittest.main()
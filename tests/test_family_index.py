@@ -0,0 +1,39 @@
+import unittest
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../app")))
+from families import FamilyIndex
+
+import numpy as np
+import pandas as pd
+
+class TestFamilyIndex(unittest.TestCase) :
+
+    def setUp(self) :
+        self.df = pd.DataFrame({
+            "AMT_CREDIT": [1.0, 2.0, 3.0, 4.0],
+            "CODE_GENDER_F": [1, 0, 1, 0],
+            "CODE_GENDER_M": [0, 1, 0, 0],
+            "NAME_FAMILY_STATUS_MARRIED": [1, 1, 0, 0],
+            "NAME_FAMILY_STATUS_SINGLE": [0, 0, 1, 1]
+        })
+        self.index = FamilyIndex(self.df, ["CODE_GENDER", "NAME_FAMILY_STATUS", "OCCUPATION_TYPE"])
+
+    def test_members(self) :
+        self.assertListEqual(self.index.members["CODE_GENDER"], ["CODE_GENDER_F", "CODE_GENDER_M"])
+        self.assertNotIn("OCCUPATION_TYPE", self.index.members)
+
+    def test_category(self) :
+        self.assertEqual(self.index.category("CODE_GENDER", 1), "CODE_GENDER_M")
+        self.assertIsNone(self.index.category("CODE_GENDER", 3))
+
+    def test_filter(self) :
+        np.testing.assert_array_equal(self.index.filter(["CODE_GENDER_F"]), [0, 2])
+        np.testing.assert_array_equal(
+            self.index.filter(["CODE_GENDER_F", "NAME_FAMILY_STATUS_MARRIED"]), [0])
+        for column, rows in self.index.rows.items() :
+            np.testing.assert_array_equal(rows, np.flatnonzero(self.df[column] == 1))
+
+if __name__ == "__main__" :
+    unittest.main()
@@ -0,0 +1,63 @@
+import unittest
+import os
+import sys
+import pickle
+
+APP_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../app"))
+sys.path.insert(0, APP_DIR)
+from flat_forest import FlatForest
+
+import numpy as np
+import pandas as pd
+from lightgbm import LGBMClassifier
+
+class TestFlatForest(unittest.TestCase) :
+
+    def setUp(self) :
+        generator = np.random.default_rng(0)
+        self.df = pd.DataFrame(generator.normal(size = (300, 3)),
+                               columns = ["feature_1", "feature_2", "feature_3"])
+        self.target = (self.df["feature_1"] - self.df["feature_2"] > 0).astype(int)
+
+    def test_application_model(self) :
+        with open(os.path.join(APP_DIR, "classifier.pkl"), "rb") as file :
+            classifier = pickle.load(file)
+        df = pd.read_csv(os.path.join(APP_DIR, "data.csv"))
+        forest = FlatForest.from_booster(classifier.booster_)
+        np.testing.assert_allclose(forest.predict_proba(df), classifier.predict_proba(df),
+                                   rtol = 0, atol = 1e-12)
+
+    def test_single_row(self) :
+        classifier = LGBMClassifier(n_estimators = 10, verbose = -1).fit(self.df, self.target)
+        forest = FlatForest.from_booster(classifier.booster_)
+        row = self.df.iloc[5 : 6]
+        self.assertEqual(forest.predict_proba(row).shape, (1, 2))
+        np.testing.assert_allclose(forest.predict_proba(row.to_numpy()),
+                                   classifier.predict_proba(row), atol = 1e-12)
+
+    def test_missing_values(self) :
+        df = self.df.copy()
+        df.iloc[::7, 0] = np.nan
+        df.iloc[::5, 1] = 0.0
+        for options in [{}, {"zero_as_missing": True}, {"use_missing": False}] :
+            classifier = LGBMClassifier(n_estimators = 10, verbose = -1, **options)
+            classifier.fit(df, self.target)
+            forest = FlatForest.from_booster(classifier.booster_)
+            np.testing.assert_allclose(forest.predict_proba(df), classifier.predict_proba(df),
+                                       atol = 1e-12)
+
+    def test_column_order(self) :
+        classifier = LGBMClassifier(n_estimators = 10, verbose = -1).fit(self.df, self.target)
+        forest = FlatForest.from_booster(classifier.booster_)
+        shuffled = self.df[["feature_3", "feature_1", "feature_2"]]
+        np.testing.assert_allclose(forest.predict_proba(shuffled),
+                                   classifier.predict_proba(self.df), atol = 1e-12)
+
+    def test_multiclass_unsupported(self) :
+        target = np.arange(len(self.df)) % 3
+        classifier = LGBMClassifier(n_estimators = 5, verbose = -1).fit(self.df, target)
+        with self.assertRaises(ValueError) :
+            FlatForest.from_booster(classifier.booster_)
+
+if __name__ == "__main__" :
+    unittest.main()
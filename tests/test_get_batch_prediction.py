@@ -0,0 +1,37 @@
+import unittest
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../app")))
+from app import get_batch_prediction
+
+import numpy as np
+
+class TestGetBatchPrediction(unittest.TestCase) :
+
+    def setUp(self) :
+        class PlaceHolderClassifier :
+            def predict_proba(self, rows) :
+                return np.array([[0.3, 0.7], [0.9, 0.1]])
+        self.classifier = PlaceHolderClassifier()
+        self.rows = np.array([[1, 2, 3], [4, 5, 6]])
+
+    def test_type(self) :
+        outputs = [{}, {}]
+        get_batch_prediction(self.rows, self.classifier, 0.5, outputs)
+        for output in outputs :
+            self.assertIsInstance(output["pred_proba"], float)
+            self.assertIsInstance(output["acceptance"], (int, float))
+            self.assertIsInstance(output["pred_binary"], int)
+
+    def test_values(self) :
+        outputs = [{}, {}]
+        get_batch_prediction(self.rows, self.classifier, 0.5, outputs)
+        self.assertEqual(outputs[0]["pred_proba"], 0.7)
+        self.assertEqual(outputs[0]["pred_binary"], 1)
+        self.assertEqual(outputs[1]["pred_proba"], 0.1)
+        self.assertEqual(outputs[1]["pred_binary"], 0)
+        self.assertEqual(outputs[1]["acceptance"], 0.5)
+
+if __name__ == "__main__" :
+    unittest.main()
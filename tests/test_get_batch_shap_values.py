@@ -0,0 +1,50 @@
+import unittest
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../app")))
+from app import get_batch_shap_values, get_shap_values
+
+import numpy as np
+import pandas as pd
+
+class TestGetBatchShapValues(unittest.TestCase) :
+
+    def setUp(self) :
+        class MockExplainer :
+            def shap_values(self, rows) :
+                values = np.array([[0.1, 0.2, 0.3, 0.4], [-0.5, 0.1, 0.0, 0.2]])
+                return values[: len(rows)]
+        self.explainer = MockExplainer()
+        self.rows = pd.DataFrame({"feature_1": [1, 5], "feature_2": [2, 6],
+                                  "feature_3": [3, 7], "feature_4": [4, 8]})
+        self.max_display = 2
+
+    def test_one_output_per_row(self) :
+        outputs = [{}, {}]
+        get_batch_shap_values(self.rows, self.explainer, self.max_display, outputs)
+        for output in outputs :
+            self.assertEqual(len(output["top_features"]), self.max_display)
+            self.assertEqual(len(output["top_features_values"]), self.max_display)
+            self.assertEqual(len(output["top_shap_values"]), self.max_display)
+
+    def test_values(self) :
+        outputs = [{}, {}]
+        get_batch_shap_values(self.rows, self.explainer, self.max_display, outputs)
+        self.assertEqual(outputs[0]["top_features"], ["feature_4", "feature_3"])
+        np.testing.assert_array_equal(outputs[0]["top_features_values"], [4, 3])
+        self.assertEqual(outputs[1]["top_features"], ["feature_1", "feature_4"])
+        np.testing.assert_array_equal(outputs[1]["top_features_values"], [5, 8])
+        np.testing.assert_array_equal(outputs[1]["top_shap_values"], [-0.5, 0.2])
+
+    def test_matches_single_row(self) :
+        outputs = [{}]
+        get_batch_shap_values(self.rows.iloc[:1], self.explainer, self.max_display, outputs)
+        output = {}
+        get_shap_values(self.rows.iloc[:1], self.explainer, self.max_display, output)
+        self.assertEqual(outputs[0]["top_features"], output["top_features"])
+        for key in ["top_features_values", "top_shap_values"] :
+            np.testing.assert_array_equal(outputs[0][key], output[key])
+
+if __name__ == "__main__" :
+    unittest.main()
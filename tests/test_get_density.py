@@ -0,0 +1,29 @@
+import unittest
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../app")))
+from aggregates import get_density
+
+import numpy as np
+
+class TestGetDensity(unittest.TestCase) :
+
+    def test_counts(self) :
+        values_x = np.array([0.0, 0.0, 1.0, 1.0])
+        values_y = np.array([0.0, 0.0, 0.0, 1.0])
+        output = get_density(values_x, values_y, 2)
+        self.assertListEqual(output["x_edges"], [0.0, 0.5, 1.0])
+        self.assertListEqual(output["y_edges"], [0.0, 0.5, 1.0])
+        # counts[i][j] : case i en abscisse, case j en ordonnée
+        self.assertListEqual(output["counts"], [[2, 0], [1, 1]])
+        self.assertEqual(output["total"], 4)
+
+    def test_missing_values(self) :
+        values_x = np.array([0.0, np.nan, 1.0])
+        values_y = np.array([0.0, 1.0, np.nan])
+        output = get_density(values_x, values_y, 2)
+        self.assertEqual(output["total"], 1)
+
+if __name__ == "__main__" :
+    unittest.main()
@@ -0,0 +1,38 @@
+import unittest
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../app")))
+from aggregates import get_histogram, filter_values
+from families import FamilyIndex
+
+import numpy as np
+import pandas as pd
+
+class TestGetHistogram(unittest.TestCase) :
+
+    def test_counts(self) :
+        values = np.array([0.0, 1.0, 1.5, 2.0, 4.0])
+        output = get_histogram(values, 4)
+        self.assertListEqual(output["edges"], [0.0, 1.0, 2.0, 3.0, 4.0])
+        self.assertListEqual(output["counts"], [1, 2, 1, 1])
+        self.assertEqual(output["total"], 5)
+
+    def test_missing_values(self) :
+        values = np.array([0.0, np.nan, 1.0])
+        output = get_histogram(values, 2)
+        self.assertEqual(output["total"], 2)
+
+    def test_filter(self) :
+        df = pd.DataFrame({"AMT_CREDIT": [1.0, 2.0, 3.0],
+                           "CODE_GENDER_F": [1, 0, 1]})
+        index = FamilyIndex(df, ["CODE_GENDER"])
+        values = filter_values(df, "AMT_CREDIT", index, ("CODE_GENDER_F",))
+        output = get_histogram(values, 2)
+        self.assertEqual(output["total"], 2)
+        self.assertEqual(output["edges"][0], 1.0)
+        self.assertEqual(output["edges"][-1], 3.0)
+        self.assertEqual(len(filter_values(df, "AMT_CREDIT", index, ())), 3)
+
+if __name__ == "__main__" :
+    unittest.main()
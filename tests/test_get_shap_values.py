@@ -36,8 +36,8 @@ class TestGetShapValues(unittest.TestCase) :
         output = {}
         get_shap_values(self.row, self.explainer, self.max_display, output)
         self.assertIsInstance(output["top_features"], list)
-        self.assertIsInstance(output["top_features_values"], list)
-        self.assertIsInstance(output["top_shap_values"], list)
+        self.assertIsInstance(output["top_features_values"], np.ndarray)
+        self.assertIsInstance(output["top_shap_values"], np.ndarray)
 
     def test_values(self):
         output = {}
@@ -46,8 +46,8 @@ class TestGetShapValues(unittest.TestCase) :
         top_features_values = [4, 3]
         top_shap_values = [0.4, 0.3]
         self.assertEqual(output["top_features"], top_features)
-        self.assertEqual(output["top_features_values"], top_features_values)
-        self.assertEqual(output["top_shap_values"], top_shap_values)
+        np.testing.assert_array_equal(output["top_features_values"], top_features_values)
+        np.testing.assert_array_equal(output["top_shap_values"], top_shap_values)
 
 if __name__ == "__main__":
     unittest.main()
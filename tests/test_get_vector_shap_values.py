@@ -0,0 +1,31 @@
+import unittest
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../app")))
+from app import get_vector_shap_values
+
+import numpy as np
+
+class TestGetVectorShapValues(unittest.TestCase) :
+
+    def setUp(self) :
+        class MockExplainer :
+            def shap_values(self, vector, check_additivity = True) :
+                # Vecteurs soumis : pas de test d'additivité
+                assert not check_additivity
+                return np.array([[0.1, -0.5, 0.3]])
+        self.explainer = MockExplainer()
+        self.features = np.array(["feature_1", "feature_2", "feature_3"])
+
+    def test_values(self) :
+        output = {}
+        vector = np.array([[1.0, np.nan, 3.0]])
+        get_vector_shap_values(vector, self.features, self.explainer, 2, output)
+        self.assertEqual(output["top_features"], ["feature_2", "feature_3"])
+        # NaN conservé, converti en null par l'encodeur JSON
+        np.testing.assert_array_equal(output["top_features_values"], [np.nan, 3.0])
+        np.testing.assert_array_equal(output["top_shap_values"], [-0.5, 0.3])
+
+if __name__ == "__main__" :
+    unittest.main()
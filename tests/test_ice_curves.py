@@ -0,0 +1,46 @@
+import unittest
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../app")))
+from whatif import ice_curves, make_grid, perturb, quantile_grid
+
+import numpy as np
+
+class TestIceCurves(unittest.TestCase) :
+
+    def setUp(self) :
+        class PlaceHolderClassifier :
+            def __init__(self) :
+                self.calls = 0
+            def predict_proba(self, rows) :
+                self.calls += 1
+                proba = rows[:, 0] / 10 + rows[:, 1] / 100
+                return np.column_stack([1 - proba, proba])
+        self.classifier = PlaceHolderClassifier()
+        self.rows = np.array([[1.0, 2.0, 3.0], [4.0, 5.0, 6.0]])
+
+    def test_make_grid(self) :
+        grid = make_grid([np.array([1.0, 2.0]), np.array([10.0, 20.0, 30.0])])
+        self.assertEqual(grid.shape, (6, 2))
+        np.testing.assert_array_equal(grid[:3], [[1, 10], [1, 20], [1, 30]])
+
+    def test_perturb(self) :
+        matrix = perturb(self.rows, [1], np.array([[7.0], [8.0]]))
+        np.testing.assert_array_equal(matrix, [[1, 7, 3], [1, 8, 3], [4, 7, 6], [4, 8, 6]])
+        np.testing.assert_array_equal(self.rows, [[1, 2, 3], [4, 5, 6]])
+
+    def test_ice_curves(self) :
+        grid = make_grid([np.array([0.0, 1.0, 2.0])])
+        curves = ice_curves(self.rows, [0], grid, self.classifier)
+        self.assertEqual(curves.shape, (2, 3))
+        np.testing.assert_allclose(curves[0], [0.02, 0.12, 0.22])
+        np.testing.assert_allclose(curves[1], [0.05, 0.15, 0.25])
+        self.assertEqual(self.classifier.calls, 1)
+
+    def test_quantile_grid(self) :
+        values = np.array([0.0, 0.0, 1.0, np.nan, 1.0])
+        np.testing.assert_array_equal(quantile_grid(values, 5), [0.0, 1.0])
+
+if __name__ == "__main__" :
+    unittest.main()
@@ -0,0 +1,56 @@
+import unittest
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../app")))
+from bulk import read_chunks, iterate_scores
+
+import io
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+
+def score(rows) :
+    return [{"total": float(value)} for value in rows.sum(axis = 1)]
+
+class TestIterateScores(unittest.TestCase) :
+
+    def setUp(self) :
+        self.features = ["feature_1", "feature_2"]
+        self.df = pd.DataFrame({"SK_ID_CURR": np.arange(100, 110),
+                                "feature_2": np.arange(10.0),
+                                "feature_1": np.ones(10)})
+
+    def test_csv(self) :
+        file = io.StringIO(self.df.to_csv(index = False))
+        chunks = read_chunks(file, 4, self.features)
+        results = list(iterate_scores(chunks, self.features, score))
+        self.assertListEqual([len(outputs) for outputs in results], [4, 4, 2])
+        outputs = [output for outputs in results for output in outputs]
+        self.assertListEqual([output["row"] for output in outputs], list(range(10)))
+        self.assertListEqual([output["client_id"] for output in outputs], list(range(100, 110)))
+        self.assertEqual(outputs[5]["total"], 6.0)
+
+    def test_npy(self) :
+        file = io.BytesIO()
+        np.save(file, np.ascontiguousarray(self.df[self.features].to_numpy(dtype = np.float64)))
+        file.seek(0)
+        chunks = read_chunks(file, 3, self.features, binary = True)
+        with ThreadPoolExecutor(2) as executor :
+            results = list(iterate_scores(chunks, self.features, score, executor, 2))
+        outputs = [output for outputs in results for output in outputs]
+        self.assertListEqual([output["total"] for output in outputs], list(np.arange(10.0) + 1))
+        self.assertNotIn("client_id", outputs[0])
+
+    def test_invalid(self) :
+        file = io.StringIO(self.df[["feature_1"]].to_csv(index = False))
+        with self.assertRaises(ValueError) :
+            list(iterate_scores(read_chunks(file, 4, self.features), self.features, score))
+        file = io.BytesIO()
+        np.save(file, np.asfortranarray(np.ones((4, 2))))
+        file.seek(0)
+        with self.assertRaises(ValueError) :
+            list(read_chunks(file, 4, self.features, binary = True))
+
+if __name__ == "__main__" :
+    unittest.main()
@@ -0,0 +1,122 @@
+import unittest
+import json
+import os
+import sys
+import tempfile
+import time
+from unittest import mock
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../app")))
+import metrics
+from metrics import Metrics, Histogram, describe_explainer
+
+class TestMetrics(unittest.TestCase) :
+
+    def setUp(self) :
+        class MockResponse :
+            def __init__(self) :
+                self.headers = {}
+        self.response = MockResponse()
+
+    def test_histogram(self) :
+        histogram = Histogram([0.1, 1.0])
+        for value in [0.05, 0.1, 0.5, 2.0] :
+            histogram.observe(value)
+        lines = histogram.lines("latency", 'endpoint="predict"')
+        self.assertIn('latency_bucket{endpoint="predict",le="0.1"} 2', lines)
+        self.assertIn('latency_bucket{endpoint="predict",le="1.0"} 3', lines)
+        self.assertIn('latency_bucket{endpoint="predict",le="+Inf"} 4', lines)
+        self.assertIn('latency_count{endpoint="predict"} 4', lines)
+
+    def test_stages(self) :
+        metrics = Metrics()
+        timer = metrics.timer()
+        timer.mark("shap")
+        timer.mark("predict_proba")
+        metrics.record_stages("predict", timer, self.response)
+        header = self.response.headers["Server-Timing"]
+        self.assertTrue(header.startswith("shap;dur="))
+        self.assertIn(", predict_proba;dur=", header)
+        self.assertIn('api_stage_duration_seconds_count{endpoint="predict",stage="shap"} 1',
+                      metrics.render())
+
+    def test_render(self) :
+        metrics = Metrics()
+        metrics.start_request()
+        metrics.record_request("predict", 200, 0.003)
+        metrics.add_cache("histogram", lambda : (3, 1))
+        metrics.info["engine"] = "native"
+        text = metrics.render()
+        self.assertIn('api_requests_total{endpoint="predict",status="200"} 1', text)
+        self.assertIn("api_requests_in_flight 1", text)
+        self.assertIn('api_cache_hits_total{cache="histogram"} 3', text)
+        self.assertIn('api_cache_misses_total{cache="histogram"} 1', text)
+        self.assertIn('api_info{engine="native"} 1', text)
+
+    def test_queues(self) :
+        metrics = Metrics()
+        metrics.add_queue("explanations", lambda : {"depth": 2, "capacity": 8, "shed": 5,
+                                                    "deferred": 3, "completed": 7, "failed": 0})
+        text = metrics.render()
+        self.assertIn('api_queue_depth{queue="explanations"} 2', text)
+        self.assertIn('api_queue_shed_total{queue="explanations"} 5', text)
+        self.assertIn('api_queue_deferred_total{queue="explanations"} 3', text)
+
+    def test_directory(self) :
+        # Deux workers partagent un dossier : /metrics additionne leurs compteurs
+        with tempfile.TemporaryDirectory() as directory :
+            first, second = Metrics(directory = directory), Metrics()
+            first.record_request("predict", 200, 0.003)
+            second.record_request("predict", 200, 0.2)
+            second.record_request("predict", 500, 0.2)
+            # État du second worker, simulé par le processus parent
+            with open(os.path.join(directory, f"{os.getppid()}.json"), "w") as file :
+                json.dump(dict(second.state(), pid = os.getppid()), file)
+            text = first.render()
+            self.assertIn('api_requests_total{endpoint="predict",status="200"} 2', text)
+            self.assertIn('api_requests_total{endpoint="predict",status="500"} 1', text)
+            self.assertIn('api_request_duration_seconds_count{endpoint="predict"} 3', text)
+            # Jauges d'un worker arrêté ignorées, compteurs conservés
+            with open(os.path.join(directory, "999999999.json"), "w") as file :
+                file.write('{"pid": 999999999, "requests": [["predict", "200", 4]], '
+                           '"durations": [], "stages": [], "in_flight": 7, '
+                           '"caches": {}, "queues": {}}')
+            text = first.render()
+            self.assertIn('api_requests_total{endpoint="predict",status="200"} 6', text)
+            self.assertIn("api_requests_in_flight 0", text)
+
+    def test_delayed_dump(self) :
+        # Requête terminée juste après une écriture : publiée à la fin de l'intervalle
+        with tempfile.TemporaryDirectory() as directory, \
+                mock.patch.object(metrics, "DUMP_INTERVAL", 0.05) :
+            worker = Metrics(directory = directory)
+            def read_state() :
+                with open(os.path.join(directory, f"{os.getpid()}.json")) as file :
+                    return json.load(file)
+            for _ in range(2) :
+                worker.start_request()
+                worker.record_request("predict", 200, 0.003)
+                worker.end_request()
+            self.assertEqual(read_state()["requests"], [["predict", "200", 1]])
+            time.sleep(0.2)
+            state = read_state()
+            self.assertEqual(state["requests"], [["predict", "200", 2]])
+            self.assertEqual(state["in_flight"], 0)
+
+    def test_disabled(self) :
+        metrics = Metrics(enabled = False)
+        timer = metrics.timer()
+        timer.mark("shap")
+        metrics.record_stages("predict", timer, self.response)
+        self.assertNotIn("Server-Timing", self.response.headers)
+
+    def test_describe_explainer(self) :
+        class Inner :
+            pass
+        class Outer :
+            def __init__(self) :
+                self.explainer = Inner()
+        self.assertEqual(describe_explainer(Outer()), "Outer/Inner")
+
+if __name__ == "__main__" :
+    unittest.main()
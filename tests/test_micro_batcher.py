@@ -0,0 +1,55 @@
+import unittest
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../app")))
+from batching import MicroBatcher
+
+class TestMicroBatcher(unittest.TestCase) :
+
+    def setUp(self) :
+        self.batch_sizes = []
+        def process_batch(items) :
+            self.batch_sizes.append(len(items))
+            return [item * 2 for item in items]
+        self.process_batch = process_batch
+
+    def submit_concurrently(self, batcher, items) :
+        results = {}
+        barrier = threading.Barrier(len(items))
+        def client(item) :
+            barrier.wait()
+            results[item] = batcher.submit(item).result(timeout = 5)
+        threads = [threading.Thread(target = client, args = (item,)) for item in items]
+        for thread in threads :
+            thread.start()
+        for thread in threads :
+            thread.join()
+        return results
+
+    def test_results(self) :
+        batcher = MicroBatcher(self.process_batch, max_wait = 0.05)
+        results = self.submit_concurrently(batcher, list(range(8)))
+        self.assertEqual(results, {item : item * 2 for item in range(8)})
+
+    def test_grouped(self) :
+        batcher = MicroBatcher(self.process_batch, max_wait = 0.2)
+        self.submit_concurrently(batcher, list(range(8)))
+        self.assertLess(len(self.batch_sizes), 8)
+
+    def test_max_batch_size(self) :
+        batcher = MicroBatcher(self.process_batch, max_wait = 0.2, max_batch_size = 3)
+        self.submit_concurrently(batcher, list(range(8)))
+        self.assertLessEqual(max(self.batch_sizes), 3)
+        self.assertEqual(sum(self.batch_sizes), 8)
+
+    def test_exception(self) :
+        def process_batch(items) :
+            raise RuntimeError("failure")
+        batcher = MicroBatcher(process_batch)
+        with self.assertRaises(RuntimeError) :
+            batcher.submit(1).result(timeout = 5)
+
+if __name__ == "__main__" :
+    unittest.main()
@@ -0,0 +1,114 @@
+import unittest
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../app")))
+from registry import ModelRegistry, ModelSlot
+
+import tempfile
+import threading
+
+class TestModelRegistry(unittest.TestCase) :
+
+    def setUp(self) :
+        self.directory = tempfile.TemporaryDirectory()
+        self.root = os.path.join(self.directory.name, "models")
+        os.makedirs(self.root)
+        self.classifier_file_name = os.path.join(self.directory.name, "classifier.pkl")
+        with open(self.classifier_file_name, "wb") as file :
+            file.write(b"model")
+        self.registry = ModelRegistry(self.root)
+
+    def tearDown(self) :
+        self.directory.cleanup()
+
+    def test_publish(self) :
+        version = self.registry.publish(self.classifier_file_name, version = "v1",
+                                        description = "first")
+        self.assertEqual(version, "v1")
+        self.assertListEqual(self.registry.versions(), ["v1"])
+        metadata = self.registry.metadata("v1")
+        self.assertEqual(metadata["description"], "first")
+        self.assertIn("classifier.pkl", metadata["files"])
+        classifier_file_name, csv_file_name, ids_file_name = self.registry.artifacts("v1")
+        self.assertTrue(os.path.exists(classifier_file_name))
+        self.assertIsNone(csv_file_name)
+        self.assertIsNone(ids_file_name)
+        with self.assertRaises(ValueError) :
+            self.registry.publish(self.classifier_file_name, version = "v1")
+        # Des données propres à une version vont avec leurs identifiants clients
+        with self.assertRaises(ValueError) :
+            self.registry.publish(self.classifier_file_name, self.classifier_file_name,
+                                  version = "v2")
+
+    def test_current(self) :
+        self.assertIsNone(self.registry.current())
+        self.registry.publish(self.classifier_file_name, version = "v1")
+        self.registry.publish(self.classifier_file_name, version = "v2")
+        self.assertEqual(self.registry.current(), "v2")
+        self.registry.activate("v1")
+        self.assertEqual(self.registry.current(), "v1")
+        with self.assertRaises(KeyError) :
+            self.registry.activate("v3")
+
+    def test_signature(self) :
+        self.registry.publish(self.classifier_file_name, version = "v1")
+        signature = self.registry.signature("v1")
+        self.assertEqual(self.registry.signature("v1"), signature)
+        with open(os.path.join(self.root, "v1", "classifier.pkl"), "wb") as file :
+            file.write(b"fixed model")
+        self.assertNotEqual(self.registry.signature("v1"), signature)
+
+    def test_incomplete_version(self) :
+        os.makedirs(os.path.join(self.root, "v3"))
+        self.assertListEqual(self.registry.versions(), [])
+
+
+class TestModelSlot(unittest.TestCase) :
+
+    def test_swap(self) :
+        swapped = []
+        slot = ModelSlot(lambda version : {"version": version}, {"version": "v1"},
+                         swapped.append)
+        model = slot.model
+        activated = []
+        self.assertTrue(slot.swap("v2", activated.append))
+        # Une requête en cours garde sa référence à l'ancien modèle
+        self.assertEqual(model["version"], "v1")
+        self.assertEqual(slot.model["version"], "v2")
+        self.assertListEqual(swapped, [{"version": "v2"}])
+        self.assertListEqual(activated, ["v2"])
+
+    def test_failure(self) :
+        def load(version) :
+            raise ValueError("broken")
+        slot = ModelSlot(load, "current")
+        activated = []
+        slot.swap("v2", activated.append)
+        # La version en échec n'est pas activée
+        self.assertListEqual(activated, [])
+        self.assertEqual(slot.model, "current")
+        self.assertIn("broken", slot.error)
+        self.assertEqual(slot.failed, "v2")
+        self.assertIsNone(slot.loading)
+
+    def test_background(self) :
+        started, release = threading.Event(), threading.Event()
+        def load(version) :
+            started.set()
+            release.wait()
+            return version
+        slot = ModelSlot(load, "v1")
+        self.assertTrue(slot.swap_in_background("v2"))
+        started.wait()
+        self.assertEqual(slot.model, "v1")
+        self.assertFalse(slot.swap_in_background("v3"))
+        release.set()
+        for _ in range(100) :
+            if slot.loading is None :
+                break
+            threading.Event().wait(0.01)
+        self.assertEqual(slot.model, "v2")
+
+if __name__ == "__main__" :
+    unittest.main()
@@ -0,0 +1,56 @@
+import unittest
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../app")))
+from neighbours import NeighbourIndex
+
+import numpy as np
+
+class TestNeighbourIndex(unittest.TestCase) :
+
+    def setUp(self) :
+        generator = np.random.default_rng(0)
+        # Groupes bien séparés : les voisins d'un client sont ceux de son groupe
+        self.groups = np.repeat(np.arange(20), 50)
+        centers = generator.normal(size = (20, 8)) * 10
+        self.matrix = centers[self.groups] + generator.normal(size = (1000, 8)) * 0.1
+
+    def check_groups(self, index) :
+        for position in [0, 123, 999] :
+            positions, distances = index.query(position, 5)
+            self.assertEqual(len(positions), 5)
+            self.assertNotIn(position, positions)
+            self.assertTrue((self.groups[positions] == self.groups[position]).all())
+            self.assertTrue((np.diff(distances) >= 0).all())
+
+    def test_brute_force(self) :
+        index = NeighbourIndex(self.matrix, n_components = 4)
+        self.assertIsNone(index.centroids)
+        self.check_groups(index)
+
+    def test_partitions(self) :
+        index = NeighbourIndex(self.matrix, n_components = 4, brute_force_rows = 100, n_probe = 4)
+        self.assertIsNotNone(index.centroids)
+        self.check_groups(index)
+
+    def test_missing_and_constant(self) :
+        matrix = self.matrix.copy()
+        matrix[:, 0] = 1.0
+        matrix[10, 1] = np.nan
+        index = NeighbourIndex(matrix)
+        positions, distances = index.query(10, 3)
+        self.assertTrue(np.isfinite(distances).all())
+        self.assertTrue((self.groups[positions] == self.groups[10]).all())
+
+    def test_without_standardization(self) :
+        # Valeurs SHAP : une variable décisive, sept attributions quasi nulles
+        # qu'une standardisation par variable mettrait au même poids
+        generator = np.random.default_rng(1)
+        matrix = np.column_stack([self.groups * 1.0,
+                                  generator.normal(size = (1000, 7)) * 0.01])
+        index = NeighbourIndex(matrix, n_components = 4, standardize = False)
+        self.check_groups(index)
+
+if __name__ == "__main__" :
+    unittest.main()
@@ -0,0 +1,61 @@
+import unittest
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../app")))
+from app import read_batch_request, MAX_BATCH_SIZE
+
+import pandas as pd
+from werkzeug.exceptions import BadRequest
+
+class TestReadBatchRequest(unittest.TestCase) :
+
+    def setUp(self) :
+        self.df = pd.DataFrame({"feature_1" : [1, 2, 3, 4, 5], "feature_2" : [6, 7, 8, 9, 10]})
+        self.data = {"selected_indices": [4, {"start": 1, "stop": 3}], "shap_max_display" : 10}
+
+    def test_types(self) :
+        rows, max_display = read_batch_request(self.data, self.df)
+        self.assertIsInstance(rows, pd.DataFrame)
+        self.assertIsInstance(max_display, int)
+
+    def test_rows_shape(self) :
+        rows, _ = read_batch_request(self.data, self.df)
+        self.assertEqual(rows.shape, (3, self.df.shape[1]))
+
+    def test_rows_order(self) :
+        rows, _ = read_batch_request(self.data, self.df)
+        self.assertListEqual(rows["feature_1"].tolist(), [5, 2, 3])
+
+    def test_max_display(self) :
+        _, max_display = read_batch_request(self.data, self.df)
+        self.assertEqual(max_display, self.data["shap_max_display"])
+
+    def test_invalid(self) :
+        for indices in [[-1], [5], ["1"], [{"start": -3, "stop": 2}], [{"start": 3, "stop": 1}],
+                        [{"start": 0, "stop": 6}], [{"start": 0}], "1"] :
+            with self.assertRaises(BadRequest) :
+                read_batch_request({"selected_indices": indices, "shap_max_display": 10},
+                                   self.df)
+
+    def test_empty(self) :
+        for indices in [[], [{"start": 3, "stop": 3}],
+                        [{"start": 0, "stop": 0}, {"start": 5, "stop": 5}]] :
+            with self.assertRaises(BadRequest) :
+                read_batch_request({"selected_indices": indices, "shap_max_display": 10},
+                                   self.df)
+        rows, _ = read_batch_request({"selected_indices": [{"start": 3, "stop": 3}, 1],
+                                      "shap_max_display": 10}, self.df)
+        self.assertEqual(len(rows), 1)
+
+    def test_max_batch_size(self) :
+        df = pd.DataFrame({"feature_1": range(MAX_BATCH_SIZE + 1)})
+        rows, _ = read_batch_request({"selected_indices": [{"start": 0, "stop": MAX_BATCH_SIZE}],
+                                      "shap_max_display": 10}, df)
+        self.assertEqual(len(rows), MAX_BATCH_SIZE)
+        with self.assertRaises(BadRequest) :
+            read_batch_request({"selected_indices": [0, {"start": 0, "stop": MAX_BATCH_SIZE}],
+                                "shap_max_display": 10}, df)
+
+if __name__ == "__main__" :
+    unittest.main()
@@ -0,0 +1,29 @@
+import unittest
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../app")))
+from app import read_bulk_request
+from bulk import CHUNK_SIZE, MAX_CHUNK_SIZE
+
+from werkzeug.datastructures import MultiDict
+
+class TestReadBulkRequest(unittest.TestCase) :
+
+    def test_defaults(self) :
+        self.assertTupleEqual(read_bulk_request(MultiDict()), (CHUNK_SIZE, 0))
+
+    def test_values(self) :
+        args = MultiDict([("chunk_size", "500"), ("shap_max_display", "5")])
+        self.assertTupleEqual(read_bulk_request(args), (500, 5))
+
+    def test_clamp(self) :
+        # Un bloc géant lirait tout l'envoi d'un coup
+        for chunk_size, expected in [("1000000000", MAX_CHUNK_SIZE), ("0", 1), ("-5", 1)] :
+            chunk_size, _ = read_bulk_request(MultiDict([("chunk_size", chunk_size)]))
+            self.assertEqual(chunk_size, expected)
+        _, shap_max_display = read_bulk_request(MultiDict([("shap_max_display", "-3")]))
+        self.assertEqual(shap_max_display, 0)
+
+if __name__ == "__main__" :
+    unittest.main()
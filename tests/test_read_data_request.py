@@ -0,0 +1,51 @@
+import unittest
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../app")))
+from app import read_data_request
+from families import FamilyIndex
+
+import pandas as pd
+from werkzeug.datastructures import MultiDict
+from werkzeug.exceptions import BadRequest
+
+class TestReadDataRequest(unittest.TestCase) :
+
+    def setUp(self) :
+        self.df = pd.DataFrame({
+            "SK_ID_CURR": [1, 2, 3],
+            "AMT_CREDIT": [1.0, 2.0, 3.0],
+            "CODE_GENDER_F": [1, 0, 1],
+            "CODE_GENDER_M": [0, 1, 0]
+        })
+        self.index = FamilyIndex(self.df, ["CODE_GENDER"])
+
+    def read(self, args) :
+        return read_data_request(MultiDict(args), self.df.columns, self.index)
+
+    def test_defaults(self) :
+        offset, limit, columns, families, filters = self.read([])
+        self.assertEqual((offset, limit), (0, 100))
+        self.assertListEqual(columns, list(self.df.columns))
+        self.assertListEqual(families, [])
+        self.assertListEqual(filters, [])
+
+    def test_lists(self) :
+        args = [("offset", "2"), ("limit", "0"), ("columns", "SK_ID_CURR,AMT_CREDIT"),
+                ("families", "CODE_GENDER"), ("filter", "CODE_GENDER_M"),
+                ("filter", "CODE_GENDER_F")]
+        offset, limit, columns, families, filters = self.read(args)
+        self.assertEqual((offset, limit), (2, 0))
+        self.assertListEqual(columns, ["SK_ID_CURR", "AMT_CREDIT"])
+        self.assertListEqual(families, ["CODE_GENDER"])
+        self.assertListEqual(filters, ["CODE_GENDER_F", "CODE_GENDER_M"])
+
+    def test_invalid(self) :
+        for args in [[("offset", "-1")], [("limit", "5000")], [("columns", "UNKNOWN")],
+                     [("families", "UNKNOWN")], [("filter", "AMT_CREDIT")]] :
+            with self.assertRaises(BadRequest) :
+                self.read(args)
+
+if __name__ == "__main__" :
+    unittest.main()
@@ -3,9 +3,10 @@ import os
 import sys
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../app")))
-from app import read_request
+from app import read_request, index_clients
 
 import pandas as pd
+from werkzeug.exceptions import NotFound, BadRequest
 
 class TestReadRequest(unittest.TestCase) :
 
@@ -38,5 +39,28 @@ class TestReadRequest(unittest.TestCase) :
         row, max_display = read_request(self.data, self.df)
         self.assertEqual(max_display, self.data["shap_max_display"])
 
+    def test_invalid_max_display(self) :
+        for max_display in ["x", -1, True, None] :
+            with self.assertRaises(BadRequest) :
+                read_request({"selected_index": 1, "shap_max_display": max_display}, self.df)
+
+    def test_invalid_index(self) :
+        for index in [3, -1] :
+            with self.assertRaises(NotFound) :
+                read_request({"selected_index": index, "shap_max_display": 10}, self.df)
+        for data in [{"selected_index": "1", "shap_max_display": 10}, {"shap_max_display": 10}] :
+            with self.assertRaises(BadRequest) :
+                read_request(data, self.df)
+
+    def test_client_id(self) :
+        client_positions = index_clients([100002, 100003, 100004])
+        data = {"client_id": 100004, "shap_max_display": 10}
+        row, _ = read_request(data, self.df, client_positions)
+        self.assertEqual(row.iloc[0]["feature_1"], 3)
+        with self.assertRaises(NotFound) :
+            read_request({"client_id": 1, "shap_max_display": 10}, self.df, client_positions)
+        with self.assertRaises(ValueError) :
+            index_clients([100002, 100002])
+
 if __name__ == "__main__" :
     unittest.main()
@@ -0,0 +1,43 @@
+import unittest
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../app")))
+from app import read_score_request
+
+import numpy as np
+from werkzeug.exceptions import BadRequest
+
+class TestReadScoreRequest(unittest.TestCase) :
+
+    def setUp(self) :
+        self.positions = {"feature_1": 0, "feature_2": 1, "feature_3": 2}
+        self.defaults = np.array([0.5, 1.5, 2.5])
+
+    def test_dense(self) :
+        data = {"features": [1, 2.0, None], "shap_max_display": 2}
+        vector, max_display = read_score_request(data, self.positions, self.defaults)
+        self.assertEqual(vector.shape, (1, 3))
+        np.testing.assert_array_equal(vector, [[1.0, 2.0, np.nan]])
+        self.assertEqual(max_display, 2)
+
+    def test_sparse(self) :
+        data = {"features": {"feature_2": 7}, "shap_max_display": 2}
+        vector, _ = read_score_request(data, self.positions, self.defaults)
+        np.testing.assert_array_equal(vector, [[0.5, 7.0, 2.5]])
+        np.testing.assert_array_equal(self.defaults, [0.5, 1.5, 2.5])
+
+    def test_invalid(self) :
+        for features in [[1, 2], {"feature_4": 1}, {"feature_1": "1"}, [True, 1, 2], 3] :
+            data = {"features": features, "shap_max_display": 2}
+            with self.assertRaises(BadRequest) :
+                read_score_request(data, self.positions, self.defaults)
+
+    def test_invalid_max_display(self) :
+        for data in [{"features": [1, 2, 3]}, {"features": [1, 2, 3], "shap_max_display": -1},
+                     {"features": [1, 2, 3], "shap_max_display": 1.5}] :
+            with self.assertRaises(BadRequest) :
+                read_score_request(data, self.positions, self.defaults)
+
+if __name__ == "__main__" :
+    unittest.main()
@@ -0,0 +1,35 @@
+import unittest
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../app")))
+from app import read_similar_request
+
+from werkzeug.exceptions import BadRequest
+
+class TestReadSimilarRequest(unittest.TestCase) :
+
+    def setUp(self) :
+        self.spaces = ["features"]
+        self.columns = ["SK_ID_CURR", "AMT_CREDIT"]
+
+    def test_defaults(self) :
+        k, space, features = read_similar_request({"selected_index": 0}, self.spaces, self.columns)
+        self.assertEqual(k, 10)
+        self.assertEqual(space, "features")
+        self.assertListEqual(features, [])
+
+    def test_features(self) :
+        data = {"k": 3, "features": ["AMT_CREDIT"]}
+        self.assertEqual(read_similar_request(data, self.spaces, self.columns),
+                         (3, "features", ["AMT_CREDIT"]))
+
+    def test_invalid(self) :
+        for data in [{"k": 0}, {"k": 1000}, {"k": "3"}, {"space": "shap"},
+                     {"features": ["UNKNOWN"]}, {"features": "AMT_CREDIT"},
+                     {"features": [1]}] :
+            with self.assertRaises(BadRequest) :
+                read_similar_request(data, self.spaces, self.columns)
+
+if __name__ == "__main__" :
+    unittest.main()
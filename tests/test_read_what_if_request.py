@@ -0,0 +1,41 @@
+import unittest
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../app")))
+from app import read_what_if_request
+
+import numpy as np
+from werkzeug.exceptions import BadRequest
+
+class TestReadWhatIfRequest(unittest.TestCase) :
+
+    def setUp(self) :
+        self.positions = {"feature_1": 0, "feature_2": 1}
+        self.sample = np.column_stack([np.linspace(0, 1, 11), np.zeros(11)])
+
+    def test_explicit_grid(self) :
+        data = {"features": "feature_2", "grid": [1, 2, 3]}
+        features, positions, axes = read_what_if_request(data, self.positions, self.sample)
+        self.assertListEqual(features, ["feature_2"])
+        self.assertListEqual(positions, [1])
+        np.testing.assert_array_equal(axes[0], [1.0, 2.0, 3.0])
+
+    def test_quantile_grid(self) :
+        data = {"features": ["feature_1", "feature_2"], "grid_size": 3}
+        _, positions, axes = read_what_if_request(data, self.positions, self.sample)
+        self.assertListEqual(positions, [0, 1])
+        np.testing.assert_array_equal(axes[0], [0.0, 0.5, 1.0])
+        np.testing.assert_array_equal(axes[1], [0.0])
+
+    def test_invalid(self) :
+        for data in [{"features": []}, {"features": ["feature_3"]},
+                     {"features": ["feature_1", "feature_1"]},
+                     {"features": "feature_1", "grid": [[1], [2]]},
+                     {"features": "feature_1", "grid": ["1"]},
+                     {"features": "feature_1", "grid_size": 1}] :
+            with self.assertRaises(BadRequest) :
+                read_what_if_request(data, self.positions, self.sample)
+
+if __name__ == "__main__" :
+    unittest.main()
@@ -0,0 +1,58 @@
+import unittest
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../app")))
+from app import score_batch, score_model_batch
+
+import numpy as np
+import pandas as pd
+
+class TestScoreBatch(unittest.TestCase) :
+
+    def setUp(self) :
+        class MockExplainer :
+            def shap_values(self, rows) :
+                return rows.to_numpy() / 10
+        class PlaceHolderClassifier :
+            def predict_proba(self, rows) :
+                proba = rows["feature_1"].to_numpy() / 10
+                return np.column_stack([1 - proba, proba])
+        self.explainer = MockExplainer()
+        self.classifier = PlaceHolderClassifier()
+        self.df = pd.DataFrame({"feature_1" : [1.0, 6.0, 3.0], "feature_2" : [2.0, 5.0, 9.0],
+                                "feature_3" : [3.0, 4.0, 8.0]})
+
+    def test_one_output_per_item(self) :
+        outputs = score_batch([(2, 1), (0, 3), (2, 2)], self.df, self.explainer,
+                              self.classifier, 0.5)
+        self.assertEqual(len(outputs), 3)
+
+    def test_max_display_per_item(self) :
+        outputs = score_batch([(2, 1), (0, 3)], self.df, self.explainer, self.classifier, 0.5)
+        self.assertEqual(outputs[0]["top_features"], ["feature_2"])
+        self.assertEqual(outputs[1]["top_features"], ["feature_3", "feature_2", "feature_1"])
+        self.assertEqual(len(outputs[1]["top_shap_values"]), 3)
+
+    def test_prediction(self) :
+        outputs = score_batch([(1, 1), (0, 1)], self.df, self.explainer, self.classifier, 0.5)
+        self.assertEqual(outputs[0]["pred_binary"], 1)
+        self.assertEqual(outputs[1]["pred_binary"], 0)
+        self.assertAlmostEqual(outputs[1]["pred_proba"], 0.1)
+
+    def test_models(self) :
+        class Model :
+            pass
+        old, new = Model(), Model()
+        for model, scale in [(old, 1.0), (new, 0.5)] :
+            model.df = self.df * scale
+            model.explainer = self.explainer
+            model.predictor = self.classifier
+            model.drift = None
+        outputs = score_model_batch([(old, 1, 1), (new, 1, 1), (old, 0, 1)], 0.5)
+        self.assertAlmostEqual(outputs[0]["pred_proba"], 0.6)
+        self.assertAlmostEqual(outputs[1]["pred_proba"], 0.3)
+        self.assertAlmostEqual(outputs[2]["pred_proba"], 0.1)
+
+if __name__ == "__main__" :
+    unittest.main()
@@ -0,0 +1,55 @@
+import unittest
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../app")))
+from portfolio import ScoreDistribution
+from families import FamilyIndex
+
+import numpy as np
+import pandas as pd
+
+class TestScoreDistribution(unittest.TestCase) :
+
+    def setUp(self) :
+        df = pd.DataFrame({
+            "AMT_CREDIT": [1.0, 2.0, 3.0, 4.0, 5.0],
+            "CODE_GENDER_F": [1, 0, 1, 0, 1],
+            "CODE_GENDER_M": [0, 1, 0, 1, 0],
+            "NAME_FAMILY_STATUS_MARRIED": [0, 0, 0, 0, 0]
+        })
+        self.scores = np.array([0.9, 0.1, 0.5, 0.3, 0.7])
+        self.distribution = ScoreDistribution(self.scores,
+                                              FamilyIndex(df, ["CODE_GENDER", "NAME_FAMILY_STATUS"]))
+
+    def test_overall(self) :
+        output = self.distribution.summary(np.array([0.0, 0.5, 1.0]), [])
+        self.assertEqual(output["total"], 5)
+        self.assertListEqual(output["accepted"], [0, 3, 5])
+        self.assertListEqual(output["acceptance_rate"], [0.0, 0.6, 1.0])
+        self.assertDictEqual(output["families"], {})
+
+    def test_families(self) :
+        thresholds = np.array([0.4, 0.7])
+        output = self.distribution.summary(thresholds, ["CODE_GENDER", "NAME_FAMILY_STATUS"])
+        genders = output["families"]["CODE_GENDER"]
+        for column, accepted in [("CODE_GENDER_F", [0, 2]), ("CODE_GENDER_M", [2, 2])] :
+            rows = self.distribution.scores[[i for i in range(5) if (i % 2 == 0) == (column == "CODE_GENDER_F")]]
+            self.assertListEqual(genders[column]["accepted"], accepted)
+            self.assertListEqual(genders[column]["accepted"],
+                                 [int((rows <= threshold).sum()) for threshold in thresholds])
+        status = output["families"]["NAME_FAMILY_STATUS"]["NAME_FAMILY_STATUS_MARRIED"]
+        self.assertEqual(status["total"], 0)
+        self.assertListEqual(status["acceptance_rate"], [None, None])
+
+    def test_histogram(self) :
+        output = self.distribution.histogram(2)
+        self.assertListEqual(output["edges"], [0.0, 0.5, 1.0])
+        self.assertListEqual(output["counts"], [3, 2])
+
+    def test_percentile(self) :
+        self.assertEqual(self.distribution.percentile(0.1), 20.0)
+        self.assertEqual(self.distribution.percentile(0.9), 100.0)
+
+if __name__ == "__main__" :
+    unittest.main()
@@ -0,0 +1,46 @@
+import unittest
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../app")))
+from pages import select_page, encode_columns, encode_families
+from families import FamilyIndex
+
+import numpy as np
+import pandas as pd
+
+class TestSelectPage(unittest.TestCase) :
+
+    def setUp(self) :
+        self.df = pd.DataFrame({
+            "AMT_CREDIT": [1.0, np.nan, 3.0, 4.0, 5.0],
+            "CNT_CHILDREN": [0, 1, 2, 3, 4],
+            "CODE_GENDER_F": [1, 0, 1, 0, 1],
+            "CODE_GENDER_M": [0, 1, 0, 0, 0]
+        })
+        self.index = FamilyIndex(self.df, ["CODE_GENDER"])
+
+    def test_range(self) :
+        total, positions = select_page(5, self.index, [], 3, 10)
+        self.assertEqual(total, 5)
+        np.testing.assert_array_equal(positions, [3, 4])
+        total, positions = select_page(5, self.index, [], 7, 10)
+        self.assertEqual(len(positions), 0)
+
+    def test_filter(self) :
+        total, positions = select_page(5, self.index, ["CODE_GENDER_F"], 1, 1)
+        self.assertEqual(total, 3)
+        np.testing.assert_array_equal(positions, [2])
+
+    def test_encode(self) :
+        positions = np.array([0, 1, 3])
+        data = encode_columns(self.df, ["AMT_CREDIT", "CNT_CHILDREN"], positions)
+        np.testing.assert_array_equal(data["AMT_CREDIT"], [1.0, np.nan, 4.0])
+        np.testing.assert_array_equal(data["CNT_CHILDREN"], [0, 1, 3])
+        families = encode_families(self.index, ["CODE_GENDER"], positions)
+        self.assertListEqual(families["CODE_GENDER"]["categories"],
+                             ["CODE_GENDER_F", "CODE_GENDER_M"])
+        np.testing.assert_array_equal(families["CODE_GENDER"]["codes"], [1, 2, 0])
+
+if __name__ == "__main__" :
+    unittest.main()
@@ -0,0 +1,69 @@
+import unittest
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../app")))
+from shap_cache import cache_key, load_shap_cache, PrecomputedExplainer
+
+import numpy as np
+import pandas as pd
+
+class MockExplainer :
+
+    def __init__(self) :
+        self.calls = 0
+
+    def shap_values(self, rows) :
+        self.calls += 1
+        return rows.to_numpy() * 0.1
+
+class TestShapCache(unittest.TestCase) :
+
+    def setUp(self) :
+        self.cache_dir = tempfile.TemporaryDirectory()
+        self.df = pd.DataFrame({"feature_1" : np.arange(10.0), "feature_2" : np.arange(10.0, 20.0)})
+        self.explainer = MockExplainer()
+
+    def tearDown(self) :
+        self.cache_dir.cleanup()
+
+    def test_values(self) :
+        matrix = load_shap_cache(self.df, self.explainer, self.cache_dir.name, "key", chunk_size = 3)
+        self.assertEqual(matrix.shape, self.df.shape)
+        np.testing.assert_allclose(matrix, self.df.to_numpy() * 0.1)
+        self.assertEqual(self.explainer.calls, 4)
+
+    def test_memory_mapped(self) :
+        matrix = load_shap_cache(self.df, self.explainer, self.cache_dir.name, "key")
+        self.assertIsInstance(matrix, np.memmap)
+
+    def test_reused(self) :
+        load_shap_cache(self.df, self.explainer, self.cache_dir.name, "key")
+        calls = self.explainer.calls
+        load_shap_cache(self.df, self.explainer, self.cache_dir.name, "key")
+        self.assertEqual(self.explainer.calls, calls)
+
+    def test_invalidated(self) :
+        load_shap_cache(self.df, self.explainer, self.cache_dir.name, "old")
+        load_shap_cache(self.df, self.explainer, self.cache_dir.name, "new")
+        self.assertListEqual(os.listdir(self.cache_dir.name), ["shap_new.npy"])
+
+    def test_cache_key(self) :
+        file_name = os.path.join(self.cache_dir.name, "data.csv")
+        self.df.to_csv(file_name, index = False)
+        key = cache_key([file_name])
+        self.assertEqual(cache_key([file_name]), key)
+        self.df.iloc[:5].to_csv(file_name, index = False)
+        self.assertNotEqual(cache_key([file_name]), key)
+
+    def test_precomputed_explainer(self) :
+        matrix = load_shap_cache(self.df, self.explainer, self.cache_dir.name, "key")
+        explainer = PrecomputedExplainer(self.explainer, matrix, self.df.index)
+        calls = self.explainer.calls
+        values = explainer.shap_values(self.df.iloc[4 : 5])
+        np.testing.assert_allclose(values, self.df.iloc[4 : 5].to_numpy() * 0.1)
+        self.assertEqual(self.explainer.calls, calls)
+
+if __name__ == "__main__" :
+    unittest.main()
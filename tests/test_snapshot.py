@@ -0,0 +1,93 @@
+import unittest
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../app")))
+import snapshot
+from snapshot import write_snapshot, read_snapshot, load_table, snapshot_dir_name
+
+import pandas as pd
+from unittest import mock
+
+class TestSnapshot(unittest.TestCase) :
+
+    def setUp(self) :
+        self.work_dir = tempfile.TemporaryDirectory()
+        self.csv_file_name = os.path.join(self.work_dir.name, "data.csv")
+        self.df = pd.DataFrame({"feature_1" : [1, 2, 3], "feature_2" : [0.5, 0.25, 0.125],
+                                "feature_3" : [4, 5, 6]})
+        self.df.to_csv(self.csv_file_name, index = False)
+
+    def tearDown(self) :
+        self.work_dir.cleanup()
+
+    def test_round_trip(self) :
+        snapshot_dir = write_snapshot(self.csv_file_name)
+        df, manifest = read_snapshot(snapshot_dir)
+        self.assertTrue(df.equals(self.df))
+        self.assertEqual(manifest["rows"], 3)
+
+    def test_memory_mapped(self) :
+        snapshot_dir = write_snapshot(self.csv_file_name)
+        df, _ = read_snapshot(snapshot_dir)
+        self.assertFalse(df["feature_1"].to_numpy().flags.writeable)
+
+    def test_load_table_uses_snapshot(self) :
+        write_snapshot(self.csv_file_name)
+        df = load_table(self.csv_file_name)
+        self.assertFalse(df["feature_2"].to_numpy().flags.writeable)
+        self.assertTrue(df.equals(self.df))
+
+    def test_load_table_without_snapshot(self) :
+        df = load_table(self.csv_file_name)
+        self.assertTrue(df.equals(self.df))
+
+    def test_load_table_stale_snapshot(self) :
+        write_snapshot(self.csv_file_name)
+        self.df.iloc[:2].to_csv(self.csv_file_name, index = False)
+        df = load_table(self.csv_file_name)
+        self.assertEqual(len(df), 2)
+
+    def test_load_table_refresh(self) :
+        # Instantané absent puis périmé : réécrit à la lecture du CSV
+        snapshot_dir = os.path.splitext(self.csv_file_name)[0] + "_snapshot"
+        load_table(self.csv_file_name, refresh = True)
+        df, _ = read_snapshot(snapshot_dir)
+        self.assertTrue(df.equals(self.df))
+        self.df.iloc[:2].to_csv(self.csv_file_name, index = False)
+        load_table(self.csv_file_name, refresh = True)
+        df, _ = read_snapshot(snapshot_dir)
+        self.assertEqual(len(df), 2)
+
+    def test_snapshot_dir_name(self) :
+        # Même nom de fichier dans deux dossiers : instantanés distincts
+        other_csv_file_name = os.path.join(self.work_dir.name, "v2", "data.csv")
+        names = [snapshot_dir_name(csv_file_name, "/snapshots")
+                 for csv_file_name in [self.csv_file_name, other_csv_file_name]]
+        self.assertNotEqual(names[0], names[1])
+        self.assertTrue(all(os.path.dirname(name) == "/snapshots" for name in names))
+        self.assertEqual(names[0], snapshot_dir_name(os.path.relpath(self.csv_file_name),
+                                                     "/snapshots"))
+
+    def test_load_table_concurrent_refresh(self) :
+        # Un autre worker met son instantané en place juste avant le renommage
+        snapshot_dir = os.path.splitext(self.csv_file_name)[0] + "_snapshot"
+        rmtree = snapshot.shutil.rmtree
+        def remove_then_write(path, ignore_errors = False) :
+            rmtree(path, ignore_errors = ignore_errors)
+            if path == snapshot_dir :
+                write_snapshot(self.csv_file_name, snapshot_dir)
+        with mock.patch.object(snapshot.shutil, "rmtree", remove_then_write) :
+            df = load_table(self.csv_file_name, refresh = True)
+        self.assertTrue(df.equals(self.df))
+        self.assertTrue(snapshot.is_current(snapshot_dir, self.csv_file_name))
+        self.assertFalse(os.path.exists(f"{snapshot_dir}.{os.getpid()}"))
+
+    def test_non_numeric_column(self) :
+        pd.DataFrame({"feature_1" : ["a", "b"]}).to_csv(self.csv_file_name, index = False)
+        with self.assertRaises(ValueError) :
+            write_snapshot(self.csv_file_name)
+
+if __name__ == "__main__" :
+    unittest.main()
@@ -0,0 +1,50 @@
+import unittest
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../app")))
+from explainers import summarize_background, compare_explanations
+
+import numpy as np
+import pandas as pd
+
+class TestSummarizeBackground(unittest.TestCase) :
+
+    def setUp(self) :
+        class PlaceHolderClassifier :
+            def predict_proba(self, rows) :
+                proba = rows["feature_1"].to_numpy() / 100
+                return np.column_stack([1 - proba, proba])
+        self.classifier = PlaceHolderClassifier()
+        self.df = pd.DataFrame({"feature_1" : np.arange(100.0), "feature_2" : np.arange(100) % 2})
+
+    def test_full(self) :
+        data = summarize_background(self.df, self.classifier, "full", 10)
+        self.assertEqual(len(data), len(self.df))
+
+    def test_sizes(self) :
+        for strategy in ["random", "stratified", "kmeans"] :
+            data = summarize_background(self.df, self.classifier, strategy, 10)
+            self.assertEqual(data.shape, (10, self.df.shape[1]))
+            self.assertListEqual(list(data.columns), list(self.df.columns))
+
+    def test_stratified_covers_scores(self) :
+        data = summarize_background(self.df, self.classifier, "stratified", 10)
+        strata = (data["feature_1"] // 10).tolist()
+        self.assertListEqual(strata, list(range(10)))
+
+    def test_unknown_strategy(self) :
+        with self.assertRaises(ValueError) :
+            summarize_background(self.df, self.classifier, "unknown", 10)
+
+    def test_compare_explanations(self) :
+        reference = np.array([[0.1, -0.5, 0.3], [0.2, 0.0, -0.1]])
+        result = compare_explanations(reference, reference, max_display = 2)
+        self.assertEqual(result["max_abs_diff"], 0.0)
+        self.assertEqual(result["top_features_agreement"], 1.0)
+        self.assertEqual(result["top_features_same_order"], 1.0)
+        result = compare_explanations(reference, reference[:, ::-1], max_display = 1)
+        self.assertEqual(result["top_features_agreement"], 0.5)
+
+if __name__ == "__main__" :
+    unittest.main()
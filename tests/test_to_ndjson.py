@@ -0,0 +1,30 @@
+import unittest
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../app")))
+from bulk import to_ndjson
+
+import json
+import numpy as np
+
+class TestToNdjson(unittest.TestCase) :
+
+    def test_lines(self) :
+        text = to_ndjson([{"row": 0, "pred_proba": 0.25}, {"row": 1, "pred_proba": 0.75}])
+        lines = text.splitlines()
+        self.assertEqual(len(lines), 2)
+        self.assertDictEqual(json.loads(lines[1]), {"row": 1, "pred_proba": 0.75})
+
+    def test_nan(self) :
+        # NaN n'est pas du JSON valide : écrit null
+        text = to_ndjson([{"client_id": float("nan"), "pred_proba": np.float64(np.nan),
+                           "top_features_values": [1.0, float("nan")],
+                           "top_shap_values": np.array([np.nan, 0.5])}])
+        self.assertNotIn("NaN", text)
+        self.assertDictEqual(json.loads(text), {"client_id": None, "pred_proba": None,
+                                                "top_features_values": [1.0, None],
+                                                "top_shap_values": [None, 0.5]})
+
+if __name__ == "__main__" :
+    unittest.main()
@@ -0,0 +1,22 @@
+import unittest
+import os
+import sys
+from unittest import mock
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../app")))
+from app import worker_count
+
+class TestWorkerCount(unittest.TestCase) :
+
+    def test_without_gunicorn(self) :
+        # Serveur de développement : un seul processus, quel que soit le nombre de cœurs
+        with mock.patch.dict(os.environ) :
+            os.environ.pop("WEB_CONCURRENCY", None)
+            self.assertEqual(worker_count(), 1)
+
+    def test_gunicorn(self) :
+        with mock.patch.dict(os.environ, {"WEB_CONCURRENCY": "4"}) :
+            self.assertEqual(worker_count(), 4)
+
+if __name__ == "__main__" :
+    unittest.main()